@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+"""
+Benchmarks for the signature verification hot path.
+
+Drives SignatureValidator through RequestFactory requests and signature_required
+through the Django test client, for valid and invalid signatures, and reports
+ops/sec, p50/p99 latency and peak memory per scenario.
+
+    python benchmarks/run.py                    # run and compare to baseline.json
+    python benchmarks/run.py --save-baseline    # run and store the results as the new baseline
+    python benchmarks/run.py --only json        # run scenarios whose name contains "json"
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "example.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from apysigner import get_signature  # noqa: E402
+from django import test  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+from request_signer import constants  # noqa: E402
+from request_signer.validator import SignatureValidator  # noqa: E402
+
+PRIVATE_KEY = 'abc123=='
+CLIENT_ID = 'bench-client'
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+JSON_SIZES = [('1kb', 1024), ('64kb', 64 * 1024), ('1mb', 1024 * 1024), ('50mb', 50 * 1024 * 1024)]
+FORM_DATA = {'username': ['tester', 'billyjean'], 'company': ['1234'], 'note': ['a b, c@d']}
+
+
+def signed_url(path, payload=None, valid=True):
+    url = '{}?username=test%2C&{}={}'.format(path, constants.CLIENT_ID_PARAM_NAME, CLIENT_ID)
+    signature = get_signature(PRIVATE_KEY, url, payload) if valid else 'x' * 43 + '='
+    return '{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature)
+
+
+def json_body(size):
+    item = json.dumps({'key': 'value' * 20})
+    count = max(size // (len(item) + 2), 1)
+    return '[{}]'.format(', '.join([item] * count))
+
+
+class Scenario(object):
+    """
+    Builds a fresh request for every run, since request bodies can only be read
+    once, and times only the verification.
+    """
+
+    def __init__(self, name, build, verify, iterations, settings=None):
+        self.name = name
+        self.build = build
+        self.verify = verify
+        self.iterations = iterations
+        self.settings = settings or {}
+
+    def run(self):
+        with override_settings(**self.settings):
+            self.verify(self.build())
+            latencies = [self._time_once() for _ in range(self.iterations)]
+            peak_memory = self._peak_memory()
+        latencies.sort()
+        return {
+            'ops_per_sec': len(latencies) / sum(latencies),
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'peak_memory_kb': peak_memory / 1024.0,
+        }
+
+    def _time_once(self):
+        request = self.build()
+        start = time.perf_counter()
+        self.verify(request)
+        return time.perf_counter() - start
+
+    def _peak_memory(self):
+        request = self.build()
+        tracemalloc.start()
+        self.verify(request)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+
+def percentile(sorted_values, percent):
+    index = int(round((len(sorted_values) - 1) * percent / 100.0))
+    return sorted_values[index]
+
+
+def validate(request):
+    return SignatureValidator(request).has_valid_signature()
+
+
+def factory_scenarios(valid):
+    factory = test.RequestFactory()
+    state = 'valid' if valid else 'invalid'
+    form_body = urlencode(FORM_DATA, doseq=True)
+    yield Scenario(
+        'get_query_{}'.format(state), lambda: factory.get(signed_url('/api/a b/', valid=valid)), validate, 2000
+    )
+    yield Scenario(
+        'form_post_{}'.format(state),
+        lambda: factory.post(signed_url('/api/', FORM_DATA, valid), data=FORM_DATA), validate, 2000
+    )
+    for method in ('put', 'patch'):
+        yield Scenario(
+            'form_{}_{}'.format(method, state),
+            lambda method=method: getattr(factory, method)(
+                signed_url('/api/', dict(FORM_DATA), valid), data=form_body,
+                content_type='application/x-www-form-urlencoded'
+            ), validate, 2000
+        )
+
+
+def json_scenarios(valid):
+    factory = test.RequestFactory()
+    state = 'valid' if valid else 'invalid'
+    for label, size in JSON_SIZES:
+        body = json_body(size)
+        url = signed_url('/api/', body, valid)
+        iterations = max(min(2000, (200 * 1024 * 1024) // (size * 20)), 5)
+        for streamed in (False, True):
+            yield Scenario(
+                'json_{}{}_{}'.format(label, '_streamed' if streamed else '', state),
+                lambda url=url, body=body: factory.post(url, data=body, content_type='application/json'),
+                validate, iterations, {'SIGNATURE_STREAM_JSON_BODY': streamed},
+            )
+
+
+def client_scenarios(valid):
+    client = test.Client()
+    state = 'valid' if valid else 'invalid'
+    yield Scenario(
+        'client_get_{}'.format(state), lambda: signed_url('/test/', valid=valid), client.get, 1000
+    )
+
+
+def all_scenarios():
+    for valid in (True, False):
+        for scenarios in (factory_scenarios, json_scenarios, client_scenarios):
+            for scenario in scenarios(valid):
+                yield scenario
+
+
+def compare(results, baseline, tolerance):
+    """
+    :returns:
+        Names of scenarios whose ops/sec dropped more than ``tolerance`` below the baseline.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected and result['ops_per_sec'] < expected['ops_per_sec'] * (1 - tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def print_results(results, baseline):
+    print('{:<32} {:>12} {:>10} {:>10} {:>14} {:>10}'.format(
+        'scenario', 'ops/sec', 'p50 ms', 'p99 ms', 'peak mem KB', 'vs base'
+    ))
+    for name, result in results.items():
+        expected = baseline.get(name)
+        change = '{:+.1%}'.format(result['ops_per_sec'] / expected['ops_per_sec'] - 1) if expected else '-'
+        print('{:<32} {:>12.1f} {:>10.3f} {:>10.3f} {:>14.1f} {:>10}'.format(
+            name, result['ops_per_sec'], result['p50_ms'], result['p99_ms'], result['peak_memory_kb'], change
+        ))
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as baseline_file:
+        return json.load(baseline_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', help='only run scenarios whose name contains this text')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed ops/sec drop before failing')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    results = {}
+    with override_settings(API_KEYS={CLIENT_ID: PRIVATE_KEY}, DATA_UPLOAD_MAX_MEMORY_SIZE=None):
+        for scenario in all_scenarios():
+            if args.only and args.only not in scenario.name:
+                continue
+            results[scenario.name] = scenario.run()
+
+    baseline = load_baseline()
+    print_results(results, baseline)
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w') as baseline_file:
+            json.dump(dict(baseline, **results), baseline_file, indent=2, sort_keys=True)
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print('Regressed more than {:.0%}: {}'.format(args.tolerance, ', '.join(regressions)))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,12 +8,20 @@ else:
 from django.contrib import admin
 from django import http
 
+from request_signer import views
 from request_signer.decorators import signature_required
 
 admin.autodiscover()
 
+
+async def async_view(request, *args, **kwargs):
+    return http.HttpResponse("Completed Async Test View!")
+
+
 urlpatterns = [
     url(r'^admin/', admin.site.urls),
     url(r'^test/$', signature_required(lambda request, *args, **kwargs: http.HttpResponse("Completed Test View!"))),
-    url(r'^test/(?P<arg>.*)/$', signature_required(lambda request, *args, **kwargs: http.HttpResponse("X")))
+    url(r'^test/(?P<arg>.*)/$', signature_required(lambda request, *args, **kwargs: http.HttpResponse("X"))),
+    url(r'^async-test/$', signature_required(async_view)),
+    url(r'^metrics/$', views.metrics),
 ]
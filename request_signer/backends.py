@@ -0,0 +1,156 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from request_signer import loading
+
+DEFAULT_KEY_BACKEND = 'request_signer.backends.SettingsKeyBackend'
+DEFAULT_CACHED_KEY_BACKEND = 'request_signer.backends.DatabaseKeyBackend'
+
+
+class BaseKeyBackend(object):
+
+    # See coroutines.verification_is_cpu_only.
+    cpu_only = False
+
+    def get_private_key(self, client_id):
+        """
+        :returns:
+            The client's private key, or None when the client is unknown.
+        """
+        raise NotImplementedError
+
+    def invalidate(self, client_id):
+        """
+        Called when a client's key changed. Backends that cache keys drop it here.
+        """
+
+
+class SettingsKeyBackend(BaseKeyBackend):
+    """
+    Reads keys from the API_KEYS dict in settings.
+    """
+
+    cpu_only = True
+
+    def get_private_key(self, client_id):
+        api_keys = getattr(settings, 'API_KEYS', None)
+        if not api_keys:
+            raise ImproperlyConfigured('API_KEYS not found in settings')
+        return api_keys.get(client_id)
+
+
+class DatabaseKeyBackend(BaseKeyBackend):
+    """
+    Reads keys of active clients from the AuthorizedClient table.
+    """
+
+    def get_private_key(self, client_id):
+        from request_signer.models import AuthorizedClient
+        keys = AuthorizedClient.objects.filter(client_id=client_id, is_active=True).values_list('private_key')
+        return next((key for key, in keys), None)
+
+
+class LocalKeyCache(object):
+    """
+    Thread safe, size bounded, least recently used cache whose entries expire
+    ``timeout`` seconds after they were stored.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            expires, value = self._entries.get(key, (0, default))
+            if expires <= time.time():
+                self._entries.pop(key, None)
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class CachedKeyBackend(BaseKeyBackend):
+    """
+    Two tier read-through cache in front of the backend named in
+    SIGNATURE_CACHED_KEY_BACKEND, the database by default.
+
+    Keys are looked up in a small in-process cache first, then in the shared
+    Django cache named in SIGNATURE_KEY_CACHE_ALIAS, and only then in the wrapped
+    backend. Unknown clients are cached too, so a flood of made up client ids
+    doesn't turn into a flood of database queries.
+    """
+
+    KEY_PREFIX = 'request_signer:key:'
+    UNKNOWN = ''
+
+    def __init__(self):
+        self.backend = import_string(getattr(settings, 'SIGNATURE_CACHED_KEY_BACKEND', DEFAULT_CACHED_KEY_BACKEND))()
+        self.timeout = getattr(settings, 'SIGNATURE_KEY_CACHE_TIMEOUT', 300)
+        self.local = LocalKeyCache(
+            getattr(settings, 'SIGNATURE_KEY_LOCAL_SIZE', 1024),
+            getattr(settings, 'SIGNATURE_KEY_LOCAL_TIMEOUT', 30),
+        )
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'SIGNATURE_KEY_CACHE_ALIAS', 'default')]
+
+    def cache_key(self, client_id):
+        """
+        Client ids come straight from the querystring, so they are hashed into a
+        key any cache backend accepts, whatever characters or length they have.
+        """
+        return self.KEY_PREFIX + hashlib.sha256(client_id.encode('utf-8')).hexdigest()
+
+    def get_private_key(self, client_id):
+        private_key = self.local.get(client_id)
+        if private_key is None:
+            private_key = self._get_shared(client_id)
+            self.local.set(client_id, private_key)
+        return private_key or None
+
+    def _get_shared(self, client_id):
+        private_key = self.cache.get(self.cache_key(client_id))
+        if private_key is None:
+            private_key = self.backend.get_private_key(client_id) or self.UNKNOWN
+            self.cache.set(self.cache_key(client_id), private_key, self.timeout)
+        return private_key
+
+    def invalidate(self, client_id):
+        """
+        Drops the key from the shared cache and from this process's in-process
+        cache. Other processes keep the old key until it expires from theirs,
+        after SIGNATURE_KEY_LOCAL_TIMEOUT seconds.
+        """
+        self.local.delete(client_id)
+        self.cache.delete(self.cache_key(client_id))
+        self.backend.invalidate(client_id)
+
+
+def get_key_backend():
+    return loading.get_configured('SIGNATURE_KEY_BACKEND', DEFAULT_KEY_BACKEND)
+
+
+def invalidate_client(client_id):
+    get_key_backend().invalidate(client_id)
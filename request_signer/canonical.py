@@ -0,0 +1,72 @@
+import re
+import six
+from collections import OrderedDict
+
+if six.PY3:
+    from urllib.parse import unquote
+else:
+    from urllib import unquote
+
+from request_signer import constants
+
+
+def split_full_path(full_path):
+    """
+    Splits a full path on the first "?" only, returning the path and query string.
+    The query string is empty when the full path doesn't have one.
+    """
+    path, _, query = full_path.partition('?')
+    return path, query
+
+
+def strip_signature(signature, full_path):
+    """
+    Removes the trailing signature parameter from the full path so the url matches
+    what the client had when it created the signature.
+    """
+    signature_qs = r"(\?|&)?{0}={1}$".format(constants.SIGNATURE_PARAM_NAME, re.escape(signature))
+    return re.sub(signature_qs, '', full_path, count=1)
+
+
+def canonical_path(full_path):
+    """
+    The one deterministic url form a request is signed with: the path unquoted and
+    the query string left exactly as it was sent. This is the form produced by the
+    generic_request_signer clients, which sign before escaping the path.
+    """
+    path, query = split_full_path(full_path)
+    return '{}?{}'.format(unquote(path), query)
+
+
+def candidate_forms(full_path, signature, canonical_only=False):
+    """
+    :param full_path:
+        Full path of the request, including the query string.
+    :param signature:
+        Signature received from the request, stripped from every candidate.
+    :param canonical_only:
+        When True only the canonical form is returned.
+
+    :returns:
+        Ordered dict of the unique url forms to check the signature against, in the
+        order they should be tried, mapped to the name of the form. Compatibility
+        mode keeps the historical order of raw path, fully unquoted path and
+        canonical path, skipping duplicates so a request without escaped characters
+        costs a single HMAC.
+    """
+    if canonical_only:
+        forms = [('canonical', canonical_path(full_path))]
+    else:
+        forms = [('raw', full_path), ('unquoted', unquote(full_path)), ('canonical', canonical_path(full_path))]
+
+    candidates = OrderedDict()
+    for name, form in forms:
+        candidates.setdefault(strip_signature(signature, form), name)
+    return candidates
+
+
+def candidate_paths(full_path, signature, canonical_only=False):
+    """
+    The unique url forms from candidate_forms, in the order they should be tried.
+    """
+    return list(candidate_forms(full_path, signature, canonical_only))
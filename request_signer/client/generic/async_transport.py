@@ -0,0 +1,223 @@
+import asyncio
+import io
+import ssl
+import time
+import weakref
+from http.client import parse_headers
+
+from django.conf import settings
+
+from request_signer.client.generic.transport import DEFAULT_IDLE_TIMEOUT, DEFAULT_POOL_SIZE, IDEMPOTENT_METHODS
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+STALE_CONNECTION_ERRORS = (asyncio.IncompleteReadError, ConnectionError)
+NO_BODY_STATUSES = (204, 304)
+
+
+class AsyncResponse(object):
+    """
+    Fully read response with the ``code`` and ``read`` the generic Response
+    expects from urllib responses.
+    """
+
+    def __init__(self, code, headers, body):
+        self.code = code
+        self.headers = headers
+        self.body = body
+
+    def read(self, amt=None):
+        if amt is None:
+            data, self.body = self.body, b''
+        else:
+            data, self.body = self.body[:amt], self.body[amt:]
+        return data
+
+    def close(self):
+        pass
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+
+class AsyncConnection(object):
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncConnectionPool(object):
+    """
+    Keeps up to ``max_size`` idle keep-alive stream connections to one host,
+    for use from a single event loop.
+    """
+
+    def __init__(self, scheme, host, max_size, idle_timeout):
+        self.scheme = scheme
+        self.host = host
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self.created = 0
+        self.reused = 0
+
+    async def acquire(self, connect_timeout=None):
+        """
+        :returns:
+            A connection and whether it was reused from the pool.
+        """
+        now = time.time()
+        while self._idle:
+            connection, idle_since = self._idle.pop()
+            if now - idle_since < self.idle_timeout and not connection.reader.at_eof():
+                self.reused += 1
+                return connection, True
+            connection.close()
+        return await self.new_connection(connect_timeout), False
+
+    async def new_connection(self, connect_timeout=None):
+        self.created += 1
+        hostname, _, port = self.host.rpartition(':') if ':' in self.host else (self.host, '', '')
+        context = ssl.create_default_context() if self.scheme == 'https' else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(hostname, int(port or DEFAULT_PORTS[self.scheme]), ssl=context), connect_timeout
+        )
+        return AsyncConnection(reader, writer)
+
+    def release(self, connection, reusable=True):
+        if reusable and len(self._idle) < self.max_size:
+            self._idle.append((connection, time.time()))
+        else:
+            connection.close()
+
+    def close(self):
+        idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            connection.close()
+
+
+class AsyncPooledTransport(object):
+    """
+    Sends urllib requests over asyncio stream connections, kept in one pool per
+    scheme, host and port. Uses the same SIGNATURE_CLIENT_POOL_SIZE and
+    SIGNATURE_CLIENT_POOL_IDLE_TIMEOUT settings as the blocking PooledTransport.
+    """
+
+    def __init__(self, max_size=None, idle_timeout=None):
+        self.max_size = max_size or getattr(settings, 'SIGNATURE_CLIENT_POOL_SIZE', DEFAULT_POOL_SIZE)
+        self.idle_timeout = idle_timeout or getattr(
+            settings, 'SIGNATURE_CLIENT_POOL_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT
+        )
+        self.pools = {}
+
+    def get_pool(self, scheme, host):
+        if (scheme, host) not in self.pools:
+            self.pools[(scheme, host)] = AsyncConnectionPool(scheme, host, self.max_size, self.idle_timeout)
+        return self.pools[(scheme, host)]
+
+    async def open(self, request, timeout, connect_timeout=None):
+        """
+        Sends the urllib request and returns an AsyncResponse for any status code.
+        An idempotent request on a reused connection the server already closed is
+        sent once more on a new one.
+        ``timeout`` bounds the whole exchange, ``connect_timeout`` only connecting.
+        """
+        return await asyncio.wait_for(self._open(request, connect_timeout), timeout)
+
+    async def _open(self, request, connect_timeout):
+        pool = self.get_pool(request.type, request.host)
+        connection, reused = await pool.acquire(connect_timeout)
+        try:
+            response, reusable = await self._exchange_or_close(connection, request)
+        except STALE_CONNECTION_ERRORS:
+            if not reused or request.get_method() not in IDEMPOTENT_METHODS:
+                raise
+            connection = await pool.new_connection(connect_timeout)
+            response, reusable = await self._exchange_or_close(connection, request)
+        pool.release(connection, reusable)
+        return response
+
+    async def _exchange_or_close(self, connection, request):
+        """
+        Closes the connection when the exchange fails or is cancelled, since the
+        server may be partway through a response on it.
+        """
+        try:
+            return await self._exchange(connection, request)
+        except BaseException:
+            connection.close()
+            raise
+
+    async def _exchange(self, connection, request):
+        connection.writer.write(self._serialize(request))
+        await connection.writer.drain()
+        return await self._read_response(connection.reader, request.get_method())
+
+    def _serialize(self, request):
+        headers = dict((name.title(), value.decode('latin-1') if isinstance(value, bytes) else value)
+                       for name, value in request.header_items())
+        headers.setdefault('Host', request.host)
+        headers.setdefault('Accept-Encoding', 'identity')
+        data = request.data or b''
+        if request.data is not None:
+            headers.setdefault('Content-Type', 'application/x-www-form-urlencoded')
+            headers['Content-Length'] = str(len(data))
+        lines = ['{} {} HTTP/1.1'.format(request.get_method(), request.selector)]
+        lines.extend('{}: {}'.format(name, value) for name, value in headers.items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + data
+
+    async def _read_response(self, reader, method):
+        """
+        :returns:
+            The response, and whether the connection can be reused afterwards.
+        """
+        head = await reader.readuntil(b'\r\n\r\n')
+        status_line, _, header_block = head.partition(b'\r\n')
+        version, status = status_line.decode('latin-1').split(' ', 2)[:2]
+        headers = parse_headers(io.BytesIO(header_block))
+        reusable = version == 'HTTP/1.1' and headers.get('Connection', '').lower() != 'close'
+        code = int(status)
+        if method == 'HEAD' or code in NO_BODY_STATUSES or code // 100 == 1:
+            body = b''
+        elif headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = await self._read_chunked(reader)
+        elif headers.get('Content-Length') is not None:
+            body = await reader.readexactly(int(headers['Content-Length']))
+        else:
+            body, reusable = await reader.read(), False
+        return AsyncResponse(code, headers, body), reusable
+
+    async def _read_chunked(self, reader):
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if not size:
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        while (await reader.readline()) not in (b'\r\n', b''):
+            pass
+        return b''.join(chunks)
+
+    def close(self):
+        for pool in list(self.pools.values()):
+            pool.close()
+
+
+_transports = weakref.WeakKeyDictionary()
+
+
+def get_async_transport():
+    """
+    The transport shared by every async client running on the current event loop.
+    Stream connections belong to the loop that opened them, so each loop gets its
+    own pools. Only called from coroutines, where get_event_loop returns the
+    running loop on every Python 3 version supported.
+    """
+    loop = asyncio.get_event_loop()
+    if loop not in _transports:
+        _transports[loop] = AsyncPooledTransport()
+    return _transports[loop]
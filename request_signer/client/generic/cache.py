@@ -0,0 +1,92 @@
+import hashlib
+import threading
+from time import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+CachedResponse = namedtuple('CachedResponse', ['json', 'etag', 'fresh_until'])
+
+
+class ResponseCache(object):
+    """
+    Cache of GET response json for the REST clients, kept in the Django cache
+    named in SIGNATURE_CLIENT_CACHE_ALIAS.
+
+    A response is returned without asking the server for
+    SIGNATURE_CLIENT_CACHE_TIMEOUT seconds. After that it is kept for up to
+    SIGNATURE_CLIENT_CACHE_MAX_AGE seconds so it can be revalidated with its ETag.
+    Each process keeps at most SIGNATURE_CLIENT_CACHE_SIZE responses, dropping the
+    least recently used.
+    """
+
+    KEY_PREFIX = 'request_signer:response:'
+
+    def __init__(self):
+        self.timeout = getattr(settings, 'SIGNATURE_CLIENT_CACHE_TIMEOUT', 60)
+        self.max_age = max(getattr(settings, 'SIGNATURE_CLIENT_CACHE_MAX_AGE', 3600), self.timeout)
+        self.max_size = getattr(settings, 'SIGNATURE_CLIENT_CACHE_SIZE', 1024)
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'SIGNATURE_CLIENT_CACHE_ALIAS', 'default')]
+
+    def key(self, client_id, base_url, endpoint):
+        """
+        Responses are kept apart by client id and by the scheme, host and base path
+        of the API, so clients of different servers never share an entry.
+        """
+        url = base_url + endpoint
+        return self.KEY_PREFIX + hashlib.sha256('{} {}'.format(client_id, url).encode()).hexdigest()
+
+    def get(self, key):
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self._keys.pop(key, None)
+            else:
+                self._keys[key] = True
+                self._keys.move_to_end(key)
+        return entry
+
+    def set(self, key, json, etag=None):
+        self.cache.set(key, CachedResponse(json, etag, time() + self.timeout), self.max_age)
+        with self._lock:
+            self._keys[key] = True
+            self._keys.move_to_end(key)
+            evicted = [self._keys.popitem(last=False)[0] for _ in range(len(self._keys) - self.max_size)]
+        self.cache.delete_many(evicted)
+
+    def refresh(self, key, entry):
+        """
+        Serves ``entry`` for another timeout after the server said it hasn't changed.
+        """
+        self.set(key, entry.json, entry.etag)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._keys.pop(key, None)
+        self.cache.delete_many(keys)
+
+
+def is_fresh(entry):
+    return entry.fresh_until > time()
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    The response cache shared by every caching client in the process.
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
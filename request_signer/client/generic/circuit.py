@@ -0,0 +1,97 @@
+import threading
+from time import time
+
+from request_signer import metrics
+from request_signer.client.generic import WebException
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(WebException):
+    """
+    Raised instead of sending a request while its circuit is open.
+    """
+
+
+class CircuitBreaker(object):
+    """
+    Fails fast once ``failure_threshold`` requests in a row have failed. After
+    ``reset_timeout`` seconds one trial request is let through: the circuit
+    closes again when it succeeds and stays open for another ``reset_timeout``
+    when it fails. State changes are recorded with the configured metrics.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self._trial_sent = False
+        self._lock = threading.Lock()
+
+    def check(self):
+        """
+        :raises CircuitOpenError:
+            When the request should not be sent.
+        """
+        with self._lock:
+            if self.state == OPEN and time() - self.opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+                self._trial_sent = False
+            if self.state == OPEN or (self.state == HALF_OPEN and self._trial_sent):
+                raise CircuitOpenError('Circuit {} is open'.format(self.name))
+            self._trial_sent = self.state == HALF_OPEN
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time()
+                if self.state != OPEN:
+                    self._transition(OPEN)
+
+    def _transition(self, state):
+        metrics.get_metrics().record_circuit_transition(self.name, self.state, state)
+        self.state = state
+
+
+class NullCircuitBreaker(object):
+    """
+    Used when a client has no failure threshold. Never opens.
+    """
+
+    def check(self):
+        pass
+
+    def record_success(self):
+        pass
+
+    def record_failure(self):
+        pass
+
+
+NO_CIRCUIT_BREAKER = NullCircuitBreaker()
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name, failure_threshold, reset_timeout):
+    """
+    The circuit breaker shared by every request to ``name`` in the process.
+    """
+    if not failure_threshold:
+        return NO_CIRCUIT_BREAKER
+    with _circuit_breakers_lock:
+        if name not in _circuit_breakers:
+            _circuit_breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+        return _circuit_breakers[name]
@@ -0,0 +1,133 @@
+import codecs
+import json
+import re
+
+from django.conf import settings
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class IncrementalJsonReader(object):
+    """
+    Decodes json from a file like ``read`` one value at a time, reading
+    SIGNATURE_CLIENT_STREAM_CHUNK_SIZE bytes at a time. Only the undecoded tail
+    of the body is kept in memory.
+    """
+
+    def __init__(self, read, chunk_size=None):
+        self.read = read
+        self.chunk_size = chunk_size or getattr(settings, 'SIGNATURE_CLIENT_STREAM_CHUNK_SIZE', 64 * 1024)
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+
+    def fill(self):
+        """
+        Reads another chunk onto the buffer, dropping what was already decoded.
+
+        :returns:
+            False at the end of the body.
+        """
+        chunk = self.read(self.chunk_size)
+        if not chunk:
+            self.text_decoder.decode(b'', final=True)
+            return False
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        :returns:
+            The next character that isn't whitespace, or '' at the end of the body.
+        """
+        self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+        while self.pos == len(self.buffer) and self.fill():
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+        return self.buffer[self.pos:self.pos + 1]
+
+    def decode_value(self):
+        """
+        Decodes the value at the current position. A value running to the end of
+        the buffer is decoded again once more has been read, since a number can be
+        cut off between chunks.
+        """
+        self.peek()
+        value, end = self._raw_decode()
+        while end == len(self.buffer) and self.fill():
+            value, end = self._raw_decode()
+        self.pos = end
+        return value
+
+    def _raw_decode(self):
+        while True:
+            try:
+                return self.json_decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if not self.fill():
+                    raise
+
+    def iter_array(self):
+        """
+        Yields the items of the array at the start of the body as each is decoded.
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            return
+        while True:
+            yield self.decode_value()
+            if self.expect(',', ']') == ']':
+                return
+
+    def iter_results(self):
+        """
+        Yields the items of the ``results`` array of the object at the start of the
+        body as each is decoded, skipping over its other members.
+        """
+        self.expect('{')
+        closed = self.peek() == '}'
+        while not closed:
+            for item in self._member_results():
+                yield item
+            closed = self.expect(',', '}') == '}'
+
+    def _member_results(self):
+        """
+        Decodes the name of the next member of an object, and returns the items of
+        its value when it is the ``results`` array. Any other value is decoded and
+        dropped, and nothing is returned for it.
+        """
+        name = self.decode_value()
+        self.expect(':')
+        if name == 'results' and self.peek() == '[':
+            return self.iter_array()
+        self.decode_value()
+        return iter(())
+
+    def expect(self, *chars):
+        char = self.peek()
+        if char not in chars or not char:
+            raise ValueError('Expecting {} at char {}'.format(' or '.join(chars), self.pos))
+        self.pos += 1
+        return char
+
+
+def iter_items(read, chunk_size=None):
+    """
+    Yields the items of a json array body, or of the ``results`` of a paginated
+    object body, as they arrive.
+
+    :raises ValueError:
+        When the body is neither, or isn't valid json.
+    """
+    reader = IncrementalJsonReader(read, chunk_size)
+    char = reader.peek()
+    if char == '[':
+        items = reader.iter_array()
+    elif char:
+        items = reader.iter_results()
+    else:
+        items = iter(())
+    for item in items:
+        yield item
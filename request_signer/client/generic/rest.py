@@ -1,4 +1,26 @@
-from request_signer.client.generic import Client, WebException, django_backend
+import json
+import random
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from generic_request_signer.client import json_encoder
+from six.moves import http_client
+
+from request_signer import compression, constants
+from request_signer.client.generic import (
+    Client, Response, WebException, cache, circuit, django_backend, json_stream, transport
+)
+
+JSON_CONTENT_TYPES = ["application/json", "application/vnd.api+json"]
+BULK_HEADERS = {"Accept": "application/json", "Content-Type": "application/json"}
+BULK_UNSUPPORTED_STATUSES = (404, 405)
+NO_BULK_ENDPOINT = object()
+RETRY_METHODS = ("GET", "HEAD")
+RETRY_STATUSES = (502, 503, 504)
+RETRY_ERRORS = (OSError, http_client.HTTPException)
 
 
 class BaseDjangoRestClient(Client):
@@ -18,8 +40,61 @@ class BaseDjangoRestClient(Client):
     anything other than "POST" really. So, for anything other than a GET or POST
     we need to add a "_method=PUT" or equivalent, which is how the django rest framework
     gets around this issue, but still uses full rest methods.
+
+    Set ``use_connection_pool = True`` to send requests over keep-alive
+    connections shared by every pooled client in the process, instead of
+    opening a new connection for every call.
+
+    The ``*_many`` methods sign every request up front and send them over up to
+    ``batch_workers`` threads at once.
+
+    Set ``cache_responses = True`` to cache what get_list and get_item return,
+    revalidating with the response ETag once the cached copy is stale. Writes
+    through create, update and delete drop the cached group and item.
+
+    The ``bulk_*`` methods send a request per item, concurrently. Set
+    ``supports_bulk = True`` for servers with bulk endpoints, and they send
+    ``bulk_batch_size`` items per signed request to the group endpoint instead:
+      POST   /api/endpoint/<item_list_key>/                 # json list of items to create
+      PUT    /api/endpoint/<item_list_key>/                 # json list of items to update
+      DELETE /api/endpoint/<item_list_key>/?ids=<key>&...   # items to delete
+    Every item of a bulk update carries its item key in ``bulk_lookup_field``.
+    Batches the server answers with a 404 or 405 are sent again one request per
+    item. Bulk is off by default because a plain DRF list endpoint answers a
+    POSTed list with a 400, which can't be told apart from invalid items.
+
+    Every request waits up to ``read_timeout`` seconds for the server, and pooled
+    connections up to ``connect_timeout`` seconds to connect. GETs that fail to
+    connect, time out or get a 502, 503 or 504 are retried ``retries`` times,
+    backing off exponentially from ``retry_backoff`` seconds with full jitter.
+    With a ``circuit_failure_threshold``, requests to a host fail fast with
+    CircuitOpenError once that many in a row have failed, for
+    ``circuit_reset_timeout`` seconds at a time.
+
+    Set ``compress_requests`` to "gzip", "deflate" or "zstd" to compress request
+    bodies of at least ``compress_min_size`` bytes after they have been signed.
+    Set ``accept_compressed_responses = True`` to ask for compressed responses,
+    which are decoded as they are read. The raw response of every Response then
+    counts the bytes received in ``wire_bytes`` and decoded in ``decoded_bytes``.
     """
 
+    use_connection_pool = False
+    batch_workers = 8
+    cache_responses = False
+    supports_bulk = False
+    bulk_batch_size = 100
+    bulk_lookup_field = "id"
+    connect_timeout = None
+    read_timeout = 15
+    retries = 0
+    retry_backoff = 0.1
+    retry_backoff_max = 2
+    circuit_failure_threshold = 0
+    circuit_reset_timeout = 30
+    compress_requests = None
+    compress_min_size = 1024
+    accept_compressed_responses = False
+
     def __init__(self, api_credentials=None):
         api_credentials = api_credentials or django_backend.DjangoSettingsApiCredentialsBackend(self)
         super(BaseDjangoRestClient, self).__init__(api_credentials)
@@ -32,10 +107,203 @@ class BaseDjangoRestClient(Client):
             endpoint += "{item_key}/".format(item_key=item_key)
         return endpoint
 
+    def _get_response(self, http_method, endpoint, data=None, files=None, timeout=None, **request_kwargs):
+        request = self._build_request(http_method, endpoint, data, files, **request_kwargs)
+        return self._send(request, timeout)
+
+    def _build_request(self, http_method, endpoint, data=None, files=None, **request_kwargs):
+        headers = request_kwargs.get("headers", {})
+        if not isinstance(data, str) and headers.get("Content-Type") in JSON_CONTENT_TYPES:
+            data = json.dumps(data, default=json_encoder)
+        request = self._compress(self._get_request(http_method, endpoint, data, files, **request_kwargs))
+        if self.accept_compressed_responses:
+            request.add_header("Accept-Encoding", compression.ACCEPT_ENCODING)
+        return request
+
+    def _compress(self, request):
+        """
+        Compresses the body of an already signed request, so the signature stays
+        over the uncompressed body the server decompresses before checking it.
+        """
+        if self.compress_requests and request.data and len(request.data) >= self.compress_min_size:
+            request.data = compression.compress(request.data, self.compress_requests)
+            request.add_header("Content-Encoding", self.compress_requests)
+        return request
+
+    def _send(self, request, timeout=None):
+        """
+        Sends an already signed request through the host's circuit breaker,
+        retrying it when it is idempotent.
+        """
+        breaker = self._get_circuit_breaker(request)
+        breaker.check()
+        try:
+            r = self._send_with_retries(request, timeout or self.read_timeout)
+        except Exception:
+            breaker.record_failure()
+            raise
+        self._record_outcome(breaker, r)
+        return r
+
+    def _send_with_retries(self, request, timeout):
+        for attempt in range(1, self._attempts(request)):
+            r = self._try_send(request, timeout)
+            if r is not None and r.status_code not in RETRY_STATUSES:
+                return r
+            self._discard(r)
+            time.sleep(self._backoff(attempt))
+        return self._send_once(request, timeout)
+
+    def _discard(self, r):
+        """
+        Closes a response that is about to be retried, so its connection isn't left open.
+        """
+        if r is not None:
+            r.raw_response.close()
+
+    def _try_send(self, request, timeout):
+        """
+        :returns:
+            The response, or None when sending failed in a way worth retrying.
+        """
+        try:
+            return self._send_once(request, timeout)
+        except RETRY_ERRORS:
+            return None
+
+    def _send_once(self, request, timeout):
+        """
+        Sends the request once, over the shared connection pool when
+        ``use_connection_pool`` is set.
+        """
+        if self.use_connection_pool:
+            return self._response(transport.get_pooled_transport().open(request, timeout, self.connect_timeout))
+        try:
+            http_response = urllib.request.urlopen(request, timeout=timeout)
+        except urllib.request.HTTPError as e:
+            http_response = e
+        return self._response(http_response)
+
+    def _response(self, http_response):
+        if self.accept_compressed_responses:
+            http_response = transport.DecodedResponse(http_response)
+        return Response(http_response)
+
+    def _attempts(self, request):
+        return self.retries + 1 if request.get_method() in RETRY_METHODS else 1
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.retry_backoff_max, self.retry_backoff * 2 ** (attempt - 1)))
+
+    def _get_circuit_breaker(self, request):
+        return circuit.get_circuit_breaker(
+            "{} {}".format(type(self).__name__, request.host),
+            self.circuit_failure_threshold, self.circuit_reset_timeout,
+        )
+
+    def _record_outcome(self, breaker, r):
+        if r.status_code // 100 == 5:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
     def _get_json_response(self, http_method, endpoint, data=None):
         headers = {"Accept": "application/json"}
         return self._get_response(http_method, endpoint, data, headers=headers)
 
+    def _get_json_request(self, http_method, endpoint, data=None):
+        return self._build_request(http_method, endpoint, data, headers={"Accept": "application/json"})
+
+    def _json_unless_error(self, r):
+        """
+        Returns the response json, treating a 404 as an empty result rather than an error.
+        """
+        if not r.is_successful and r.status_code != 404:
+            raise WebException(r.read())
+        return r.json
+
+    def _get_cached_json(self, endpoint):
+        """
+        GETs the endpoint's json through the response cache. A fresh cached copy
+        is returned as is, a stale one is sent along as If-None-Match and reused
+        when the server answers 304 Not Modified. 404s are never cached.
+        """
+        key, entry = self._get_cache_entry(endpoint)
+        if entry and cache.is_fresh(entry):
+            return entry.json
+        r = self._get_response("GET", endpoint, headers=self._revalidation_headers(entry))
+        return self._cache_response(key, entry, r)
+
+    def _get_cache_entry(self, endpoint):
+        response_cache = cache.get_response_cache()
+        key = response_cache.key(self._client_id, self._base_url, endpoint)
+        return key, response_cache.get(key)
+
+    def _revalidation_headers(self, entry):
+        headers = {"Accept": "application/json"}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        return headers
+
+    def _cache_response(self, key, entry, r):
+        """
+        :returns:
+            The json of the response, or of the cached entry when the server
+            answered 304 Not Modified, storing it for next time.
+        """
+        response_cache = cache.get_response_cache()
+        if entry and r.status_code == 304:
+            r.raw_response.close()
+            response_cache.refresh(key, entry)
+            return entry.json
+        result = self._json_unless_error(r)
+        if r.is_successful:
+            response_cache.set(key, result, r.raw_response.headers.get("ETag"))
+        return result
+
+    def _invalidate_cached(self, group_key, item_key=None):
+        if self.cache_responses:
+            response_cache = cache.get_response_cache()
+            endpoints = [self.build_endpoint(group_key)]
+            if item_key:
+                endpoints.append(self.build_endpoint(group_key, item_key))
+            response_cache.delete(*[
+                response_cache.key(self._client_id, self._base_url, endpoint) for endpoint in endpoints
+            ])
+
+    def _json_or_raise(self, r):
+        if not r.is_successful:
+            raise WebException(r.read())
+        return r.json
+
+    def _send_many(self, requests, handle=None):
+        """
+        :param requests:
+            Ordered dict of signed requests by key.
+        :param handle:
+            Turns each response into its result, raising when it failed. Defaults
+            to _json_unless_error.
+
+        :returns:
+            Two ordered dicts by key: the json of successful responses, and the
+            exception raised for the rest.
+        """
+        handle = handle or self._json_unless_error
+        results, errors = OrderedDict(), OrderedDict()
+        if not requests:
+            return results, errors
+        with ThreadPoolExecutor(max_workers=min(self.batch_workers, len(requests))) as executor:
+            futures = OrderedDict(
+                (key, executor.submit(lambda request: handle(self._send(request)), request))
+                for key, request in requests.items()
+            )
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    errors[key] = e
+        return results, errors
+
     def get_list(self, group_key):
         """
         :param group_key:
@@ -47,10 +315,111 @@ class BaseDjangoRestClient(Client):
             an empty list is returned instead of an exception
         """
         endpoint = self.build_endpoint(group_key)
+        if self.cache_responses:
+            return self._get_cached_json(endpoint)
         r = self._get_json_response("GET", endpoint)
-        if not r.is_successful and r.status_code != 404:
-            raise WebException(r.read())
-        return r.json
+        return self._json_unless_error(r)
+
+    def get_list_many(self, group_keys):
+        """
+        :param group_keys:
+            The keys to the groups of items desired (eg. company ids)
+
+        :returns:
+            Two dicts keyed by group key: the list of items for every group that
+            was fetched, 404s included as in get_list, and the exception raised
+            for every group that failed.
+        """
+        requests = OrderedDict(
+            (group_key, self._get_json_request("GET", self.build_endpoint(group_key))) for group_key in group_keys
+        )
+        return self._send_many(requests)
+
+    def stream_list(self, group_key):
+        """
+        :param group_key:
+            The key to the group of items desired (eg. company_id)
+
+        :returns:
+            Generator over the items get_list would return, each decoded as soon as
+            it has been read from the connection. Nothing is yielded for a 404.
+        """
+        r = self._get_json_response("GET", self.build_endpoint(group_key))
+        try:
+            if not r.is_successful:
+                self._json_unless_error(r)
+                return
+            for item in json_stream.iter_items(r.raw_response.read):
+                yield item
+        finally:
+            r.raw_response.close()
+
+    def iter_list(self, group_key, page_size=100):
+        """
+        :param group_key:
+            The key to the group of items desired (eg. company_id)
+        :param page_size:
+            Sent as the ``limit`` of every page request.
+
+        :returns:
+            Generator over the group's items, fetched one page at a time. DRF
+            paginated responses are followed through their ``next`` links. Plain
+            list responses are treated as limit/offset pages, and a page shorter
+            than ``page_size``, or the same as the page before it from a server
+            that ignores limit and offset, is the last one. The next page is
+            fetched in the background while the current one is consumed, so at
+            most three pages are held in memory.
+        """
+        next_page, items = (self.build_endpoint(group_key), {"limit": page_size}), None
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._get_page, *next_page)
+            while future is not None:
+                items, next_page = self._parse_page(future.result(), next_page, page_size, items)
+                future = executor.submit(self._get_page, *next_page) if next_page else None
+                for item in items:
+                    yield item
+
+    def _get_page(self, endpoint, params):
+        r = self._get_json_response("GET", endpoint, params)
+        return self._json_unless_error(r)
+
+    def _parse_page(self, page, current_page, page_size, previous_items=None):
+        """
+        :param previous_items:
+            The items of the page before, so a plain list served again whatever
+            the offset isn't paged through forever.
+
+        :returns:
+            The page's items, and the endpoint and params of the next page or None
+            when this is the last one.
+        """
+        if isinstance(page, dict):
+            return page.get("results", []), self._next_link_page(page.get("next"))
+        if page == previous_items:
+            return [], None
+        if len(page) != page_size:
+            return page, None
+        endpoint, params = current_page
+        return page, (endpoint, dict(params, offset=params.get("offset", 0) + len(page)))
+
+    def _next_link_page(self, next_link):
+        """
+        Splits a DRF ``next`` link into an endpoint and query params to sign again,
+        dropping the previous page's client id and signature. The base url's path
+        is cut off exactly as it was joined on, trailing slash included, so the
+        endpoint joins back onto the base url to the same url.
+        """
+        if not next_link:
+            return None
+        url = urllib.parse.urlsplit(next_link)
+        base_path = urllib.parse.urlsplit(self._base_url).path
+        endpoint = url.path[len(base_path):] if url.path.startswith(base_path) else url.path
+        signing_params = (constants.CLIENT_ID_PARAM_NAME, constants.SIGNATURE_PARAM_NAME)
+        params = {}
+        for name, value in urllib.parse.parse_qsl(url.query, keep_blank_values=True):
+            if name not in signing_params:
+                params.setdefault(name, []).append(value)
+        return endpoint, params
 
     def get_item(self, group_key, item_key):
         """
@@ -63,10 +432,26 @@ class BaseDjangoRestClient(Client):
             Returns dictionary representation of item.
         """
         endpoint = self.build_endpoint(group_key, item_key)
+        if self.cache_responses:
+            return self._get_cached_json(endpoint)
         r = self._get_json_response("GET", endpoint)
-        if not r.is_successful and r.status_code != 404:
-            raise WebException(r.read())
-        return r.json
+        return self._json_unless_error(r)
+
+    def get_items_many(self, keys):
+        """
+        :param keys:
+            (group_key, item_key) pairs of the items desired
+
+        :returns:
+            Two dicts keyed by (group_key, item_key): the item for every pair that
+            was fetched, 404s included as in get_item, and the exception raised
+            for every pair that failed.
+        """
+        requests = OrderedDict(
+            ((group_key, item_key), self._get_json_request("GET", self.build_endpoint(group_key, item_key)))
+            for group_key, item_key in keys
+        )
+        return self._send_many(requests)
 
     def create(self, group_key, **attrs):
         """
@@ -81,6 +466,7 @@ class BaseDjangoRestClient(Client):
         """
         endpoint = self.build_endpoint(group_key)
         r = self._get_json_response("POST", endpoint, data=attrs)
+        self._invalidate_cached(group_key)
         if not r.is_successful:
             raise WebException(r.read())
         return r.json
@@ -101,6 +487,7 @@ class BaseDjangoRestClient(Client):
         endpoint = self.build_endpoint(group_key, item_key)
         attrs["_method"] = "PUT"
         r = self._get_json_response("POST", endpoint, data=attrs)
+        self._invalidate_cached(group_key, item_key)
         if not r.is_successful:
             raise WebException(r.read())
         return r.json
@@ -119,6 +506,164 @@ class BaseDjangoRestClient(Client):
         endpoint = self.build_endpoint(group_key, item_key)
         attrs = {"_method": "DELETE"}
         r = self._get_json_response("POST", endpoint, data=attrs)
+        self._invalidate_cached(group_key, item_key)
         if not r.is_successful and r.status_code != 404:
             raise WebException(r.read())
         return r.json
+
+    def bulk_create(self, group_key, items, batch_size=None):
+        """
+        :param group_key:
+            The key to the group of items desired (eg. company_id)
+        :param items:
+            Attributes of every item to create, as for create.
+        :param batch_size:
+            Items per request, bulk_batch_size by default.
+
+        :returns:
+            Two ordered dicts keyed by the position of each item in ``items``: the
+            json of every item created, and the exception for every item that wasn't.
+        """
+        items = list(items)
+        endpoint = self.build_endpoint(group_key)
+        keys = list(range(len(items)))
+        batches = self._bulk_batches(keys, batch_size, lambda batch: self._build_request(
+            "POST", endpoint, [items[key] for key in batch], headers=BULK_HEADERS
+        ))
+        return self._send_bulk(keys, batches, lambda keys: OrderedDict(
+            (key, self._get_json_request("POST", endpoint, items[key])) for key in keys
+        ), self._json_or_raise, group_key)
+
+    def bulk_update(self, group_key, items, batch_size=None):
+        """
+        :param group_key:
+            The key to the group of items desired (eg. company_id)
+        :param items:
+            Dict, or (item_key, attrs) pairs, of the attributes to update every
+            item with, as for update. In bulk requests every item's attributes
+            are sent with its key in ``bulk_lookup_field``.
+        :param batch_size:
+            Items per request, bulk_batch_size by default.
+
+        :returns:
+            Two ordered dicts keyed by item key: the json of every item updated, and
+            the exception for every item that wasn't.
+        """
+        items = OrderedDict(items)
+        batches = self._bulk_batches(list(items), batch_size, lambda batch: self._build_request(
+            "PUT", self.build_endpoint(group_key),
+            [dict(items[key], **{self.bulk_lookup_field: key}) for key in batch], headers=BULK_HEADERS
+        ))
+        return self._send_bulk(list(items), batches, lambda keys: OrderedDict(
+            (key, self._get_json_request("POST", self.build_endpoint(group_key, key), dict(items[key], _method="PUT")))
+            for key in keys
+        ), self._json_or_raise, group_key, list(items))
+
+    def bulk_delete(self, group_key, item_keys, batch_size=None):
+        """
+        :param group_key:
+            The key to the group of items desired (eg. company_id)
+        :param item_keys:
+            The keys of the items to delete.
+        :param batch_size:
+            Items per request, bulk_batch_size by default.
+
+        :returns:
+            Two ordered dicts keyed by item key: the json response for every item
+            deleted, 404s included as in delete, and the exception for every item
+            that wasn't.
+        """
+        item_keys = list(item_keys)
+        batches = self._bulk_batches(item_keys, batch_size, lambda batch: self._get_json_request(
+            "DELETE", self.build_endpoint(group_key), {"ids": list(batch)}
+        ))
+        return self._send_bulk(item_keys, batches, lambda keys: OrderedDict(
+            (key, self._get_json_request("POST", self.build_endpoint(group_key, key), {"_method": "DELETE"}))
+            for key in keys
+        ), self._json_unless_error, group_key, item_keys)
+
+    def _invalidate_cached_items(self, group_key, item_keys=()):
+        self._invalidate_cached(group_key)
+        for item_key in item_keys:
+            self._invalidate_cached(group_key, item_key)
+
+    def _bulk_batches(self, keys, batch_size, build_request):
+        """
+        :returns:
+            Ordered dict of a signed bulk request for every batch of keys, by the
+            tuple of keys in it. Empty when the server doesn't support bulk requests.
+        """
+        batches = OrderedDict()
+        if self.supports_bulk:
+            batch_size = batch_size or self.bulk_batch_size
+            for start in range(0, len(keys), batch_size):
+                batch = tuple(keys[start:start + batch_size])
+                batches[batch] = build_request(batch)
+        return batches
+
+    def _send_bulk(self, keys, batches, item_requests, handle, group_key, item_keys=()):
+        """
+        Sends the bulk requests, then a request per item for every key the bulk
+        requests didn't cover. The cached group and items are dropped once every
+        request has been answered, so a concurrent read can't cache them again
+        from before the writes.
+
+        :param item_requests:
+            Returns an ordered dict of signed per item requests for the keys given.
+        :param handle:
+            Turns a per item response into its result, raising when it failed.
+
+        :returns:
+            Two ordered dicts by key, in the order of ``keys``: results and errors.
+        """
+        try:
+            results, errors = self._bulk_outcomes(*self._send_many(batches, self._bulk_json))
+            remaining = [key for key in keys if key not in results and key not in errors]
+            item_results, item_errors = self._send_many(item_requests(remaining), handle)
+        finally:
+            self._invalidate_cached_items(group_key, item_keys)
+        return self._in_order(keys, results, item_results), self._in_order(keys, errors, item_errors)
+
+    def _bulk_json(self, r):
+        if r.status_code in BULK_UNSUPPORTED_STATUSES:
+            r.raw_response.close()
+            return NO_BULK_ENDPOINT
+        return self._json_or_raise(r)
+
+    def _bulk_outcomes(self, responses, batch_errors):
+        """
+        :returns:
+            Results and errors by item key, leaving out the items of batches the
+            server has no bulk endpoint for.
+        """
+        results, errors = OrderedDict(), OrderedDict()
+        for batch, error in batch_errors.items():
+            errors.update((key, error) for key in batch)
+        for batch, json_response in responses.items():
+            if json_response is not NO_BULK_ENDPOINT:
+                self._split_bulk_response(batch, json_response, results, errors)
+        return results, errors
+
+    def _split_bulk_response(self, batch, json_response, results, errors):
+        try:
+            results.update(zip(batch, self._bulk_items(json_response, len(batch))))
+        except WebException as e:
+            errors.update((key, e) for key in batch)
+
+    def _bulk_items(self, json_response, count):
+        """
+        Splits a bulk response into the result of every item: a list with an entry
+        per item is split in order, and an empty body gives every item an empty
+        result, as delete does.
+
+        :raises WebException:
+            For any other response, which doesn't say how each item went.
+        """
+        if json_response == {}:
+            return [{}] * count
+        if isinstance(json_response, list) and len(json_response) == count:
+            return json_response
+        raise WebException("Bulk response has no result per item: {!r}".format(json_response)[:500])
+
+    def _in_order(self, keys, *outcomes):
+        return OrderedDict((key, outcome[key]) for key in keys for outcome in outcomes if key in outcome)
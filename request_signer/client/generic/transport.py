@@ -0,0 +1,265 @@
+import select
+import ssl
+import threading
+import time
+
+from six.moves import http_client
+
+from django.conf import settings
+
+from request_signer import compression
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_IDLE_TIMEOUT = 60
+STALE_CONNECTION_ERRORS = (http_client.BadStatusLine, ConnectionError)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE')
+
+
+class PooledResponse(object):
+    """
+    File like response that hands its connection back to the pool once the
+    body has been read to the end, straight away when there is no body, or when
+    it is closed. Has the ``code`` and ``read`` the generic Response expects from
+    urllib responses.
+    """
+
+    def __init__(self, response, release):
+        self.response = response
+        self.code = response.status
+        self.headers = response.msg
+        self._release = release
+        if response.length == 0:
+            response.close()
+            self.release()
+
+    def read(self, amt=None):
+        data = self.response.read() if amt is None else self.response.read(amt)
+        if amt is None or not data:
+            self.release()
+        return data
+
+    def release(self):
+        if self._release is not None:
+            release, self._release = self._release, None
+            release(reusable=not self.response.will_close)
+
+    def close(self):
+        """
+        Drops the connection when the body wasn't read to the end.
+        """
+        if self._release is not None:
+            self.response.close()
+            release, self._release = self._release, None
+            release(reusable=False)
+
+    def getheader(self, name, default=None):
+        return self.response.getheader(name, default)
+
+
+class DecodedResponse(object):
+    """
+    File like response that decodes a compressed body as it is read, by its
+    Content-Encoding. Counts the bytes read off the wire in ``wire_bytes`` and the
+    decoded bytes in ``decoded_bytes``. Decoded bytes wait in a bytearray that is
+    appended to and consumed from the front in place, so reading a body in small
+    pieces stays linear in its size.
+    """
+
+    def __init__(self, response, chunk_size=64 * 1024):
+        self.response = response
+        self.code = response.code
+        self.headers = response.headers
+        self.chunk_size = chunk_size
+        self.decompressor = compression.stream_decompressor(response.headers.get('Content-Encoding'))
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self._buffer = bytearray()
+        self._eof = False
+
+    def read(self, amt=None):
+        while not self._eof and (amt is None or len(self._buffer) < amt):
+            self._decode_chunk()
+        amt = len(self._buffer) if amt is None else amt
+        data = bytes(self._buffer[:amt])
+        del self._buffer[:amt]
+        return data
+
+    def _decode_chunk(self):
+        chunk = self.response.read(self.chunk_size)
+        self._eof = not chunk
+        decoded = self.decompressor.decompress(chunk) if chunk else self.decompressor.flush()
+        self.wire_bytes += len(chunk)
+        self.decoded_bytes += len(decoded)
+        self._buffer += decoded
+
+    def close(self):
+        self.response.close()
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+
+class ConnectionPool(object):
+    """
+    Keeps up to ``max_size`` idle keep-alive connections to one host. A connection
+    idle for longer than ``idle_timeout`` seconds is closed instead of reused.
+    Connections are only held by one request at a time, so a pool can be shared
+    by every thread in the process.
+    """
+
+    def __init__(self, scheme, host, max_size, idle_timeout):
+        self.scheme = scheme
+        self.host = host
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, timeout, connect_timeout=None):
+        """
+        :returns:
+            A connection and whether it was reused from the pool.
+        """
+        connection = self._pop_idle()
+        if connection is None:
+            return self.new_connection(timeout, connect_timeout), False
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        with self._lock:
+            self.reused += 1
+        return connection, True
+
+    def _pop_idle(self):
+        now = time.time()
+        with self._lock:
+            while self._idle:
+                connection, idle_since = self._idle.pop()
+                if now - idle_since < self.idle_timeout and not self._was_dropped(connection):
+                    return connection
+                connection.close()
+
+    def _was_dropped(self, connection):
+        """
+        An idle keep-alive connection has nothing to read, so a readable socket
+        means the server closed it.
+        """
+        if connection.sock is None:
+            return False
+        return bool(select.select([connection.sock], [], [], 0)[0])
+
+    def new_connection(self, timeout, connect_timeout=None):
+        """
+        Opens a connection that waits up to ``connect_timeout`` seconds to connect,
+        when given, and ``timeout`` seconds for every read after that.
+        """
+        with self._lock:
+            self.created += 1
+        if self.scheme == 'https':
+            connection = http_client.HTTPSConnection(
+                self.host, timeout=connect_timeout or timeout, context=ssl.create_default_context()
+            )
+        else:
+            connection = http_client.HTTPConnection(self.host, timeout=connect_timeout or timeout)
+        if connect_timeout:
+            connection.connect()
+            connection.sock.settimeout(timeout)
+        return connection
+
+    def release(self, connection, reusable=True):
+        with self._lock:
+            if reusable and len(self._idle) < self.max_size:
+                self._idle.append((connection, time.time()))
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            connection.close()
+
+
+class PooledTransport(object):
+    """
+    Sends urllib requests over keep-alive connections kept in one pool per
+    scheme, host and port. Pool size and idle timeout come from
+    SIGNATURE_CLIENT_POOL_SIZE and SIGNATURE_CLIENT_POOL_IDLE_TIMEOUT.
+    """
+
+    def __init__(self, max_size=None, idle_timeout=None):
+        self.max_size = max_size or getattr(settings, 'SIGNATURE_CLIENT_POOL_SIZE', DEFAULT_POOL_SIZE)
+        self.idle_timeout = idle_timeout or getattr(
+            settings, 'SIGNATURE_CLIENT_POOL_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT
+        )
+        self.pools = {}
+        self._lock = threading.Lock()
+
+    def get_pool(self, scheme, host):
+        """
+        :param host:
+            Host name, with the port when it isn't the scheme's default.
+        """
+        with self._lock:
+            if (scheme, host) not in self.pools:
+                self.pools[(scheme, host)] = ConnectionPool(scheme, host, self.max_size, self.idle_timeout)
+            return self.pools[(scheme, host)]
+
+    def open(self, request, timeout, connect_timeout=None):
+        """
+        Sends the urllib request and returns a PooledResponse for any status code.
+        An idempotent request on a reused connection the server already closed is
+        sent once more on a new one. Other requests may already have been
+        processed, so they are not.
+        """
+        pool = self.get_pool(request.type, request.host)
+        connection, reused = pool.acquire(timeout, connect_timeout)
+        try:
+            response = self._send_or_close(connection, request)
+        except STALE_CONNECTION_ERRORS:
+            if not reused or request.get_method() not in IDEMPOTENT_METHODS:
+                raise
+            connection = pool.new_connection(timeout, connect_timeout)
+            response = self._send_or_close(connection, request)
+        return PooledResponse(response, lambda reusable: pool.release(connection, reusable))
+
+    def _send_or_close(self, connection, request):
+        """
+        Closes the connection when sending or reading the response head fails
+        in any way, timeouts included, since it can't carry another request.
+        """
+        try:
+            return self._send(connection, request)
+        except BaseException:
+            connection.close()
+            raise
+
+    def _send(self, connection, request):
+        headers = dict(request.header_items())
+        if request.data is not None and 'Content-type' not in headers:
+            headers['Content-type'] = 'application/x-www-form-urlencoded'
+        connection.request(request.get_method(), request.selector, request.data, headers)
+        return connection.getresponse()
+
+    def close(self):
+        with self._lock:
+            pools = list(self.pools.values())
+        for pool in pools:
+            pool.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_pooled_transport():
+    """
+    The transport shared by every pooled client in the process.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = PooledTransport()
+        return _transport
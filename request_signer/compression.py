@@ -0,0 +1,145 @@
+import gzip
+import io
+import zlib
+
+from django.conf import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MAX_DECOMPRESSED_SIZE = 10 * 1024 * 1024
+
+
+class DecompressionError(ValueError):
+    pass
+
+
+def zlib_decompressor(wbits):
+    def decompress(data, max_size):
+        decompressor = zlib.decompressobj(wbits)
+        body = decompressor.decompress(data, max_size + 1)
+        if len(body) > max_size:
+            raise DecompressionError('Decompressed body is larger than {} bytes'.format(max_size))
+        if not decompressor.eof:
+            raise DecompressionError('Compressed body is truncated')
+        return body
+    return decompress
+
+
+def zstd_decompress(data, max_size):
+    body = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read(max_size + 1)
+    if len(body) > max_size:
+        raise DecompressionError('Decompressed body is larger than {} bytes'.format(max_size))
+    return body
+
+
+COMPRESSORS = {'gzip': gzip.compress, 'deflate': zlib.compress}
+DECOMPRESSORS = {'gzip': zlib_decompressor(16 + zlib.MAX_WBITS), 'deflate': zlib_decompressor(zlib.MAX_WBITS)}
+DECOMPRESSION_ERRORS = (zlib.error, )
+if zstandard is not None:
+    COMPRESSORS['zstd'] = lambda data: zstandard.ZstdCompressor().compress(data)
+    DECOMPRESSORS['zstd'] = zstd_decompress
+    DECOMPRESSION_ERRORS += (zstandard.ZstdError, )
+
+
+class IdentityDecompressor(object):
+
+    def decompress(self, data):
+        return data
+
+    def flush(self):
+        return b''
+
+
+class BrotliDecompressor(object):
+
+    def __init__(self):
+        self.decompressor = brotli.Decompressor()
+
+    def decompress(self, data):
+        return self.decompressor.process(data)
+
+    def flush(self):
+        return b''
+
+
+STREAM_DECOMPRESSORS = {
+    'identity': IdentityDecompressor,
+    'gzip': lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+    'deflate': zlib.decompressobj,
+}
+if zstandard is not None:
+    STREAM_DECOMPRESSORS['zstd'] = lambda: zstandard.ZstdDecompressor().decompressobj()
+if brotli is not None:
+    STREAM_DECOMPRESSORS['br'] = BrotliDecompressor
+
+ACCEPT_ENCODING = ', '.join(encoding for encoding in sorted(STREAM_DECOMPRESSORS) if encoding != 'identity')
+
+
+def stream_decompressor(encoding):
+    """
+    :returns:
+        An object whose ``decompress`` takes the body a chunk at a time, and whose
+        ``flush`` returns what is left once the body has ended.
+    """
+    encoding = (encoding or 'identity').strip().lower()
+    if encoding not in STREAM_DECOMPRESSORS:
+        raise DecompressionError('Unsupported content encoding {}'.format(encoding))
+    return STREAM_DECOMPRESSORS[encoding]()
+
+
+def compress(data, encoding):
+    """
+    :param encoding:
+        gzip, deflate, or zstd when the zstandard package is installed.
+    """
+    if encoding not in COMPRESSORS:
+        raise ValueError('Unsupported content encoding {}'.format(encoding))
+    return COMPRESSORS[encoding](data)
+
+
+def decompress(data, encoding, max_size):
+    """
+    :raises DecompressionError:
+        When the encoding isn't supported, the data is corrupt, or it decompresses
+        to more than ``max_size`` bytes.
+    """
+    if encoding not in DECOMPRESSORS:
+        raise DecompressionError('Unsupported content encoding {}'.format(encoding))
+    try:
+        return DECOMPRESSORS[encoding](data, max_size)
+    except DECOMPRESSION_ERRORS as e:
+        raise DecompressionError(str(e))
+
+
+def get_max_decompressed_size():
+    return getattr(settings, 'SIGNATURE_MAX_DECOMPRESSED_SIZE', DEFAULT_MAX_DECOMPRESSED_SIZE)
+
+
+def decompress_request(request):
+    """
+    Replaces a body sent with a Content-Encoding by the decompressed body, which
+    is what the client signed, so the signature check and the view both read it
+    as if it had been sent uncompressed.
+
+    :raises DecompressionError:
+        When the body can't be decompressed within SIGNATURE_MAX_DECOMPRESSED_SIZE.
+    """
+    encoding = request.META.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+    if encoding in ('', 'identity'):
+        return
+    body = decompress(request.body, encoding, get_max_decompressed_size())
+    request._body = body
+    request._stream = io.BytesIO(body)
+    request._read_started = False
+    for parsed in ('_post', '_files'):
+        request.__dict__.pop(parsed, None)
+    request.META['CONTENT_LENGTH'] = str(len(body))
+    del request.META['HTTP_CONTENT_ENCODING']
@@ -1,2 +1,4 @@
 CLIENT_ID_PARAM_NAME = '__client_id'
 SIGNATURE_PARAM_NAME = '__signature'
+TIMESTAMP_PARAM_NAME = '__timestamp'
+NONCE_PARAM_NAME = '__nonce'
@@ -0,0 +1,46 @@
+import functools
+
+from asgiref.sync import sync_to_async
+
+from request_signer import backends, dispatch, metrics, prechecks, ratelimit, replay
+
+
+def verification_is_cpu_only():
+    """
+    Whether every backend and receiver a verification can reach is in process.
+
+    The key backend, nonce store, rate limiter, dispatcher and metrics backend
+    each have a ``cpu_only`` attribute, or property, that is True only when
+    none of their methods called during verification touch the database, a
+    cache, the network or a lock another thread may hold for long. Async views
+    then verify signatures on the event loop instead of in a thread. A backend
+    without the attribute is assumed to do I/O, so custom backends stay safe.
+    """
+    parts = (
+        backends.get_key_backend(), replay.get_nonce_store(), ratelimit.get_rate_limiter(),
+        dispatch.get_dispatcher(), metrics.get_metrics(),
+    )
+    return prechecks.are_cpu_only() and all(getattr(part, 'cpu_only', False) for part in parts)
+
+
+def async_signature_required(func, rejected_response):
+    """
+    Wraps a coroutine view so the signature is verified without blocking the
+    event loop.
+
+    Django's ASGI handler has already buffered the body into a spooled file before
+    the view is called, so with the in process backends verification is CPU bound
+    and runs inline. When a backend or successful_signed_request receiver may use
+    the database, a cache or the network, verification runs through
+    ``sync_to_async`` instead, where the ORM is allowed.
+    """
+
+    @functools.wraps(func)
+    async def _wrap(request, *args, **kwargs):
+        if verification_is_cpu_only():
+            response = rejected_response(request)
+        else:
+            response = await sync_to_async(rejected_response)(request)
+        return response or await func(request, *args, **kwargs)
+
+    return _wrap
@@ -4,7 +4,14 @@ from django import http
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 
-from request_signer import validator
+from request_signer import ratelimit, validator
+
+try:
+    from asyncio import iscoroutinefunction
+    from request_signer.coroutines import async_signature_required
+except ImportError:
+    # asgiref ships with Django 3.0 and up, which are the versions with async views.
+    async_signature_required = None
 
 
 def signature_required(func):
@@ -16,7 +23,14 @@ def signature_required(func):
 
     :returns:
         A new view function wrapped to ensure it is properly signed.
+        Coroutine views are wrapped in a coroutine so they stay async; verification
+        moves to a thread when a configured backend or signal receiver may block.
     """
+    if async_signature_required and iscoroutinefunction(func):
+        _wrap = async_signature_required(func, rejected_response)
+        _wrap.csrf_exempt = True
+        _wrap.signature_required = True
+        return _wrap
 
     @csrf_exempt
     @functools.wraps(func)
@@ -26,16 +40,30 @@ def signature_required(func):
           - no signature
           - no client
           - signature doesnt match
+        and too many requests when the client is over its rate limit.
         """
-        if has_valid_signature(request) or allow_unsigned_requests():
-            return func(request, *args, **kwargs)
-        else:
-            return http.HttpResponseBadRequest()
+        return rejected_response(request) or func(request, *args, **kwargs)
 
     _wrap.signature_required = True
     return _wrap
 
 
+def rejected_response(request):
+    """
+    :returns:
+        The response to send instead of calling the view, or None when the view may run.
+    """
+    if not request_is_allowed(request):
+        return http.HttpResponseBadRequest()
+    if ratelimit.is_rate_limited(request):
+        return ratelimit.too_many_requests()
+    return None
+
+
+def request_is_allowed(request):
+    return has_valid_signature(request) or allow_unsigned_requests()
+
+
 def allow_unsigned_requests():
     return getattr(settings, 'ALLOW_UNSIGNED_REQUESTS', False)
 
@@ -45,4 +73,13 @@ def get_validator(request):
 
 
 def has_valid_signature(request):
-    return get_validator(request).has_valid_signature()
+    """
+    Verifies the signature at most once per request. The verdict is kept on the
+    request and the client id it was signed by is set as ``request.signed_client``
+    (None when the signature isn't valid), so stacked decorators, middleware and
+    permission classes reuse the first check.
+    """
+    if not hasattr(request, 'signed_client'):
+        validator = get_validator(request)
+        request.signed_client = validator.client_id if validator.has_valid_signature() else None
+    return request.signed_client is not None
@@ -0,0 +1,138 @@
+import logging
+import threading
+
+import six
+
+if six.PY3:
+    import queue
+else:
+    import Queue as queue
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from request_signer import loading
+from request_signer.signals import successful_signed_request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DISPATCHER = 'request_signer.dispatch.SynchronousDispatcher'
+DEFAULT_SINK = 'request_signer.dispatch.send_signals'
+
+
+def send_signals(payloads):
+    """
+    Default sink: sends successful_signed_request for every payload in the batch.
+    """
+    for payload in payloads:
+        successful_signed_request.send(**payload)
+
+
+class SynchronousDispatcher(object):
+    """
+    Sends successful_signed_request inside the request, as receivers would expect.
+    """
+
+    @property
+    def cpu_only(self):
+        """
+        Receivers may use the database or the network, so only a dispatcher
+        without receivers is safe to run on the event loop.
+        """
+        return not successful_signed_request.receivers
+
+    def dispatch(self, **payload):
+        successful_signed_request.send(**payload)
+
+
+class QueuedDispatcher(object):
+    """
+    Moves successful_signed_request off the request's critical path. Payloads go
+    onto a bounded queue drained by a background thread, which hands them to the
+    sink named in SIGNATURE_SIGNAL_SINK in batches of up to
+    SIGNATURE_SIGNAL_BATCH_SIZE.
+
+    When the queue is full the "drop" policy discards the payload straight away,
+    while "block" waits up to SIGNATURE_SIGNAL_QUEUE_TIMEOUT seconds for room before
+    discarding it. Receivers get the request after the response may have been
+    sent, so they should only read what was already loaded on it.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue(getattr(settings, 'SIGNATURE_SIGNAL_QUEUE_SIZE', 1000))
+        self.policy = getattr(settings, 'SIGNATURE_SIGNAL_QUEUE_POLICY', 'drop')
+        self.timeout = getattr(settings, 'SIGNATURE_SIGNAL_QUEUE_TIMEOUT', 0.1)
+        self.batch_size = getattr(settings, 'SIGNATURE_SIGNAL_BATCH_SIZE', 100)
+        self.sink = import_string(getattr(settings, 'SIGNATURE_SIGNAL_SINK', DEFAULT_SINK))
+        self.queued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+        self._worker = None
+        self._lock = threading.Lock()
+
+    @property
+    def cpu_only(self):
+        """
+        Queueing never blocks under the "drop" policy.
+        """
+        return self.policy == 'drop'
+
+    def dispatch(self, **payload):
+        self._ensure_worker()
+        try:
+            self.queue.put(payload, self.policy == 'block', self.timeout)
+        except queue.Full:
+            self._count('dropped')
+        else:
+            self._count('queued')
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._drain, name='request-signer-dispatch')
+                self._worker.daemon = True
+                self._worker.start()
+
+    def _drain(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get())
+            self._send(batch)
+
+    def _send(self, batch):
+        try:
+            self.sink(batch)
+            self._count('sent', len(batch))
+        except Exception:
+            self._count('errors', len(batch))
+            logger.exception('Failed sending %s successful_signed_request payloads', len(batch))
+        finally:
+            for _ in batch:
+                self.queue.task_done()
+
+    def flush(self):
+        """
+        Blocks until every queued payload has been handed to the sink.
+        """
+        self.queue.join()
+
+    def stats(self):
+        return {
+            'queued': self.queued,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'pending': self.queue.qsize(),
+        }
+
+
+def get_dispatcher():
+    return loading.get_configured('SIGNATURE_SIGNAL_DISPATCHER', DEFAULT_DISPATCHER)
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import AnonymousUser
+from rest_framework import authentication, exceptions, permissions, throttling
+
+from request_signer import constants, decorators, ratelimit
+
+
+class SignedRequestAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates requests signed by a known client. ``request.auth`` is the
+    client id and ``request.user`` is anonymous. Requests without a signature are
+    left to the next authentication class, and a signature that doesn't match
+    fails authentication.
+
+    The signature is checked once per request, so IsSignedRequest, the
+    signature_required decorator and SignatureMiddleware reuse the same check.
+
+    Failed and missing authentication are answered with a 401 and a
+    ``WWW-Authenticate: Signature`` header when this is the view's first
+    authentication class.
+    """
+
+    keyword = 'Signature'
+
+    def authenticate(self, request):
+        if not request.query_params.get(constants.SIGNATURE_PARAM_NAME):
+            return None
+        if not decorators.has_valid_signature(request._request):
+            raise exceptions.AuthenticationFailed('Invalid request signature.')
+        return AnonymousUser(), request._request.signed_client
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+
+class IsSignedRequest(permissions.BasePermission):
+    """
+    Allows signed requests, and unsigned ones when ALLOW_UNSIGNED_REQUESTS is on,
+    the same way the signature_required decorator does.
+    """
+
+    message = 'A valid request signature is required.'
+
+    def has_permission(self, request, view):
+        return decorators.request_is_allowed(request._request)
+
+
+class SignedClientRateThrottle(throttling.BaseThrottle):
+    """
+    Throttles clients authenticated by SignedRequestAuthentication to their
+    SIGNATURE_RATE_LIMITS quota, counted with the same limiter as
+    signature_required and SignatureMiddleware.
+    """
+
+    def allow_request(self, request, view):
+        return not ratelimit.is_rate_limited(request._request)
@@ -0,0 +1,32 @@
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+_configured = {}
+_configured_lock = threading.RLock()
+
+
+def instantiate(path):
+    return import_string(path)()
+
+
+def get_configured(setting, default, build=instantiate):
+    """
+    The object a setting names by import path, such as SIGNATURE_KEY_BACKEND.
+    It is built the first time each value of the setting is seen and shared by
+    every caller after that, so changing the setting, as tests do, picks up the
+    new object. Building is done under a lock, so requests racing on the first
+    use share one object, which in process nonce stores and rate limiters rely on.
+
+    :param build:
+        Turns the setting's value into the object. Instantiates the class the
+        path names by default.
+    """
+    value = getattr(settings, setting, default)
+    key = (setting, tuple(value) if isinstance(value, (list, tuple)) else value)
+    if key not in _configured:
+        with _configured_lock:
+            if key not in _configured:
+                _configured[key] = build(value)
+    return _configured[key]
@@ -0,0 +1,147 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+
+from request_signer import loading
+
+DEFAULT_METRICS = 'request_signer.metrics.NullMetrics'
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BODY_SIZE_BUCKETS = (0, 1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024)
+
+
+class NullMetrics(object):
+    """
+    Default metrics backend. Records nothing and renders nothing.
+    """
+
+    cpu_only = True
+
+    def record(self, outcome, client_id, matched_form, body_size, duration):
+        pass
+
+    def record_circuit_transition(self, circuit, from_state, to_state):
+        pass
+
+    def render(self):
+        return ''
+
+
+class Histogram(object):
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        cumulative = 0
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        for bound, count in zip(bounds, self.counts):
+            cumulative += count
+            yield '{}_bucket{} {}'.format(name, format_labels(labels + [('le', bound)]), cumulative)
+        yield '{}_sum{} {}'.format(name, format_labels(labels), self.sum)
+        yield '{}_count{} {}'.format(name, format_labels(labels), self.count)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')) for name, value in labels
+    )
+    return '{' + ','.join('{}="{}"'.format(name, value) for name, value in escaped) + '}'
+
+
+class InMemoryMetrics(object):
+    """
+    Keeps counters and histograms of signature verifications in process and
+    renders them in the Prometheus text format:
+
+    - verifications by outcome, and by client id and outcome
+    - the url form valid signatures matched, showing how often the unquoted
+      fallback forms are needed
+    - verification latency by outcome
+    - request body size, taken from the Content-Length header
+    - state changes of the REST clients' circuit breakers
+
+    Per client counters are only kept for clients whose key was found, so
+    requests rejected for a missing or malformed signature or an unknown client
+    only count by outcome. They can be turned off with SIGNATURE_METRICS_PER_CLIENT
+    when there are too many client ids to keep a series for each.
+    """
+
+    cpu_only = True
+
+    def __init__(self):
+        self.per_client = getattr(settings, 'SIGNATURE_METRICS_PER_CLIENT', True)
+        self.outcomes = defaultdict(int)
+        self.client_outcomes = defaultdict(int)
+        self.matched_forms = defaultdict(int)
+        self.latencies = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.body_sizes = Histogram(BODY_SIZE_BUCKETS)
+        self.circuit_transitions = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, outcome, client_id, matched_form, body_size, duration):
+        with self._lock:
+            self.outcomes[outcome] += 1
+            if self.per_client and client_id:
+                self.client_outcomes[(client_id, outcome)] += 1
+            if matched_form:
+                self.matched_forms[matched_form] += 1
+            self.latencies[outcome].observe(duration)
+            self.body_sizes.observe(body_size)
+
+    def record_circuit_transition(self, circuit, from_state, to_state):
+        with self._lock:
+            self.circuit_transitions[(circuit, from_state, to_state)] += 1
+
+    def render(self):
+        with self._lock:
+            lines = self._render_counters() + self._render_histograms()
+        return '\n'.join(lines) + '\n'
+
+    def _render_counters(self):
+        lines = []
+        counters = (
+            ('request_signer_verifications_total', 'Signature verifications by outcome.', ('outcome', ),
+             self.outcomes),
+            ('request_signer_client_verifications_total', 'Signature verifications by client and outcome.',
+             ('client_id', 'outcome'), self.client_outcomes),
+            ('request_signer_matched_url_form_total', 'Url form valid signatures matched.', ('form', ),
+             self.matched_forms),
+            ('request_signer_client_circuit_transitions_total', 'Client circuit breaker state changes.',
+             ('circuit', 'from_state', 'to_state'), self.circuit_transitions),
+        )
+        for name, help_text, label_names, values in counters:
+            lines += ['# HELP {} {}'.format(name, help_text), '# TYPE {} counter'.format(name)]
+            for key, value in sorted(values.items()):
+                key = key if isinstance(key, tuple) else (key, )
+                lines.append('{}{} {}'.format(name, format_labels(list(zip(label_names, key))), value))
+        return lines
+
+    def _render_histograms(self):
+        lines = [
+            '# HELP request_signer_verification_seconds Signature verification latency by outcome.',
+            '# TYPE request_signer_verification_seconds histogram',
+        ]
+        for outcome, histogram in sorted(self.latencies.items()):
+            lines.extend(histogram.render('request_signer_verification_seconds', [('outcome', outcome)]))
+        lines += [
+            '# HELP request_signer_body_bytes Size of signed request bodies.',
+            '# TYPE request_signer_body_bytes histogram',
+        ]
+        lines.extend(self.body_sizes.render('request_signer_body_bytes', []))
+        return lines
+
+
+def get_metrics():
+    return loading.get_configured('SIGNATURE_METRICS', DEFAULT_METRICS)
@@ -0,0 +1,58 @@
+import re
+
+from django import http
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from request_signer import ratelimit
+from request_signer.decorators import allow_unsigned_requests, has_valid_signature
+
+
+def compile_patterns(patterns):
+    """
+    Combines a list of path regexes into a single compiled regex, or None when
+    there are no patterns.
+    """
+    if not patterns:
+        return None
+    return re.compile('|'.join('(?:{})'.format(pattern) for pattern in patterns))
+
+
+class SignatureMiddleware(object):
+    """
+    Requires a signed request for every path matching SIGNATURE_REQUIRED_PATHS
+    that doesn't also match SIGNATURE_EXEMPT_PATHS. Both settings are lists of
+    regexes matched against the start of ``request.path_info``, the same way url
+    patterns are.
+
+    Put it at the top of MIDDLEWARE so bad requests are rejected before url
+    resolution, sessions or any other middleware do work for them. The patterns
+    are compiled once when the middleware is loaded, and the middleware removes
+    itself when no paths are protected.
+    """
+
+    def __init__(self, get_response=None):
+        self.get_response = get_response
+        self.required_paths = compile_patterns(getattr(settings, 'SIGNATURE_REQUIRED_PATHS', None))
+        self.exempt_paths = compile_patterns(getattr(settings, 'SIGNATURE_EXEMPT_PATHS', None))
+        if self.required_paths is None:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        response = self.process_request(request)
+        return response or self.get_response(request)
+
+    def process_request(self, request):
+        if not self.requires_signature(request.path_info):
+            return None
+        if has_valid_signature(request):
+            request._dont_enforce_csrf_checks = True
+        elif not allow_unsigned_requests():
+            return http.HttpResponseBadRequest()
+        if ratelimit.is_rate_limited(request):
+            return ratelimit.too_many_requests()
+
+    def requires_signature(self, path):
+        if not self.required_paths.match(path):
+            return False
+        return not (self.exempt_paths and self.exempt_paths.match(path))
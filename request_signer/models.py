@@ -0,0 +1,24 @@
+from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+class AuthorizedClient(models.Model):
+    """
+    Client ids and private keys for request_signer.backends.DatabaseKeyBackend.
+    """
+    client_id = models.CharField(max_length=20, primary_key=True)
+    private_key = models.CharField(default='', max_length=100)
+    is_active = models.BooleanField(default=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.client_id
+
+
+@receiver(post_save, sender=AuthorizedClient)
+@receiver(post_delete, sender=AuthorizedClient)
+def invalidate_cached_key(sender, instance, **kwargs):
+    from request_signer.backends import invalidate_client
+    invalidate_client(instance.client_id)
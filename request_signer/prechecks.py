@@ -0,0 +1,73 @@
+import re
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from request_signer import loading
+
+DEFAULT_PRECHECKS = (
+    'request_signer.prechecks.has_signature',
+    'request_signer.prechecks.is_fresh',
+    'request_signer.prechecks.signature_is_well_formed',
+    'request_signer.prechecks.body_is_within_size_limit',
+    'request_signer.prechecks.client_is_known',
+    'request_signer.prechecks.body_is_decodable',
+)
+
+# urlsafe base64 of a 32 byte HMAC-SHA256 digest, as Signer.create_signature produces.
+SIGNATURE_PATTERN = re.compile(r'^[A-Za-z0-9_-]{43}=$')
+
+
+def has_signature(validator):
+    if not validator.signature or not validator.client_id:
+        return 'missing_signature'
+
+
+def is_fresh(validator):
+    if not validator.is_fresh:
+        return 'stale'
+
+
+def signature_is_well_formed(validator):
+    if not SIGNATURE_PATTERN.match(validator.signature or ''):
+        return 'malformed_signature'
+
+
+def body_is_within_size_limit(validator):
+    """
+    Rejects bodies larger than SIGNATURE_MAX_BODY_SIZE bytes, going by the
+    Content-Length header so the body isn't read. There is no limit by default.
+    """
+    max_size = getattr(settings, 'SIGNATURE_MAX_BODY_SIZE', None)
+    if max_size is not None and validator.content_length > max_size:
+        return 'body_too_large'
+
+
+def client_is_known(validator):
+    if not validator.client or not validator.client.private_key:
+        return 'unknown_client'
+
+
+def body_is_decodable(validator):
+    if not validator.body_decompressed:
+        return 'undecodable_body'
+
+
+def are_cpu_only():
+    """
+    Whether the configured checks are the built in ones, which only do I/O
+    through the key backend.
+    """
+    return set(getattr(settings, 'SIGNATURE_PRECHECKS', DEFAULT_PRECHECKS)) <= set(DEFAULT_PRECHECKS)
+
+
+def import_checks(paths):
+    return [import_string(path) for path in paths]
+
+
+def get_prechecks():
+    """
+    The checks in SIGNATURE_PRECHECKS, in order. Each takes the SignatureValidator
+    and returns why the request is rejected, or None to let it through.
+    """
+    return loading.get_configured('SIGNATURE_PRECHECKS', DEFAULT_PRECHECKS, import_checks)
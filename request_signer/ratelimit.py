@@ -0,0 +1,124 @@
+import hashlib
+import itertools
+import time
+
+from django import http
+from django.conf import settings
+from django.core.cache import caches
+
+from request_signer import loading
+
+DEFAULT_RATE_LIMITER = 'request_signer.ratelimit.MemoryRateLimiter'
+
+
+def get_rate_limit(client_id):
+    """
+    :returns:
+        The client's (requests, seconds) quota from SIGNATURE_RATE_LIMITS, falling
+        back to SIGNATURE_DEFAULT_RATE_LIMIT, or None when it isn't limited.
+    """
+    limits = getattr(settings, 'SIGNATURE_RATE_LIMITS', None) or {}
+    if client_id in limits:
+        return limits[client_id]
+    return getattr(settings, 'SIGNATURE_DEFAULT_RATE_LIMIT', None)
+
+
+class BaseRateLimiter(object):
+    """
+    Sliding window limiter. Requests are counted in fixed windows of ``period``
+    seconds, and the previous window's count is weighted by how much of it still
+    overlaps the last ``period`` seconds, so a client can't send two quotas back
+    to back across a window boundary.
+    """
+
+    # See coroutines.verification_is_cpu_only.
+    cpu_only = False
+
+    def allow(self, key, limit, period, now=None):
+        now = time.time() if now is None else now
+        window, offset = divmod(now, period)
+        current, previous = self.hit(key, int(window), period)
+        return previous * (1 - offset / period) + current <= limit
+
+    def hit(self, key, window, period):
+        """
+        Counts a request in ``window``.
+
+        :returns:
+            The number of requests counted in ``window`` and in the window before it.
+        """
+        raise NotImplementedError
+
+
+class MemoryRateLimiter(BaseRateLimiter):
+    """
+    In-process limiter that takes no locks: each window is counted with an
+    itertools.count, whose ``next`` is atomic. Every process counts on its own,
+    so with several workers a client gets up to its quota from each of them;
+    divide quotas by the number of workers, or use CacheRateLimiter.
+    """
+
+    cpu_only = True
+
+    def __init__(self):
+        self._windows = {}
+
+    def hit(self, key, window, period):
+        counts = self._windows.get((key, window))
+        if counts is None:
+            counts = self._windows.setdefault((key, window), [itertools.count(1), 0])
+            self._windows.pop((key, window - 2), None)
+        counts[1] = next(counts[0])
+        previous = self._windows.get((key, window - 1))
+        return counts[1], previous[1] if previous else 0
+
+
+class CacheRateLimiter(BaseRateLimiter):
+    """
+    Limiter backed by the Django cache named in SIGNATURE_RATE_LIMIT_CACHE, for
+    deployments where several processes or nodes serve signed requests. Relies
+    on the cache's atomic ``add`` and ``incr``.
+    """
+
+    KEY_PREFIX = 'request_signer:rate:'
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'SIGNATURE_RATE_LIMIT_CACHE', 'default')]
+
+    def hit(self, key, window, period):
+        key = self.KEY_PREFIX + hashlib.sha256(key.encode('utf-8')).hexdigest()
+        current_key = '{}:{}'.format(key, window)
+        if self.cache.add(current_key, 1, 2 * period):
+            current = 1
+        else:
+            current = self._incr(current_key, period)
+        return current, self.cache.get('{}:{}'.format(key, window - 1), 0)
+
+    def _incr(self, key, period):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, 1, 2 * period)
+            return 1
+
+
+def get_rate_limiter():
+    return loading.get_configured('SIGNATURE_RATE_LIMITER', DEFAULT_RATE_LIMITER)
+
+
+def is_rate_limited(request):
+    """
+    Counts a request signed by a client with a quota, returning True once the
+    client is over it. Only requests whose signature has been verified are
+    counted, and each request only once however many layers ask.
+    """
+    if not hasattr(request, '_rate_limited'):
+        client_id = getattr(request, 'signed_client', None)
+        rate_limit = get_rate_limit(client_id) if client_id else None
+        request._rate_limited = bool(rate_limit) and not get_rate_limiter().allow(client_id, *rate_limit)
+    return request._rate_limited
+
+
+def too_many_requests():
+    return http.HttpResponse('Too Many Requests', status=429)
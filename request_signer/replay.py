@@ -0,0 +1,114 @@
+import hashlib
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import caches
+
+from request_signer import loading
+
+DEFAULT_MAX_AGE = 300
+DEFAULT_NONCE_STORE = 'request_signer.replay.MemoryNonceStore'
+
+
+def get_max_age():
+    return getattr(settings, 'SIGNATURE_MAX_AGE', DEFAULT_MAX_AGE)
+
+
+def is_fresh(timestamp, now=None):
+    """
+    :param timestamp:
+        Unix timestamp the client signed the request at, as sent on the query string.
+
+    :returns:
+        Whether the timestamp is a number within SIGNATURE_MAX_AGE seconds of now,
+        in either direction to allow for clock skew.
+    """
+    try:
+        timestamp = float(timestamp)
+    except (TypeError, ValueError):
+        return False
+    now = time.time() if now is None else now
+    return abs(now - timestamp) <= get_max_age()
+
+
+class BaseNonceStore(object):
+
+    # See coroutines.verification_is_cpu_only.
+    cpu_only = False
+
+    def add(self, key, timeout):
+        """
+        Remembers the key for ``timeout`` seconds.
+
+        :returns:
+            True when the key was added, False when it was already present.
+        """
+        raise NotImplementedError
+
+
+class MemoryNonceStore(BaseNonceStore):
+    """
+    In-process nonce store. Keys are grouped into time buckets so expiring them
+    means dropping whole buckets off the end of a deque instead of scanning keys.
+    Only use it when a single process serves all signed requests.
+    """
+
+    cpu_only = True
+
+    BUCKET_COUNT = 10
+
+    def __init__(self):
+        self._buckets = deque()
+        self._lock = threading.Lock()
+
+    def add(self, key, timeout, now=None):
+        now = time.time() if now is None else now
+        width = max(float(timeout) / self.BUCKET_COUNT, 1)
+        with self._lock:
+            self._expire(now)
+            if any(key in keys for _, keys in self._buckets):
+                return False
+            self._current_bucket(now + timeout, width).add(key)
+            return True
+
+    def _expire(self, now):
+        while self._buckets and self._buckets[0][0] <= now:
+            self._buckets.popleft()
+
+    def _current_bucket(self, expires, width):
+        if not self._buckets or self._buckets[-1][0] < expires:
+            self._buckets.append((expires + width, set()))
+        return self._buckets[-1][1]
+
+
+class CacheNonceStore(BaseNonceStore):
+    """
+    Nonce store backed by the Django cache named in SIGNATURE_NONCE_CACHE, for
+    deployments where several processes or nodes serve signed requests. Relies
+    on the cache's atomic ``add``.
+    """
+
+    KEY_PREFIX = 'request_signer:nonce:'
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'SIGNATURE_NONCE_CACHE', 'default')]
+
+    def add(self, key, timeout):
+        key = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return self.cache.add(self.KEY_PREFIX + key, True, timeout)
+
+
+def get_nonce_store():
+    return loading.get_configured('SIGNATURE_NONCE_STORE', DEFAULT_NONCE_STORE)
+
+
+def nonce_was_unused(client_id, nonce):
+    """
+    Records the client's nonce, returning False when it has been seen before. Nonces
+    are kept for twice SIGNATURE_MAX_AGE, the whole window a timestamp is accepted in.
+    """
+    key = '{}:{}'.format(client_id, nonce)
+    return get_nonce_store().add(key, 2 * get_max_age())
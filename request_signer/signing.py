@@ -0,0 +1,171 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import six
+from collections import OrderedDict
+
+if six.PY3:
+    from urllib.parse import urlparse
+else:
+    from urlparse import urlparse
+
+from apysigner import DefaultJSONEncoder
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+
+DEFAULT_KEY_CACHE_SIZE = 1024
+
+
+class Signer(object):
+    """
+    Re-creates request signatures the same way apysigner does, but decodes the
+    private key and runs the HMAC key schedule only once. Every signature is made
+    from a copy of that keyed state, so checking several url forms of the same
+    request only pays for hashing the url and payload.
+    """
+
+    def __init__(self, private_key):
+        if isinstance(private_key, bytes):
+            private_key = private_key.decode('ascii')
+        decoded_key = base64.urlsafe_b64decode(private_key.encode('utf-8'))
+        self.keyed_hmac = hmac.new(decoded_key, digestmod=hashlib.sha256)
+
+    def create_signature(self, base_url, payload=None):
+        """
+        :param base_url:
+            The url, including the query string, that was signed.
+        :param payload:
+            The request data that was signed, already converted or not.
+
+        :returns:
+            The url safe base 64 signature.
+        """
+        signature = self._keyed_url_hmac(base_url)
+        signature.update(self.convert_payload(payload).encode('utf-8'))
+        return base64.urlsafe_b64encode(signature.digest()).decode('ascii')
+
+    def signature_matches(self, signature, urls, payload=None):
+        """
+        :param signature:
+            Signature received from the request.
+        :param urls:
+            Url forms to try, in order.
+        :param payload:
+            The request data, converted once and shared by every url form.
+
+        :returns:
+            The url form the signature matched, or None.
+        """
+        converted_payload = self.convert_payload(payload)
+        for url in urls:
+            if constant_time_compare(signature, self.create_signature(url, converted_payload)):
+                return url
+
+    def stream_matches(self, signature, urls, chunks):
+        """
+        Same as signature_matches, but for a raw body given as an iterable of byte
+        chunks. Each chunk is fed to one HMAC per url form as it arrives, so the
+        body is read only once and never has to be held in memory as a whole.
+        """
+        signatures = OrderedDict((url, self._keyed_url_hmac(url)) for url in urls)
+        for chunk in chunks:
+            for computed in signatures.values():
+                computed.update(chunk)
+        for url, computed in signatures.items():
+            if constant_time_compare(signature, base64.urlsafe_b64encode(computed.digest()).decode('ascii')):
+                return url
+
+    def _keyed_url_hmac(self, url):
+        computed = self.keyed_hmac.copy()
+        computed.update(self.url_to_sign(url).encode('utf-8'))
+        return computed
+
+    @staticmethod
+    def url_to_sign(base_url):
+        url = urlparse(base_url)
+        return "{path}?{query}".format(path=url.path, query=url.query)
+
+    @staticmethod
+    def convert_payload(payload):
+        """
+        Converts the payload to the string that gets signed. Complex objects are
+        dumped to sorted json, matching apysigner.
+        """
+        if isinstance(payload, bytes):
+            payload = payload.decode('utf-8')
+        if not isinstance(payload, six.string_types) and payload:
+            payload = json.dumps(payload, cls=DefaultJSONEncoder, sort_keys=True)
+        return payload or ''
+
+
+class SignerCache(object):
+    """
+    Least recently used cache of keyed signers per client id. A cached signer is
+    only reused while the client's private key is unchanged, so rotating a key in
+    API_KEYS replaces the entry on its next lookup.
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self._signers = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_signer(self, client_id, private_key):
+        with self._lock:
+            cached = self._signers.get(client_id)
+            if cached and cached[0] == private_key:
+                self._signers.move_to_end(client_id)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            if cached:
+                self.invalidations += 1
+        signer = Signer(private_key)
+        self._store(client_id, private_key, signer)
+        return signer
+
+    def _store(self, client_id, private_key, signer):
+        with self._lock:
+            self._signers[client_id] = (private_key, signer)
+            self._signers.move_to_end(client_id)
+            while len(self._signers) > self.get_max_size():
+                self._signers.popitem(last=False)
+                self.evictions += 1
+
+    def get_max_size(self):
+        if self.max_size is not None:
+            return self.max_size
+        return getattr(settings, 'SIGNATURE_KEY_CACHE_SIZE', DEFAULT_KEY_CACHE_SIZE)
+
+    def invalidate(self, client_id=None):
+        """
+        Drops the cached signer for one client id, or every signer when no id is given.
+        """
+        with self._lock:
+            if client_id is None:
+                self.invalidations += len(self._signers)
+                self._signers.clear()
+            elif self._signers.pop(client_id, None):
+                self.invalidations += 1
+
+    def stats(self):
+        return {
+            'size': len(self._signers),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+signer_cache = SignerCache()
+
+
+def get_signer(client_id, private_key):
+    return signer_cache.get_signer(client_id, private_key)
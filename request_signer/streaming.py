@@ -0,0 +1,32 @@
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_SPOOL_SIZE = 1024 * 1024
+
+
+def stream_json_body():
+    return getattr(settings, 'SIGNATURE_STREAM_JSON_BODY', False)
+
+
+def iter_body(request, chunk_size=None, spool_size=None):
+    """
+    Reads the request body from its stream in fixed size chunks, yielding each one.
+
+    Every chunk is also written to a spooled buffer that stays in memory up to
+    ``spool_size`` bytes and moves to a temporary file past that. Once the body
+    has been read the buffer replaces the request's stream, so the view can still
+    read ``request.body`` or ``request.read()`` as if nothing had touched it.
+    """
+    chunk_size = chunk_size or getattr(settings, 'SIGNATURE_STREAM_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    spool_size = spool_size or getattr(settings, 'SIGNATURE_STREAM_SPOOL_SIZE', DEFAULT_SPOOL_SIZE)
+    spool = SpooledTemporaryFile(max_size=spool_size)
+    chunk = request.read(chunk_size)
+    while chunk:
+        spool.write(chunk)
+        yield chunk
+        chunk = request.read(chunk_size)
+    spool.seek(0)
+    request._stream = spool
+    request._read_started = False
@@ -0,0 +1,213 @@
+import asyncio
+from unittest import mock
+
+from django.core.cache import cache as default_cache
+
+from request_signer.client.generic import Request, WebException, async_transport, cache
+from request_signer.client.generic.async_rest import AsyncBaseDjangoRestClient
+from request_signer.tests.test_transport import LocalServerTestCase
+
+
+class AsyncPooledTransportTests(LocalServerTestCase):
+
+    def setUp(self):
+        self.sut = async_transport.AsyncPooledTransport(max_size=1, idle_timeout=60)
+
+    async def get(self, path):
+        return await self.sut.open(Request('GET', self.base_url + path, None), timeout=5)
+
+    async def test_reuses_connection_once_response_is_read(self):
+        self.assertEqual(200, (await self.get('/a/')).code)
+        self.assertEqual(200, (await self.get('/b/')).code)
+        pool = self.sut.get_pool('http', self.host)
+        self.assertEqual((1, 1), (pool.created, pool.reused))
+        self.sut.close()
+
+    async def test_returns_error_responses_instead_of_raising(self):
+        response = await self.get('/missing/')
+        self.assertEqual(404, response.code)
+        self.sut.close()
+
+    async def test_reads_chunked_responses(self):
+        response = await self.get('/chunked/')
+        self.assertIn(b'"path": "/chunked/"', response.read())
+        self.assertEqual(200, (await self.get('/a/')).code)
+        self.assertEqual(1, self.sut.get_pool('http', self.host).reused)
+        self.sut.close()
+
+    async def test_sends_request_data_as_form_encoded_body(self):
+        response = await self.sut.open(Request('POST', self.base_url + '/a/', b'x=1'), timeout=5)
+        self.assertIn(b'"body": "x=1"', response.read())
+        self.sut.close()
+
+    async def test_does_not_reuse_connection_idle_past_timeout(self):
+        self.sut.idle_timeout = 0
+        await self.get('/a/')
+        await self.get('/b/')
+        self.assertEqual(2, self.sut.get_pool('http', self.host).created)
+        self.sut.close()
+
+    async def test_retries_once_on_new_connection_when_reused_connection_was_closed(self):
+        await self.get('/a/')
+        exchange = self.sut._exchange
+        calls = []
+
+        async def fail_first(connection, request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise ConnectionResetError()
+            return await exchange(connection, request)
+
+        with mock.patch.object(self.sut, '_exchange', side_effect=fail_first):
+            response = await self.get('/b/')
+        self.assertEqual((200, 2), (response.code, len(calls)))
+        self.assertEqual(2, self.sut.get_pool('http', self.host).created)
+        self.sut.close()
+
+    async def test_closes_retry_connection_when_its_exchange_fails_too(self):
+        await self.get('/a/')
+        closed = []
+        with mock.patch.object(async_transport.AsyncConnection, 'close', autospec=True, side_effect=closed.append), \
+                mock.patch.object(self.sut, '_exchange', side_effect=ConnectionResetError()):
+            with self.assertRaises(ConnectionResetError):
+                await self.get('/b/')
+        self.assertEqual(2, len(closed))
+        self.assertIsNot(closed[0], closed[1])
+        self.sut.close()
+
+    async def test_raises_when_new_connection_fails(self):
+        with mock.patch.object(self.sut, '_exchange', side_effect=ConnectionResetError()):
+            with self.assertRaises(ConnectionResetError):
+                await self.get('/a/')
+
+    async def test_get_async_transport_returns_one_transport_per_event_loop(self):
+        self.assertIs(async_transport.get_async_transport(), async_transport.get_async_transport())
+
+
+class AsyncBaseDjangoRestClientTests(LocalServerTestCase):
+
+    def setUp(self):
+        class Client(AsyncBaseDjangoRestClient):
+            BASE_API_ENDPOINT = '/api/'
+
+        credentials = mock.Mock(base_url=self.base_url, client_id='client', private_key='abc123==')
+        self.sut = Client(credentials)
+
+    async def test_get_item_returns_signed_get_json(self):
+        result = await self.sut.get_item('1234', 'pk-3')
+        self.assertEqual('GET', result['method'])
+        self.assertTrue(result['path'].startswith('/api/1234/pk-3/?__client_id=client&__signature='))
+
+    async def test_get_list_returns_404_json_as_before(self):
+        self.assertEqual('GET', (await self.sut.get_list('missing'))['method'])
+
+    async def test_get_list_raises_web_exception_when_not_successful(self):
+        with self.assertRaises(WebException):
+            await self.sut.get_list('broken')
+
+    async def test_create_sends_signed_form_post(self):
+        result = await self.sut.create('1234', name='x')
+        self.assertEqual(('POST', 'name=x'), (result['method'], result['body']))
+
+    async def test_update_sends_put_override(self):
+        result = await self.sut.update('1234', 'pk-3', name='x')
+        self.assertEqual('_method=PUT&name=x', result['body'])
+
+    async def test_delete_lets_404_slide(self):
+        result = await self.sut.delete('1234', 'missing')
+        self.assertEqual('_method=DELETE', result['body'])
+
+    async def test_delete_raises_web_exception_when_not_successful(self):
+        with self.assertRaises(WebException):
+            await self.sut.delete('1234', 'broken')
+
+    async def test_create_sends_json_when_json_content_type(self):
+        response = await self.sut._get_response(
+            'POST', '/api/1/', {'a': 1}, headers={'Content-Type': 'application/json'}
+        )
+        self.assertEqual('{"a": 1}', response.json['body'])
+
+    async def test_get_items_many_sends_requests_concurrently(self):
+        keys = [('1', 'pk-{}'.format(i)) for i in range(10)] + [('1', 'missing'), ('1', 'broken')]
+        results, errors = await self.sut.get_items_many(keys)
+        self.assertEqual(keys[:-1], list(results))
+        self.assertEqual([('1', 'broken')], list(errors))
+        self.assertIsInstance(errors[('1', 'broken')], WebException)
+
+    async def test_get_list_many_returns_results_by_group_key(self):
+        results, errors = await self.sut.get_list_many(['1', '2'])
+        self.assertEqual((['1', '2'], {}), (list(results), errors))
+
+    async def test_bulk_update_sends_json_batches(self):
+        self.sut.supports_bulk = True
+        results, errors = await self.sut.bulk_update('bulk', {'a': {'name': 'x'}, 'b': {'name': 'y'}})
+        self.assertEqual(({}, 'PUT'), (errors, results['b']['method']))
+
+    async def test_bulk_create_falls_back_to_request_per_item(self):
+        results, errors = await self.sut.bulk_create('nobulk', [{'name': 'x'}, {'name': 'y'}])
+        self.assertEqual(({}, 'name=y'), (errors, results[1]['body']))
+
+    async def test_iter_list_follows_next_links_of_paginated_responses(self):
+        items = [item['id'] async for item in self.sut.iter_list('paged', page_size=10)]
+        self.assertEqual(list(range(25)), items)
+
+    async def test_iter_list_pages_plain_lists_with_limit_and_offset(self):
+        items = [item['id'] async for item in self.sut.iter_list('paged-plain', page_size=10)]
+        self.assertEqual(list(range(25)), items)
+
+    async def test_iter_list_stops_when_plain_list_repeats_full_page(self):
+        items = [item['id'] async for item in self.sut.iter_list('paged-plain-whole', page_size=25)]
+        self.assertEqual(list(range(25)), items)
+
+    async def test_iter_list_cancels_prefetched_page_when_abandoned(self):
+        items = self.sut.iter_list('paged', page_size=10)
+        self.assertEqual(0, (await items.__anext__())['id'])
+        await items.aclose()
+
+    async def test_stream_list_yields_items_of_list_response(self):
+        self.assertEqual(100, len([item async for item in self.sut.stream_list('compressed')]))
+
+    async def test_stream_list_yields_nothing_for_404(self):
+        self.assertEqual([], [item async for item in self.sut.stream_list('missing')])
+
+    async def test_stream_list_raises_web_exception_when_not_successful(self):
+        with self.assertRaises(WebException):
+            [item async for item in self.sut.stream_list('broken')]
+
+    async def test_returns_cached_json_until_update_drops_it(self):
+        self.sut.cache_responses = True
+        default_cache.clear()
+        with mock.patch.object(cache, '_response_cache', None), \
+                mock.patch.object(self.sut, '_send', wraps=self.sut._send) as send:
+            for _ in range(2):
+                await self.sut.get_item('1', '2')
+                await self.sut.get_list('1')
+            self.assertEqual(2, send.call_count)
+            await self.sut.update('1', '2', name='y')
+            await self.sut.get_item('1', '2')
+            await self.sut.get_list('1')
+        self.assertEqual(5, send.call_count)
+
+    async def test_bulk_update_drops_cached_group_and_items(self):
+        self.sut.cache_responses = True
+        default_cache.clear()
+        with mock.patch.object(cache, '_response_cache', None), \
+                mock.patch.object(self.sut, '_send', wraps=self.sut._send) as send:
+            await self.sut.get_item('bulk', 'a')
+            await self.sut.bulk_update('bulk', {'a': {'name': 'x'}})
+            await self.sut.get_item('bulk', 'a')
+        self.assertEqual(3, send.call_count)
+
+    async def test_decodes_compressed_response(self):
+        self.sut.accept_compressed_responses = True
+        r = await self.sut._get_json_response('GET', '/api/compressed/')
+        self.assertEqual((100, 'gzip'), (len(r.json), r.raw_response.headers['Content-Encoding']))
+        self.assertLess(r.raw_response.wire_bytes * 10, r.raw_response.decoded_bytes)
+
+    async def test_send_raises_timeout_when_server_is_too_slow(self):
+        with mock.patch.object(async_transport.AsyncPooledTransport, '_exchange', side_effect=self.never_answer):
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.sut._send(Request('GET', self.base_url + '/a/', None), timeout=0.01)
+
+    async def never_answer(self, connection, request):
+        await asyncio.sleep(1)
@@ -0,0 +1,138 @@
+import warnings
+
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from apysigner import get_signature
+from django import test
+from django.core.cache import caches
+from django.core.cache.backends.base import CacheKeyWarning
+from django.core.exceptions import ImproperlyConfigured
+from django.test.utils import override_settings
+
+from request_signer import backends, constants, loading
+from request_signer.models import AuthorizedClient
+
+TEST_PRIVATE_KEY = 'abc123=='
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class SettingsKeyBackendTests(test.TestCase):
+
+    @override_settings(API_KEYS={'apps-testclient': TEST_PRIVATE_KEY})
+    def test_returns_private_key_from_api_keys(self):
+        self.assertEqual(TEST_PRIVATE_KEY, backends.SettingsKeyBackend().get_private_key('apps-testclient'))
+
+    @override_settings(API_KEYS={'apps-testclient': TEST_PRIVATE_KEY})
+    def test_returns_none_for_unknown_client(self):
+        self.assertIsNone(backends.SettingsKeyBackend().get_private_key('unknown'))
+
+    def test_raises_improperly_configured_without_api_keys(self):
+        with self.assertRaises(ImproperlyConfigured):
+            backends.SettingsKeyBackend().get_private_key('apps-testclient')
+
+
+class DatabaseKeyBackendTests(test.TestCase):
+
+    def test_returns_private_key_of_active_client(self):
+        AuthorizedClient.objects.create(client_id='apps-testclient', private_key=TEST_PRIVATE_KEY)
+        self.assertEqual(TEST_PRIVATE_KEY, backends.DatabaseKeyBackend().get_private_key('apps-testclient'))
+
+    def test_returns_none_for_inactive_client(self):
+        AuthorizedClient.objects.create(client_id='apps-testclient', private_key=TEST_PRIVATE_KEY, is_active=False)
+        self.assertIsNone(backends.DatabaseKeyBackend().get_private_key('apps-testclient'))
+
+    def test_returns_none_for_unknown_client(self):
+        self.assertIsNone(backends.DatabaseKeyBackend().get_private_key('unknown'))
+
+
+class LocalKeyCacheTests(test.TestCase):
+
+    def test_returns_default_for_missing_key(self):
+        self.assertEqual('x', backends.LocalKeyCache(2, 10).get('a', 'x'))
+
+    def test_returns_value_until_it_expires(self):
+        sut = backends.LocalKeyCache(2, 10)
+        with mock.patch('time.time', return_value=1000):
+            sut.set('a', 'value')
+        with mock.patch('time.time', return_value=1009):
+            self.assertEqual('value', sut.get('a'))
+        with mock.patch('time.time', return_value=1010):
+            self.assertIsNone(sut.get('a'))
+
+    def test_evicts_least_recently_used_key(self):
+        sut = backends.LocalKeyCache(2, 10)
+        sut.set('a', 1)
+        sut.set('b', 2)
+        sut.get('a')
+        sut.set('c', 3)
+        self.assertEqual([1, None, 3], [sut.get('a'), sut.get('b'), sut.get('c')])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedKeyBackendTests(test.TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        self.sut = backends.CachedKeyBackend()
+        AuthorizedClient.objects.create(client_id='apps-testclient', private_key=TEST_PRIVATE_KEY)
+
+    def test_reads_through_to_database_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(TEST_PRIVATE_KEY, self.sut.get_private_key('apps-testclient'))
+            self.assertEqual(TEST_PRIVATE_KEY, self.sut.get_private_key('apps-testclient'))
+
+    def test_reads_from_shared_cache_when_not_in_local_cache(self):
+        self.sut.get_private_key('apps-testclient')
+        with self.assertNumQueries(0):
+            self.assertEqual(TEST_PRIVATE_KEY, backends.CachedKeyBackend().get_private_key('apps-testclient'))
+
+    def test_caches_unknown_clients(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.sut.get_private_key('unknown'))
+            self.assertIsNone(backends.CachedKeyBackend().get_private_key('unknown'))
+
+    def test_invalidate_drops_key_from_both_tiers(self):
+        self.sut.get_private_key('apps-testclient')
+        self.sut.invalidate('apps-testclient')
+        with self.assertNumQueries(1):
+            self.sut.get_private_key('apps-testclient')
+
+    def test_hashes_client_ids_memcached_would_reject_into_valid_keys(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            for client_id in ('a b', 'a\nb', 'x' * 300):
+                self.assertIsNone(self.sut.get_private_key(client_id))
+                self.sut.invalidate(client_id)
+
+    @override_settings(SIGNATURE_CACHED_KEY_BACKEND='request_signer.backends.SettingsKeyBackend', API_KEYS={'a': 'k'})
+    def test_wraps_backend_from_settings(self):
+        self.assertEqual('k', backends.CachedKeyBackend().get_private_key('a'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SIGNATURE_KEY_BACKEND='request_signer.backends.CachedKeyBackend')
+class KeyBackendValidationTests(test.TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        loading._configured.clear()
+        AuthorizedClient.objects.create(client_id='apps-testclient', private_key=TEST_PRIVATE_KEY)
+
+    def get(self, private_key):
+        url = '/test/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        signature = get_signature(private_key, url)
+        return self.client.get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+
+    def test_validates_with_key_from_configured_backend_without_querying_every_request(self):
+        self.assertEqual(200, self.get(TEST_PRIVATE_KEY).status_code)
+        with self.assertNumQueries(0):
+            self.assertEqual(200, self.get(TEST_PRIVATE_KEY).status_code)
+
+    def test_deleting_client_invalidates_cached_key(self):
+        self.assertEqual(200, self.get(TEST_PRIVATE_KEY).status_code)
+        AuthorizedClient.objects.filter(pk='apps-testclient').get().delete()
+        self.assertEqual(400, self.get(TEST_PRIVATE_KEY).status_code)
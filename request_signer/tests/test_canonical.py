@@ -0,0 +1,37 @@
+from django import test
+
+from request_signer import canonical, constants
+
+
+class CanonicalPathTests(test.TestCase):
+
+    def test_split_full_path_splits_on_first_question_mark_only(self):
+        self.assertEqual(('/a/', 'b=1?c'), canonical.split_full_path('/a/?b=1?c'))
+
+    def test_split_full_path_returns_empty_query_when_missing(self):
+        self.assertEqual(('/a/', ''), canonical.split_full_path('/a/'))
+
+    def test_canonical_path_unquotes_path_but_not_query(self):
+        self.assertEqual('/a b/?x=%2C', canonical.canonical_path('/a%20b/?x=%2C'))
+
+    def test_strip_signature_removes_trailing_signature_param(self):
+        url = '/a/?b=1&{}=abc='.format(constants.SIGNATURE_PARAM_NAME)
+        self.assertEqual('/a/?b=1', canonical.strip_signature('abc=', url))
+
+    def test_strip_signature_escapes_signature_before_matching(self):
+        url = '/a/?b=1&{}=a.c'.format(constants.SIGNATURE_PARAM_NAME)
+        self.assertEqual(url, canonical.strip_signature('a+c', url))
+
+    def test_candidate_paths_returns_single_form_when_nothing_is_escaped(self):
+        url = '/a/?b=1&{}=abc'.format(constants.SIGNATURE_PARAM_NAME)
+        self.assertEqual(['/a/?b=1'], canonical.candidate_paths(url, 'abc'))
+
+    def test_candidate_paths_keeps_historical_order_of_unique_forms(self):
+        url = '/a%20b/?x=%2C&{}=abc'.format(constants.SIGNATURE_PARAM_NAME)
+        self.assertEqual(
+            ['/a%20b/?x=%2C', '/a b/?x=,', '/a b/?x=%2C'], canonical.candidate_paths(url, 'abc')
+        )
+
+    def test_candidate_paths_returns_only_canonical_form_when_requested(self):
+        url = '/a%20b/?x=%2C&{}=abc'.format(constants.SIGNATURE_PARAM_NAME)
+        self.assertEqual(['/a b/?x=%2C'], canonical.candidate_paths(url, 'abc', canonical_only=True))
@@ -0,0 +1,209 @@
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from six.moves.urllib.error import URLError
+
+from django import test
+
+from request_signer.client.generic import Request, Response, WebException, circuit
+from request_signer.client.generic.async_rest import AsyncBaseDjangoRestClient
+from request_signer.client.generic.rest import BaseDjangoRestClient
+
+
+def get_response(code=200):
+    return Response(mock.Mock(code=code, read=mock.Mock(return_value=b'{}'), headers={}))
+
+
+class CircuitBreakerTests(test.TestCase):
+
+    def setUp(self):
+        self.sut = circuit.CircuitBreaker('api', failure_threshold=2, reset_timeout=30)
+        self.metrics = mock.Mock()
+        patcher = mock.patch('request_signer.metrics.get_metrics', return_value=self.metrics)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open_circuit(self):
+        with mock.patch('request_signer.client.generic.circuit.time', return_value=1000):
+            self.sut.record_failure()
+            self.sut.record_failure()
+
+    def test_stays_closed_until_threshold_failures_in_a_row(self):
+        self.sut.record_failure()
+        self.sut.record_success()
+        self.sut.record_failure()
+        self.sut.check()
+        self.assertEqual(circuit.CLOSED, self.sut.state)
+
+    def test_fails_fast_once_open(self):
+        self.open_circuit()
+        with mock.patch('request_signer.client.generic.circuit.time', return_value=1029):
+            with self.assertRaises(circuit.CircuitOpenError):
+                self.sut.check()
+        self.metrics.record_circuit_transition.assert_called_once_with('api', circuit.CLOSED, circuit.OPEN)
+
+    def test_circuit_open_error_is_web_exception(self):
+        self.assertTrue(issubclass(circuit.CircuitOpenError, WebException))
+
+    def test_lets_one_trial_request_through_after_reset_timeout(self):
+        self.open_circuit()
+        with mock.patch('request_signer.client.generic.circuit.time', return_value=1030):
+            self.sut.check()
+            with self.assertRaises(circuit.CircuitOpenError):
+                self.sut.check()
+        self.assertEqual(circuit.HALF_OPEN, self.sut.state)
+
+    def test_closes_when_trial_request_succeeds(self):
+        self.open_circuit()
+        with mock.patch('request_signer.client.generic.circuit.time', return_value=1030):
+            self.sut.check()
+        self.sut.record_success()
+        self.sut.check()
+        self.assertEqual(circuit.CLOSED, self.sut.state)
+        self.assertEqual(
+            [mock.call('api', circuit.OPEN, circuit.HALF_OPEN), mock.call('api', circuit.HALF_OPEN, circuit.CLOSED)],
+            self.metrics.record_circuit_transition.call_args_list[1:]
+        )
+
+    def test_opens_again_when_trial_request_fails(self):
+        self.open_circuit()
+        with mock.patch('request_signer.client.generic.circuit.time', return_value=1030):
+            self.sut.check()
+            self.sut.record_failure()
+        with mock.patch('request_signer.client.generic.circuit.time', return_value=1059):
+            with self.assertRaises(circuit.CircuitOpenError):
+                self.sut.check()
+        self.assertEqual(circuit.OPEN, self.sut.state)
+
+    def test_get_circuit_breaker_shares_breaker_by_name(self):
+        breaker = circuit.get_circuit_breaker('shared', 3, 10)
+        self.assertIs(breaker, circuit.get_circuit_breaker('shared', 3, 10))
+        self.assertEqual((3, 10), (breaker.failure_threshold, breaker.reset_timeout))
+
+    def test_get_circuit_breaker_returns_null_breaker_without_threshold(self):
+        self.assertIs(circuit.NO_CIRCUIT_BREAKER, circuit.get_circuit_breaker('none', 0, 10))
+
+
+class ClientPolicyTests(test.TestCase):
+
+    def setUp(self):
+        class PolicyClient(BaseDjangoRestClient):
+            BASE_API_ENDPOINT = '/api/'
+            retries = 2
+            retry_backoff = 0.5
+
+        self.sut = PolicyClient(mock.Mock(base_url='http://policy', client_id='client', private_key='abc123=='))
+        self.sleep = mock.patch('time.sleep').start()
+        mock.patch.dict(circuit._circuit_breakers, clear=True).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def send_once(self, *outcomes):
+        return mock.patch.object(self.sut, '_send_once', side_effect=outcomes)
+
+    def test_retries_get_on_connection_errors_and_unavailable_responses(self):
+        with self.send_once(URLError('refused'), get_response(503), get_response()) as send_once:
+            self.assertEqual({}, self.sut.get_item('1', '2'))
+        self.assertEqual(3, send_once.call_count)
+        self.assertEqual(2, self.sleep.call_count)
+
+    def test_closes_unavailable_responses_before_retrying(self):
+        unavailable, available = get_response(503), get_response()
+        with self.send_once(unavailable, available):
+            self.sut.get_item('1', '2')
+        unavailable.raw_response.close.assert_called_once_with()
+        self.assertFalse(available.raw_response.close.called)
+
+    def test_raises_last_error_when_retries_are_used_up(self):
+        with self.send_once(URLError('a'), URLError('b'), URLError('c')):
+            with self.assertRaises(URLError):
+                self.sut.get_item('1', '2')
+
+    def test_returns_last_unavailable_response_when_retries_are_used_up(self):
+        with self.send_once(get_response(503), get_response(503), get_response(504)):
+            response = self.sut._get_json_response('GET', '/api/1/')
+        self.assertEqual(504, response.status_code)
+
+    def test_does_not_retry_writes(self):
+        with self.send_once(URLError('refused')) as send_once:
+            with self.assertRaises(URLError):
+                self.sut.create('1', name='x')
+        self.assertEqual(1, send_once.call_count)
+
+    def test_does_not_retry_other_error_responses(self):
+        with self.send_once(get_response(500)) as send_once:
+            self.assertEqual(500, self.sut._get_json_response('GET', '/api/1/').status_code)
+        self.assertEqual(1, send_once.call_count)
+
+    def test_backs_off_exponentially_with_full_jitter_up_to_max(self):
+        with mock.patch('random.uniform', side_effect=lambda low, high: high) as uniform:
+            self.assertEqual([0.5, 1.0, 2, 2], [self.sut._backoff(attempt) for attempt in range(1, 5)])
+        uniform.assert_called_with(0, 2)
+
+    def test_sends_with_read_timeout_by_default(self):
+        self.sut.read_timeout = 3
+        with self.send_once(get_response()) as send_once:
+            self.sut.get_item('1', '2')
+        self.assertEqual(3, send_once.call_args[0][1])
+
+    def test_passes_connect_timeout_to_pooled_transport(self):
+        self.sut.use_connection_pool = True
+        self.sut.connect_timeout = 1
+        with mock.patch('request_signer.client.generic.transport.get_pooled_transport') as get_transport:
+            get_transport.return_value.open.return_value = mock.Mock(code=200, read=mock.Mock(return_value=b'{}'))
+            self.sut.get_item('1', '2')
+        self.assertEqual((15, 1), get_transport.return_value.open.call_args[0][1:])
+
+    def test_fails_fast_after_threshold_consecutive_failures(self):
+        self.sut.retries = 0
+        self.sut.circuit_failure_threshold = 2
+        with self.send_once(URLError('a'), get_response(502)) as send_once:
+            with self.assertRaises(URLError):
+                self.sut.get_item('1', '2')
+            self.sut._get_json_response('GET', '/api/1/')
+            with self.assertRaises(circuit.CircuitOpenError):
+                self.sut.get_item('1', '2')
+        self.assertEqual(2, send_once.call_count)
+
+    def test_circuit_breaker_is_per_client_class_and_host(self):
+        self.sut.circuit_failure_threshold = 2
+        breaker = self.sut._get_circuit_breaker(Request('GET', 'http://policy/api/', None))
+        self.assertEqual('PolicyClient policy', breaker.name)
+
+
+class AsyncClientPolicyTests(test.TestCase):
+
+    def setUp(self):
+        class AsyncPolicyClient(AsyncBaseDjangoRestClient):
+            BASE_API_ENDPOINT = '/api/'
+            retries = 1
+
+        credentials = mock.Mock(base_url='http://async-policy', client_id='client', private_key='abc123==')
+        self.sut = AsyncPolicyClient(credentials)
+        breakers = mock.patch.dict(circuit._circuit_breakers, clear=True)
+        breakers.start()
+        self.addCleanup(breakers.stop)
+
+    async def test_retries_get_on_timeouts(self):
+        with mock.patch('asyncio.sleep') as sleep:
+            with mock.patch.object(self.sut, '_send_once', side_effect=[TimeoutError(), get_response()]):
+                self.assertEqual({}, await self.sut.get_item('1', '2'))
+        self.assertEqual(1, sleep.call_count)
+
+    async def test_closes_unavailable_response_before_retrying(self):
+        unavailable = get_response(503)
+        with mock.patch('asyncio.sleep'):
+            with mock.patch.object(self.sut, '_send_once', side_effect=[unavailable, get_response()]):
+                await self.sut.get_item('1', '2')
+        unavailable.raw_response.close.assert_called_once_with()
+
+    async def test_fails_fast_once_circuit_is_open(self):
+        self.sut.retries = 0
+        self.sut.circuit_failure_threshold = 1
+        with mock.patch.object(self.sut, '_send_once', side_effect=[get_response(503)]):
+            await self.sut._get_json_response('GET', '/api/1/')
+            with self.assertRaises(circuit.CircuitOpenError):
+                await self.sut.get_item('1', '2')
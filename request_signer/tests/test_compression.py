@@ -0,0 +1,150 @@
+import gzip
+import json
+import zlib
+
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from apysigner import get_signature
+from django import http
+from django import test
+from django.test.utils import override_settings
+
+from request_signer import compression, constants
+from request_signer.client.generic.rest import BaseDjangoRestClient
+from request_signer.decorators import signature_required
+from request_signer.validator import SignatureValidator
+
+TEST_PRIVATE_KEY = 'abc123=='
+
+
+class CompressionTests(test.TestCase):
+
+    def test_round_trips_every_supported_encoding(self):
+        for encoding in compression.COMPRESSORS:
+            compressed = compression.compress(b'x' * 1000, encoding)
+            self.assertLess(len(compressed), 100)
+            self.assertEqual(b'x' * 1000, compression.decompress(compressed, encoding, 1000))
+
+    def test_raises_when_decompressed_body_is_larger_than_max_size(self):
+        with self.assertRaises(compression.DecompressionError):
+            compression.decompress(gzip.compress(b'x' * 1001), 'gzip', 1000)
+
+    def test_raises_for_truncated_body(self):
+        with self.assertRaises(compression.DecompressionError):
+            compression.decompress(gzip.compress(b'x' * 1000)[:-10], 'gzip', 1000)
+
+    def test_raises_for_corrupt_body(self):
+        with self.assertRaises(compression.DecompressionError):
+            compression.decompress(b'not compressed', 'deflate', 1000)
+
+    def test_raises_for_unsupported_encoding(self):
+        with self.assertRaises(compression.DecompressionError):
+            compression.decompress(b'', 'br', 1000)
+        with self.assertRaises(ValueError):
+            compression.compress(b'', 'br')
+
+    @override_settings(SIGNATURE_MAX_DECOMPRESSED_SIZE=5)
+    def test_reads_max_decompressed_size_setting(self):
+        self.assertEqual(5, compression.get_max_decompressed_size())
+
+
+class DecompressRequestTests(test.TestCase):
+
+    def get_request(self, body, encoding='gzip', **kwargs):
+        return test.RequestFactory().post(
+            '/', data=compression.compress(body, encoding), HTTP_CONTENT_ENCODING=encoding, **kwargs
+        )
+
+    def test_replaces_body_with_decompressed_body(self):
+        request = self.get_request(b'{"a": 1}', content_type='application/json')
+        compression.decompress_request(request)
+        self.assertEqual((b'{"a": 1}', b'{"a": 1}'), (request.body, request.read()))
+        self.assertEqual(('8', None), (request.META['CONTENT_LENGTH'], request.META.get('HTTP_CONTENT_ENCODING')))
+
+    def test_form_body_is_parsed_after_decompressing(self):
+        request = self.get_request(b'a=1&b=2', 'deflate', content_type='application/x-www-form-urlencoded')
+        compression.decompress_request(request)
+        self.assertEqual({'a': ['1'], 'b': ['2']}, dict(request.POST))
+
+    def test_leaves_body_without_content_encoding_alone(self):
+        request = test.RequestFactory().post('/', data='a=1', content_type='application/x-www-form-urlencoded')
+        compression.decompress_request(request)
+        self.assertFalse(hasattr(request, '_body'))
+
+
+@override_settings(API_KEYS={'apps-testclient': TEST_PRIVATE_KEY})
+class CompressedSignatureTests(test.TestCase):
+
+    def setUp(self):
+        self.view = signature_required(lambda request: http.HttpResponse(request.body))
+        self.url = '/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+
+    def get_request(self, body, signed_body, content_type='application/json', encoding='gzip'):
+        signature = get_signature(TEST_PRIVATE_KEY, self.url, signed_body)
+        url = '{}&{}={}'.format(self.url, constants.SIGNATURE_PARAM_NAME, signature)
+        return test.RequestFactory().post(
+            url, data=compression.compress(body, encoding), content_type=content_type, HTTP_CONTENT_ENCODING=encoding
+        )
+
+    def test_json_signature_is_checked_against_decompressed_body(self):
+        body = json.dumps({'a': 'b' * 100})
+        response = self.view(self.get_request(body.encode(), body))
+        self.assertEqual((200, body.encode()), (response.status_code, response.content))
+
+    @override_settings(SIGNATURE_STREAM_JSON_BODY=True)
+    def test_json_signature_is_checked_against_decompressed_body_when_streaming(self):
+        body = json.dumps({'a': 'b' * 100})
+        self.assertEqual(200, self.view(self.get_request(body.encode(), body)).status_code)
+
+    def test_form_signature_is_checked_against_decompressed_body(self):
+        request = self.get_request(b'a=1&a=2', {'a': ['1', '2']}, 'application/x-www-form-urlencoded', 'deflate')
+        self.assertEqual(200, self.view(request).status_code)
+
+    @override_settings(SIGNATURE_MAX_DECOMPRESSED_SIZE=10)
+    def test_rejects_body_larger_than_max_decompressed_size(self):
+        body = json.dumps({'a': 'b' * 100})
+        sut = SignatureValidator(self.get_request(body.encode(), body))
+        self.assertFalse(sut.has_valid_signature())
+        self.assertEqual('undecodable_body', sut.outcome)
+
+    def test_rejects_corrupt_body(self):
+        request = self.get_request(b'{}', '{}')
+        request._body = b'garbage'
+        self.assertEqual(400, self.view(request).status_code)
+
+
+class CompressingClientTests(test.TestCase):
+
+    def setUp(self):
+        self.sut = BaseDjangoRestClient(mock.Mock(base_url='http://api', client_id='client', private_key='abc123=='))
+        self.sut.BASE_API_ENDPOINT = '/api/'
+        self.sut.compress_requests = 'gzip'
+        self.sut.compress_min_size = 100
+
+    def build(self, data, **headers):
+        return self.sut._build_request('POST', '/api/1/', data, headers=headers)
+
+    def test_compresses_body_after_signing_it(self):
+        body = {'a': 'b' * 200}
+        request = self.build(body, **{'Content-Type': 'application/json'})
+        self.assertEqual('gzip', request.get_header('Content-encoding'))
+        self.assertEqual(json.dumps(body).encode(), gzip.decompress(request.data))
+        signature = get_signature('abc123==', 'http://api/api/1/?__client_id=client', json.dumps(body))
+        self.assertTrue(request.get_full_url().endswith('__signature=' + signature))
+
+    def test_leaves_bodies_smaller_than_min_size_alone(self):
+        request = self.build({'a': 'b'})
+        self.assertEqual((b'a=b', None), (request.data, request.get_header('Content-encoding')))
+
+    def test_leaves_bodies_alone_when_compression_is_off(self):
+        self.sut.compress_requests = None
+        self.assertEqual(b'a=' + b'b' * 200, self.build({'a': 'b' * 200}).data)
+
+    def test_compresses_with_deflate(self):
+        self.sut.compress_requests = 'deflate'
+        self.assertEqual(b'a=' + b'b' * 200, zlib.decompress(self.build({'a': 'b' * 200}).data))
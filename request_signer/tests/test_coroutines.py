@@ -0,0 +1,97 @@
+import asyncio
+import json
+import unittest
+
+from apysigner import get_signature
+from django import http
+from django import test
+from django.test.utils import override_settings
+
+from request_signer import constants
+from request_signer.decorators import signature_required
+from request_signer.models import AuthorizedClient
+from request_signer.signals import successful_signed_request
+
+try:
+    from asgiref.sync import async_to_sync
+    from request_signer import coroutines
+except ImportError:
+    coroutines = None
+
+TEST_PRIVATE_KEY = 'abc123=='
+
+
+async def async_view(request, *args, **kwargs):
+    return http.HttpResponse(request.body)
+
+
+@unittest.skipIf(coroutines is None, 'asgiref is not installed')
+@override_settings(API_KEYS={'apps-testclient': TEST_PRIVATE_KEY})
+class AsyncSignatureRequiredTests(test.TestCase):
+
+    def setUp(self):
+        self.signed_view = signature_required(async_view)
+
+    def signed_request(self, data=''):
+        url = '/test/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        return self.get_request(url, get_signature(TEST_PRIVATE_KEY, url, data), data)
+
+    def get_request(self, url, signature, data=''):
+        url = '{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature)
+        return test.client.RequestFactory().post(url, data=data, content_type='application/json')
+
+    def test_wraps_coroutine_view_in_coroutine(self):
+        self.assertTrue(asyncio.iscoroutinefunction(self.signed_view))
+
+    def test_marks_async_view_as_signed_and_csrf_exempt(self):
+        self.assertTrue(self.signed_view.signature_required)
+        self.assertTrue(self.signed_view.csrf_exempt)
+
+    def test_returns_400_when_signature_doesnt_match(self):
+        request = self.get_request('/test/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME), 'wrong')
+        response = async_to_sync(self.signed_view)(request)
+        self.assertEqual(400, response.status_code)
+
+    def test_awaits_view_when_json_signature_matches(self):
+        data = json.dumps({'our': 'data'})
+        url = '/test/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        request = self.get_request(url, get_signature(TEST_PRIVATE_KEY, url, data), data)
+        response = async_to_sync(self.signed_view)(request)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(data.encode(), response.content)
+
+    @override_settings(ALLOW_UNSIGNED_REQUESTS=True)
+    def test_awaits_view_when_unsigned_requests_are_allowed(self):
+        request = self.get_request('/test/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME), 'wrong')
+        response = async_to_sync(self.signed_view)(request)
+        self.assertEqual(200, response.status_code)
+
+    async def test_signed_async_view_is_served_through_async_client(self):
+        url = '/async-test/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        signature = get_signature(TEST_PRIVATE_KEY, url)
+        response = await self.async_client.get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b"Completed Async Test View!", response.content)
+
+    def test_verification_is_cpu_only_with_default_backends(self):
+        self.assertTrue(coroutines.verification_is_cpu_only())
+
+    def test_runs_orm_signal_receivers_off_event_loop(self):
+        counts = []
+
+        def count_clients(sender, request, **kwargs):
+            counts.append(AuthorizedClient.objects.count())
+
+        successful_signed_request.connect(count_clients)
+        self.addCleanup(successful_signed_request.disconnect, count_clients)
+        self.assertFalse(coroutines.verification_is_cpu_only())
+        response = async_to_sync(self.signed_view)(self.signed_request())
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([0], counts)
+
+    @override_settings(SIGNATURE_KEY_BACKEND='request_signer.backends.DatabaseKeyBackend')
+    def test_looks_up_database_keys_off_event_loop(self):
+        AuthorizedClient.objects.create(client_id='apps-testclient', private_key=TEST_PRIVATE_KEY)
+        self.assertFalse(coroutines.verification_is_cpu_only())
+        response = async_to_sync(self.signed_view)(self.signed_request())
+        self.assertEqual(200, response.status_code)
@@ -0,0 +1,100 @@
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from django import test
+from django.test.utils import override_settings
+
+from request_signer import dispatch
+
+received = []
+
+
+def collecting_sink(payloads):
+    received.append(payloads)
+
+
+def failing_sink(payloads):
+    raise ValueError('sink is down')
+
+
+class SynchronousDispatcherTests(test.TestCase):
+
+    @mock.patch('request_signer.signals.successful_signed_request.send')
+    def test_sends_signal_immediately(self, send_signal):
+        dispatch.SynchronousDispatcher().dispatch(sender='sender', request='request')
+        send_signal.assert_called_once_with(sender='sender', request='request')
+
+
+class GetDispatcherTests(test.TestCase):
+
+    def test_returns_synchronous_dispatcher_by_default(self):
+        self.assertIsInstance(dispatch.get_dispatcher(), dispatch.SynchronousDispatcher)
+
+    @override_settings(SIGNATURE_SIGNAL_DISPATCHER='request_signer.dispatch.QueuedDispatcher')
+    def test_returns_same_configured_dispatcher_every_time(self):
+        dispatcher = dispatch.get_dispatcher()
+        self.assertIsInstance(dispatcher, dispatch.QueuedDispatcher)
+        self.assertIs(dispatcher, dispatch.get_dispatcher())
+
+
+class QueuedDispatcherTests(test.TestCase):
+
+    def setUp(self):
+        del received[:]
+
+    @mock.patch('request_signer.signals.successful_signed_request.send')
+    def test_sends_signal_from_background_thread_by_default(self, send_signal):
+        sut = dispatch.QueuedDispatcher()
+        sut.dispatch(sender='sender', request='request')
+        sut.flush()
+        send_signal.assert_called_once_with(sender='sender', request='request')
+        self.assertEqual(1, sut.stats()['sent'])
+
+    @override_settings(SIGNATURE_SIGNAL_SINK='request_signer.tests.test_dispatch.collecting_sink')
+    def test_hands_payloads_to_configured_sink(self):
+        sut = dispatch.QueuedDispatcher()
+        sut.dispatch(sender='sender', request='request')
+        sut.flush()
+        self.assertEqual([[{'sender': 'sender', 'request': 'request'}]], received)
+
+    @override_settings(SIGNATURE_SIGNAL_QUEUE_SIZE=1)
+    def test_drops_payloads_when_queue_is_full(self):
+        sut = dispatch.QueuedDispatcher()
+        sut.queue.put({})
+        with mock.patch.object(sut, '_ensure_worker'):
+            sut.dispatch(sender='sender', request='request')
+        self.assertEqual(1, sut.stats()['dropped'])
+        self.assertEqual(0, sut.stats()['queued'])
+
+    @override_settings(SIGNATURE_SIGNAL_QUEUE_SIZE=1, SIGNATURE_SIGNAL_QUEUE_POLICY='block')
+    def test_blocks_for_timeout_before_dropping_when_policy_is_block(self):
+        sut = dispatch.QueuedDispatcher()
+        sut.queue.put({})
+        with mock.patch.object(sut, '_ensure_worker'), mock.patch.object(sut.queue, 'put') as put:
+            put.side_effect = dispatch.queue.Full
+            sut.dispatch(sender='sender', request='request')
+        put.assert_called_once_with({'sender': 'sender', 'request': 'request'}, True, 0.1)
+        self.assertEqual(1, sut.stats()['dropped'])
+
+    @override_settings(
+        SIGNATURE_SIGNAL_SINK='request_signer.tests.test_dispatch.collecting_sink', SIGNATURE_SIGNAL_BATCH_SIZE=2
+    )
+    def test_sends_queued_payloads_in_batches(self):
+        sut = dispatch.QueuedDispatcher()
+        for index in range(3):
+            sut.queue.put({'index': index})
+        sut._ensure_worker()
+        sut.flush()
+        self.assertEqual([[{'index': 0}, {'index': 1}], [{'index': 2}]], received)
+
+    @override_settings(SIGNATURE_SIGNAL_SINK='request_signer.tests.test_dispatch.failing_sink')
+    def test_counts_errors_from_sink(self):
+        sut = dispatch.QueuedDispatcher()
+        with mock.patch.object(dispatch.logger, 'exception'):
+            sut.dispatch(sender='sender', request='request')
+            sut.flush()
+        self.assertEqual(1, sut.stats()['errors'])
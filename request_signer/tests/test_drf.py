@@ -0,0 +1,88 @@
+import unittest
+
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from apysigner import get_signature
+from django import test
+from django.test.utils import override_settings
+
+from request_signer import constants, loading
+from request_signer.decorators import get_validator
+
+try:
+    from rest_framework import response, views
+    from rest_framework.test import APIRequestFactory
+    from request_signer.drf import IsSignedRequest, SignedClientRateThrottle, SignedRequestAuthentication
+except ImportError:
+    views = None
+
+TEST_PRIVATE_KEY = 'abc123=='
+
+
+@unittest.skipIf(views is None, 'djangorestframework is not installed')
+@override_settings(API_KEYS={'apps-testclient': TEST_PRIVATE_KEY})
+class RestFrameworkTests(test.TestCase):
+
+    def setUp(self):
+        class SignedView(views.APIView):
+            authentication_classes = [SignedRequestAuthentication]
+            permission_classes = [IsSignedRequest]
+            throttle_classes = [SignedClientRateThrottle]
+
+            def get(self, request):
+                return response.Response({'client': request.auth})
+
+        self.view = SignedView.as_view()
+
+    def get_request(self, signature=None):
+        url = '/api/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        if signature is None:
+            return APIRequestFactory().get(url)
+        return APIRequestFactory().get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+
+    def signed_request(self):
+        url = '/api/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        return self.get_request(get_signature(TEST_PRIVATE_KEY, url))
+
+    def test_sets_client_id_as_auth_for_signed_request(self):
+        response = self.view(self.signed_request())
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'client': 'apps-testclient'}, response.data)
+
+    def test_verifies_signature_once_for_authentication_and_permission(self):
+        with mock.patch('request_signer.decorators.get_validator', wraps=get_validator) as validator:
+            self.assertEqual(200, self.view(self.signed_request()).status_code)
+        self.assertEqual(1, validator.call_count)
+
+    def test_fails_authentication_when_signature_does_not_match(self):
+        response = self.view(self.get_request('wrong'))
+        self.assertEqual((401, 'Signature'), (response.status_code, response['WWW-Authenticate']))
+        self.assertEqual('Invalid request signature.', response.data['detail'])
+
+    def test_leaves_unsigned_request_to_other_authentication(self):
+        request = views.APIView().initialize_request(self.get_request())
+        self.assertIsNone(SignedRequestAuthentication().authenticate(request))
+
+    def test_denies_unsigned_request(self):
+        response = self.view(self.get_request())
+        self.assertEqual(401, response.status_code)
+
+    def test_permission_denies_request_without_valid_signature(self):
+        request = views.APIView().initialize_request(self.get_request('wrong'))
+        self.assertFalse(IsSignedRequest().has_permission(request, None))
+
+    @override_settings(ALLOW_UNSIGNED_REQUESTS=True)
+    def test_allows_unsigned_request_when_unsigned_requests_are_allowed(self):
+        response = self.view(self.get_request())
+        self.assertEqual({'client': None}, response.data)
+
+    @override_settings(SIGNATURE_RATE_LIMITS={'apps-testclient': (1, 60)})
+    def test_throttles_client_over_its_quota(self):
+        with mock.patch.dict(loading._configured, clear=True):
+            statuses = [self.view(self.signed_request()).status_code for _ in range(2)]
+        self.assertEqual([200, 429], statuses)
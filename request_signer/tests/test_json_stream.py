@@ -0,0 +1,76 @@
+import io
+import json
+
+from django import test
+from django.test.utils import override_settings
+
+from request_signer.client.generic import json_stream
+
+ITEMS = [{'id': i, 'name': u'caf\xe9 {}'.format(i), 'tags': [1.5, None, True]} for i in range(50)] + [12345, 'x']
+
+
+def body(value, indent=None):
+    return io.BytesIO(json.dumps(value, indent=indent).encode())
+
+
+class IterItemsTests(test.TestCase):
+
+    def test_yields_array_items_for_every_chunk_size(self):
+        for chunk_size in (1, 2, 3, 7, 64, 4096):
+            self.assertEqual(ITEMS, list(json_stream.iter_items(body(ITEMS).read, chunk_size)))
+
+    def test_handles_whitespace_between_items(self):
+        self.assertEqual(ITEMS, list(json_stream.iter_items(body(ITEMS, indent=4).read, 5)))
+
+    def test_does_not_cut_numbers_off_between_chunks(self):
+        self.assertEqual([1234567, 89], list(json_stream.iter_items(io.BytesIO(b'[1234567,89]').read, 3)))
+
+    def test_yields_items_before_the_rest_of_the_body_is_read(self):
+        stream = body(ITEMS)
+        items = json_stream.iter_items(stream.read, 64)
+        next(items)
+        self.assertLess(stream.tell(), 200)
+
+    def test_yields_nothing_for_empty_array_or_empty_body(self):
+        self.assertEqual([], list(json_stream.iter_items(io.BytesIO(b' [ ] ').read, 1)))
+        self.assertEqual([], list(json_stream.iter_items(io.BytesIO(b'').read, 1)))
+
+    def test_yields_results_of_paginated_object(self):
+        stream = body({'next': None, 'results': ITEMS})
+        self.assertEqual(ITEMS, list(json_stream.iter_items(stream.read, 16)))
+
+    def test_yields_results_between_other_members_for_every_chunk_size(self):
+        value = {'count': 52, 'previous': {'a': [1, '}']}, 'results': ITEMS, 'next': 'http://x/?a=]'}
+        for chunk_size in (1, 3, 16, 4096):
+            self.assertEqual(ITEMS, list(json_stream.iter_items(body(value, indent=2).read, chunk_size)))
+
+    def test_yields_results_before_the_rest_of_the_object_is_read(self):
+        stream = body({'next': None, 'results': ITEMS})
+        items = json_stream.iter_items(stream.read, 64)
+        next(items)
+        self.assertLess(stream.tell(), 200)
+
+    def test_yields_nothing_for_object_without_results(self):
+        self.assertEqual([], list(json_stream.iter_items(body({'detail': 'x', 'results': None}).read, 4)))
+        self.assertEqual([], list(json_stream.iter_items(io.BytesIO(b' { } ').read, 1)))
+
+    def test_raises_value_error_on_scalar_or_string_body(self):
+        for value in (1, 'x', None):
+            with self.assertRaises(ValueError):
+                list(json_stream.iter_items(body(value).read, 4))
+
+    def test_raises_value_error_on_truncated_body(self):
+        with self.assertRaises(ValueError):
+            list(json_stream.iter_items(io.BytesIO(b'[{"a": 1}, {"b"').read, 4))
+
+    def test_raises_value_error_on_missing_separator(self):
+        with self.assertRaises(ValueError):
+            list(json_stream.iter_items(io.BytesIO(b'[1 2]').read, 4))
+
+    def test_raises_value_error_on_truncated_utf8(self):
+        with self.assertRaises(ValueError):
+            list(json_stream.iter_items(io.BytesIO(u'["\xe9"]'.encode()[:-3]).read, 2))
+
+    @override_settings(SIGNATURE_CLIENT_STREAM_CHUNK_SIZE=10)
+    def test_reads_chunk_size_setting(self):
+        self.assertEqual(10, json_stream.IncrementalJsonReader(io.BytesIO().read).chunk_size)
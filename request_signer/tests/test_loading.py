@@ -0,0 +1,63 @@
+import threading
+import time
+
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from django import test
+from django.test.utils import override_settings
+
+from request_signer import loading, metrics
+
+
+class GetConfiguredTests(test.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.dict(loading._configured, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_instantiates_default_class_once(self):
+        sut = loading.get_configured('SIGNATURE_TEST_BACKEND', 'request_signer.metrics.InMemoryMetrics')
+        self.assertIsInstance(sut, metrics.InMemoryMetrics)
+        self.assertIs(sut, loading.get_configured('SIGNATURE_TEST_BACKEND', 'request_signer.metrics.InMemoryMetrics'))
+
+    def test_builds_new_object_when_setting_changes(self):
+        first = loading.get_configured('SIGNATURE_TEST_BACKEND', 'request_signer.metrics.InMemoryMetrics')
+        with override_settings(SIGNATURE_TEST_BACKEND='request_signer.metrics.NullMetrics'):
+            self.assertIsInstance(
+                loading.get_configured('SIGNATURE_TEST_BACKEND', 'request_signer.metrics.InMemoryMetrics'),
+                metrics.NullMetrics
+            )
+        self.assertIs(first, loading.get_configured('SIGNATURE_TEST_BACKEND', 'request_signer.metrics.InMemoryMetrics'))
+
+    @override_settings(SIGNATURE_TEST_PATHS=['a', 'b'])
+    def test_builds_list_settings_with_given_function(self):
+        build = mock.Mock(return_value='built')
+        self.assertEqual('built', loading.get_configured('SIGNATURE_TEST_PATHS', (), build))
+        self.assertEqual('built', loading.get_configured('SIGNATURE_TEST_PATHS', (), build))
+        build.assert_called_once_with(['a', 'b'])
+
+    def test_keeps_settings_with_the_same_value_apart(self):
+        first = loading.get_configured('SIGNATURE_TEST_A', 'request_signer.metrics.InMemoryMetrics')
+        self.assertIsNot(first, loading.get_configured('SIGNATURE_TEST_B', 'request_signer.metrics.InMemoryMetrics'))
+
+    def test_builds_once_when_first_calls_race(self):
+        def build(value):
+            time.sleep(0.01)
+            return object()
+
+        built = []
+        threads = [
+            threading.Thread(target=lambda: built.append(loading.get_configured('SIGNATURE_TEST_X', 'x', build)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, len(set(map(id, built))))
@@ -0,0 +1,166 @@
+import time
+
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from apysigner import get_signature
+from django import test
+from django.test.utils import override_settings
+
+from request_signer import constants, loading, metrics
+from request_signer.validator import SignatureValidator
+
+TEST_PRIVATE_KEY = 'abc123=='
+
+
+class HistogramTests(test.TestCase):
+
+    def test_renders_cumulative_buckets_sum_and_count(self):
+        sut = metrics.Histogram((1, 5))
+        for value in (0.5, 3, 3, 10):
+            sut.observe(value)
+        self.assertEqual([
+            'x_bucket{a="b",le="1"} 1',
+            'x_bucket{a="b",le="5"} 3',
+            'x_bucket{a="b",le="+Inf"} 4',
+            'x_sum{a="b"} 16.5',
+            'x_count{a="b"} 4',
+        ], list(sut.render('x', [('a', 'b')])))
+
+
+class FormatLabelsTests(test.TestCase):
+
+    def test_returns_empty_string_without_labels(self):
+        self.assertEqual('', metrics.format_labels([]))
+
+    def test_escapes_label_values(self):
+        self.assertEqual(r'{a="x\"y\\z\n"}', metrics.format_labels([('a', 'x"y\\z\n')]))
+
+
+class InMemoryMetricsTests(test.TestCase):
+
+    def test_renders_counters_by_outcome_client_and_form(self):
+        sut = metrics.InMemoryMetrics()
+        sut.record('valid', 'client-a', 'canonical', 10, 0.001)
+        sut.record('mismatch', 'client-a', None, 0, 0.002)
+        output = sut.render()
+        self.assertIn('request_signer_verifications_total{outcome="valid"} 1', output)
+        self.assertIn('request_signer_client_verifications_total{client_id="client-a",outcome="mismatch"} 1', output)
+        self.assertIn('request_signer_matched_url_form_total{form="canonical"} 1', output)
+        self.assertIn('request_signer_verification_seconds_count{outcome="mismatch"} 1', output)
+        self.assertIn('request_signer_body_bytes_sum 10', output)
+
+    @override_settings(SIGNATURE_METRICS_PER_CLIENT=False)
+    def test_skips_per_client_counters_when_turned_off(self):
+        sut = metrics.InMemoryMetrics()
+        sut.record('valid', 'client-a', 'raw', 0, 0.001)
+        self.assertNotIn('client-a', sut.render())
+
+    def test_renders_circuit_transitions(self):
+        sut = metrics.InMemoryMetrics()
+        sut.record_circuit_transition('api', 'closed', 'open')
+        self.assertIn(
+            'request_signer_client_circuit_transitions_total{circuit="api",from_state="closed",to_state="open"} 1',
+            sut.render()
+        )
+
+
+class NullMetricsTests(test.TestCase):
+
+    def test_is_default_and_renders_nothing(self):
+        sut = metrics.get_metrics()
+        sut.record('valid', 'client-a', 'raw', 0, 0.001)
+        self.assertIsInstance(sut, metrics.NullMetrics)
+        self.assertEqual('', sut.render())
+
+
+@override_settings(API_KEYS={'apps-testclient': TEST_PRIVATE_KEY})
+class ValidatorOutcomeTests(test.TestCase):
+
+    def get_validator(self, url, signature=None):
+        signature = signature or get_signature(TEST_PRIVATE_KEY, url)
+        request = test.client.RequestFactory().get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+        validator = SignatureValidator(request)
+        validator.has_valid_signature()
+        return validator
+
+    def test_valid_outcome_reports_matched_form(self):
+        url = '/a b/?x=%2C&{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        validator = self.get_validator(url)
+        self.assertEqual(('valid', 'canonical'), (validator.outcome, validator.matched_form))
+
+    def test_missing_signature_outcome(self):
+        request = test.client.RequestFactory().get('/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME))
+        self.assertEqual('missing_signature', SignatureValidator(request).outcome)
+
+    def test_unknown_client_outcome(self):
+        validator = self.get_validator('/?{}=unknown'.format(constants.CLIENT_ID_PARAM_NAME))
+        self.assertEqual('unknown_client', validator.outcome)
+
+    def test_mismatch_outcome(self):
+        validator = self.get_validator('/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME), 'A' * 43 + '=')
+        self.assertEqual('mismatch', validator.outcome)
+
+    def test_malformed_signature_outcome(self):
+        validator = self.get_validator('/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME), 'wrong')
+        self.assertEqual('malformed_signature', validator.outcome)
+
+    def test_stale_outcome(self):
+        url = '/?{}=apps-testclient&{}={}'.format(
+            constants.CLIENT_ID_PARAM_NAME, constants.TIMESTAMP_PARAM_NAME, int(time.time()) - 1000
+        )
+        self.assertEqual('stale', self.get_validator(url).outcome)
+
+    @override_settings(SIGNATURE_METRICS='request_signer.metrics.InMemoryMetrics')
+    def test_records_outcome_in_configured_metrics_and_exports_them(self):
+        loading._configured.clear()
+        url = '/test/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        self.client.get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, get_signature(TEST_PRIVATE_KEY, url)))
+        response = self.client.get('/metrics/')
+        self.assertEqual('text/plain; version=0.0.4; charset=utf-8', response['Content-Type'])
+        self.assertIn(
+            b'request_signer_client_verifications_total{client_id="apps-testclient",outcome="valid"} 1',
+            response.content
+        )
+
+    @override_settings(SIGNATURE_METRICS='request_signer.metrics.InMemoryMetrics')
+    def test_counts_rejections_before_client_is_known_by_outcome_only(self):
+        loading._configured.clear()
+        self.get_validator('/?{}=unknown'.format(constants.CLIENT_ID_PARAM_NAME))
+        self.get_validator('/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME), 'wrong')
+        output = metrics.get_metrics().render()
+        self.assertIn('request_signer_verifications_total{outcome="unknown_client"} 1', output)
+        self.assertIn('request_signer_verifications_total{outcome="malformed_signature"} 1', output)
+        self.assertNotIn('client_id=', output)
+
+    @override_settings(SIGNATURE_METRICS='request_signer.metrics.InMemoryMetrics')
+    def test_counts_mismatch_of_known_client_per_client(self):
+        loading._configured.clear()
+        self.get_validator('/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME), 'A' * 43 + '=')
+        self.assertIn(
+            'request_signer_client_verifications_total{client_id="apps-testclient",outcome="mismatch"} 1',
+            metrics.get_metrics().render()
+        )
+
+    def test_times_verification_without_signal_dispatch(self):
+        calls = []
+        with mock.patch('request_signer.validator.default_timer', side_effect=lambda: calls.append('timer') or 0), \
+                mock.patch('request_signer.dispatch.SynchronousDispatcher.dispatch',
+                           side_effect=lambda **kwargs: calls.append('dispatch')):
+            self.get_validator('/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME))
+        self.assertEqual(['timer', 'timer', 'dispatch'], calls)
+
+    @override_settings(SIGNATURE_METRICS='request_signer.metrics.InMemoryMetrics')
+    def test_records_body_size_zero_when_content_length_is_not_a_number(self):
+        loading._configured.clear()
+        url = '/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        request = test.client.RequestFactory().get(
+            '{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, get_signature(TEST_PRIVATE_KEY, url)),
+            CONTENT_LENGTH='abc'
+        )
+        self.assertTrue(SignatureValidator(request).has_valid_signature())
+        self.assertIn('request_signer_body_bytes_sum 0', metrics.get_metrics().render())
@@ -0,0 +1,87 @@
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from apysigner import get_signature
+from django import http
+from django import test
+from django.core.exceptions import MiddlewareNotUsed
+from django.test.utils import override_settings
+
+from request_signer import constants
+from request_signer.decorators import get_validator, signature_required
+from request_signer.middleware import SignatureMiddleware, compile_patterns
+
+TEST_PRIVATE_KEY = 'abc123=='
+
+
+@override_settings(
+    API_KEYS={'apps-testclient': TEST_PRIVATE_KEY},
+    SIGNATURE_REQUIRED_PATHS=[r'^/api/', r'^/internal/'],
+    SIGNATURE_EXEMPT_PATHS=[r'^/api/public/'],
+)
+class SignatureMiddlewareTests(test.TestCase):
+
+    def setUp(self):
+        self.get_response = mock.Mock(return_value=http.HttpResponse("Completed Test View!"))
+        self.sut = SignatureMiddleware(self.get_response)
+
+    def get_request(self, path, signed=False):
+        url = '{}?{}=apps-testclient'.format(path, constants.CLIENT_ID_PARAM_NAME)
+        signature = get_signature(TEST_PRIVATE_KEY, url) if signed else 'wrong'
+        return test.client.RequestFactory().get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+
+    def test_compile_patterns_returns_none_without_patterns(self):
+        self.assertIsNone(compile_patterns([]))
+        self.assertIsNone(compile_patterns(None))
+
+    def test_compile_patterns_matches_any_pattern(self):
+        patterns = compile_patterns([r'^/a/', r'^/b/$'])
+        self.assertTrue(patterns.match('/a/x/'))
+        self.assertTrue(patterns.match('/b/'))
+        self.assertFalse(patterns.match('/b/x/'))
+
+    @override_settings(SIGNATURE_REQUIRED_PATHS=[])
+    def test_is_not_used_without_required_paths(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            SignatureMiddleware(self.get_response)
+
+    def test_returns_400_without_calling_view_when_protected_path_is_not_signed(self):
+        response = self.sut(self.get_request('/api/items/'))
+        self.assertEqual(400, response.status_code)
+        self.assertFalse(self.get_response.called)
+
+    def test_calls_view_when_protected_path_is_signed(self):
+        request = self.get_request('/internal/items/', signed=True)
+        response = self.sut(request)
+        self.assertEqual(self.get_response.return_value, response)
+        self.get_response.assert_called_once_with(request)
+
+    def test_signed_requests_skip_csrf_checks(self):
+        request = self.get_request('/api/items/', signed=True)
+        self.sut(request)
+        self.assertTrue(request._dont_enforce_csrf_checks)
+
+    def test_calls_view_when_path_is_not_protected(self):
+        response = self.sut(self.get_request('/other/'))
+        self.assertEqual(self.get_response.return_value, response)
+
+    def test_calls_view_when_path_is_exempt(self):
+        response = self.sut(self.get_request('/api/public/items/'))
+        self.assertEqual(self.get_response.return_value, response)
+
+    @override_settings(ALLOW_UNSIGNED_REQUESTS=True)
+    def test_calls_view_when_unsigned_requests_are_allowed(self):
+        response = self.sut(self.get_request('/api/items/'))
+        self.assertEqual(self.get_response.return_value, response)
+
+    def test_decorated_view_behind_middleware_reuses_verification(self):
+        request = self.get_request('/api/items/', signed=True)
+        view = signature_required(lambda request: http.HttpResponse(request.signed_client))
+        with mock.patch('request_signer.decorators.get_validator', wraps=get_validator) as validator:
+            response = SignatureMiddleware(view)(request)
+        self.assertEqual(b'apps-testclient', response.content)
+        validator.assert_called_once_with(request)
@@ -0,0 +1,86 @@
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from apysigner import get_signature
+from django import test
+from django.test.utils import override_settings
+
+from request_signer import constants, loading, prechecks
+from request_signer.signing import Signer
+from request_signer.validator import SignatureValidator
+
+TEST_PRIVATE_KEY = 'abc123=='
+
+
+def reject_everything(validator):
+    return 'rejected'
+
+
+@override_settings(API_KEYS={'apps-testclient': TEST_PRIVATE_KEY})
+class PrecheckTests(test.TestCase):
+
+    def get_validator(self, client_id='apps-testclient', signature=None, **extra):
+        url = '/?{}={}'.format(constants.CLIENT_ID_PARAM_NAME, client_id)
+        signature = signature or get_signature(TEST_PRIVATE_KEY, url)
+        request = test.client.RequestFactory().post(
+            '{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature), data={}, **extra
+        )
+        return SignatureValidator(request)
+
+    def assert_rejected_without_hashing(self, validator, reason):
+        with mock.patch.object(Signer, 'create_signature') as create_signature:
+            self.assertFalse(validator.has_valid_signature())
+        self.assertEqual(reason, validator.outcome)
+        self.assertFalse(create_signature.called)
+
+    def test_passes_well_formed_signature_from_known_client(self):
+        validator = self.get_validator()
+        self.assertIsNone(validator.rejection)
+        self.assertTrue(validator.has_valid_signature())
+
+    def test_rejects_malformed_signature_without_hashing(self):
+        self.assert_rejected_without_hashing(self.get_validator(signature='wrong'), 'malformed_signature')
+
+    def test_rejects_unknown_client_without_hashing(self):
+        self.assert_rejected_without_hashing(self.get_validator(client_id='unknown'), 'unknown_client')
+
+    @override_settings(SIGNATURE_MAX_BODY_SIZE=10)
+    def test_rejects_body_over_size_limit_without_hashing_or_reading_it(self):
+        validator = self.get_validator(CONTENT_LENGTH='11')
+        self.assert_rejected_without_hashing(validator, 'body_too_large')
+        self.assertFalse(hasattr(validator.request, '_body'))
+
+    @override_settings(SIGNATURE_MAX_BODY_SIZE=10)
+    def test_passes_body_within_size_limit(self):
+        self.assertIsNone(self.get_validator(CONTENT_LENGTH='10').rejection)
+
+    @override_settings(SIGNATURE_MAX_BODY_SIZE=10)
+    def test_passes_content_length_that_is_not_a_number(self):
+        self.assertIsNone(self.get_validator(CONTENT_LENGTH='abc').rejection)
+
+    def test_rejects_malformed_signature_before_looking_up_client(self):
+        validator = self.get_validator(signature='wrong')
+        with mock.patch('request_signer.backends.get_key_backend') as get_key_backend:
+            self.assertEqual('malformed_signature', validator.rejection)
+        self.assertFalse(get_key_backend.called)
+
+    @override_settings(SIGNATURE_PRECHECKS=['request_signer.tests.test_prechecks.reject_everything'])
+    def test_runs_checks_configured_in_settings(self):
+        self.assert_rejected_without_hashing(self.get_validator(), 'rejected')
+
+    @override_settings(SIGNATURE_PRECHECKS=[
+        'request_signer.prechecks.signature_is_well_formed', 'request_signer.tests.test_prechecks.reject_everything'
+    ])
+    def test_stops_at_first_check_that_rejects(self):
+        self.assertEqual('malformed_signature', self.get_validator(signature='wrong').rejection)
+
+    def test_imports_checks_once(self):
+        with mock.patch.dict(loading._configured, clear=True):
+            with mock.patch('request_signer.prechecks.import_string') as import_string:
+                prechecks.get_prechecks()
+                prechecks.get_prechecks()
+        self.assertEqual(len(prechecks.DEFAULT_PRECHECKS), import_string.call_count)
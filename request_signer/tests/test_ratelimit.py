@@ -0,0 +1,124 @@
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from apysigner import get_signature
+from django import http
+from django import test
+from django.core.cache import caches
+from django.test.utils import override_settings
+
+from request_signer import constants, loading, ratelimit
+from request_signer.decorators import signature_required
+from request_signer.middleware import SignatureMiddleware
+
+TEST_PRIVATE_KEY = 'abc123=='
+
+
+class GetRateLimitTests(test.TestCase):
+
+    @override_settings(SIGNATURE_RATE_LIMITS={'apps-testclient': (10, 60)}, SIGNATURE_DEFAULT_RATE_LIMIT=(100, 60))
+    def test_returns_client_quota(self):
+        self.assertEqual((10, 60), ratelimit.get_rate_limit('apps-testclient'))
+
+    @override_settings(SIGNATURE_RATE_LIMITS={'apps-testclient': (10, 60)}, SIGNATURE_DEFAULT_RATE_LIMIT=(100, 60))
+    def test_falls_back_to_default_quota(self):
+        self.assertEqual((100, 60), ratelimit.get_rate_limit('other'))
+
+    @override_settings(SIGNATURE_RATE_LIMITS={'apps-testclient': None}, SIGNATURE_DEFAULT_RATE_LIMIT=(100, 60))
+    def test_client_can_be_exempt_from_default_quota(self):
+        self.assertIsNone(ratelimit.get_rate_limit('apps-testclient'))
+
+    def test_returns_none_without_settings(self):
+        self.assertIsNone(ratelimit.get_rate_limit('apps-testclient'))
+
+
+class RateLimiterTestsMixin(object):
+
+    def test_allows_requests_up_to_limit_in_window(self):
+        self.assertEqual([True, True, True, False], [self.sut.allow('a', 3, 60, now=1200 + i) for i in range(4)])
+
+    def test_counts_each_key_separately(self):
+        self.sut.allow('a', 1, 60, now=1200)
+        self.assertTrue(self.sut.allow('b', 1, 60, now=1200))
+
+    def test_weights_previous_window_by_its_overlap(self):
+        for _ in range(4):
+            self.sut.allow('a', 4, 60, now=1200)
+        self.assertFalse(self.sut.allow('a', 4, 60, now=1260))
+        self.assertTrue(self.sut.allow('a', 4, 60, now=1290))
+
+    def test_forgets_windows_older_than_previous_one(self):
+        for _ in range(4):
+            self.sut.allow('a', 4, 60, now=1200)
+        self.assertTrue(self.sut.allow('a', 4, 60, now=1320))
+
+
+class MemoryRateLimiterTests(RateLimiterTestsMixin, test.TestCase):
+
+    def setUp(self):
+        self.sut = ratelimit.MemoryRateLimiter()
+
+    def test_drops_windows_older_than_previous_one(self):
+        self.sut.allow('a', 4, 60, now=1200)
+        self.sut.allow('a', 4, 60, now=1260)
+        self.sut.allow('a', 4, 60, now=1320)
+        self.assertEqual([('a', 21), ('a', 22)], sorted(self.sut._windows))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CacheRateLimiterTests(RateLimiterTestsMixin, test.TestCase):
+
+    def setUp(self):
+        self.sut = ratelimit.CacheRateLimiter()
+        caches['default'].clear()
+
+    def test_counts_again_when_window_expired_between_add_and_incr(self):
+        with mock.patch.object(self.sut.cache, 'add', return_value=False):
+            self.assertEqual((1, 0), self.sut.hit('a', 20, 60))
+
+
+@override_settings(
+    API_KEYS={'apps-testclient': TEST_PRIVATE_KEY},
+    SIGNATURE_RATE_LIMITS={'apps-testclient': (2, 60)},
+    SIGNATURE_REQUIRED_PATHS=[r'^/api/'],
+)
+class RateLimitedViewTests(test.TestCase):
+
+    def setUp(self):
+        self.view = mock.Mock(return_value=http.HttpResponse("Completed Test View!"))
+        patcher = mock.patch.dict(loading._configured, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def signed_request(self, client_id='apps-testclient'):
+        url = '/api/?{}={}'.format(constants.CLIENT_ID_PARAM_NAME, client_id)
+        signature = get_signature(TEST_PRIVATE_KEY, url)
+        return test.client.RequestFactory().get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+
+    def test_returns_429_before_view_runs_once_client_is_over_quota(self):
+        signed_view = signature_required(self.view)
+        statuses = [signed_view(self.signed_request()).status_code for _ in range(3)]
+        self.assertEqual([200, 200, 429], statuses)
+        self.assertEqual(2, self.view.call_count)
+
+    def test_middleware_returns_429_once_client_is_over_quota(self):
+        middleware = SignatureMiddleware(self.view)
+        statuses = [middleware(self.signed_request()).status_code for _ in range(3)]
+        self.assertEqual([200, 200, 429], statuses)
+
+    def test_counts_request_once_behind_middleware_and_decorator(self):
+        middleware = SignatureMiddleware(signature_required(self.view))
+        statuses = [middleware(self.signed_request()).status_code for _ in range(3)]
+        self.assertEqual([200, 200, 429], statuses)
+
+    @override_settings(ALLOW_UNSIGNED_REQUESTS=True)
+    def test_does_not_count_requests_without_valid_signature(self):
+        signed_view = signature_required(self.view)
+        request = test.client.RequestFactory().get('/api/')
+        with mock.patch.object(ratelimit, 'get_rate_limiter') as get_rate_limiter:
+            self.assertEqual(200, signed_view(request).status_code)
+        self.assertFalse(get_rate_limiter.called)
@@ -0,0 +1,129 @@
+import time
+
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from apysigner import get_signature
+from django import test
+from django.test.utils import override_settings
+
+from request_signer import constants, loading, replay
+from request_signer.signing import Signer
+from request_signer.validator import SignatureValidator
+
+TEST_PRIVATE_KEY = 'abc123=='
+
+
+class IsFreshTests(test.TestCase):
+
+    def test_returns_true_within_max_age_either_way(self):
+        self.assertTrue(replay.is_fresh('1000', now=1300))
+        self.assertTrue(replay.is_fresh('1300', now=1000))
+
+    def test_returns_false_outside_max_age(self):
+        self.assertFalse(replay.is_fresh('1000', now=1301))
+
+    @override_settings(SIGNATURE_MAX_AGE=10)
+    def test_uses_max_age_from_settings(self):
+        self.assertFalse(replay.is_fresh('1000', now=1011))
+
+    def test_returns_false_when_timestamp_is_not_a_number(self):
+        self.assertFalse(replay.is_fresh('yesterday'))
+
+
+class MemoryNonceStoreTests(test.TestCase):
+
+    def setUp(self):
+        self.sut = replay.MemoryNonceStore()
+
+    def test_add_returns_false_for_key_already_added(self):
+        self.assertTrue(self.sut.add('a', 100, now=1000))
+        self.assertFalse(self.sut.add('a', 100, now=1050))
+
+    def test_add_accepts_key_again_once_expired(self):
+        self.sut.add('a', 100, now=1000)
+        self.assertTrue(self.sut.add('a', 100, now=1200))
+
+    def test_expired_keys_are_dropped_a_bucket_at_a_time(self):
+        for offset in range(100):
+            self.sut.add(str(offset), 100, now=1000 + offset)
+        self.assertEqual(10, len(self.sut._buckets))
+        self.sut.add('new', 100, now=1500)
+        self.assertEqual(1, len(self.sut._buckets))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CacheNonceStoreTests(test.TestCase):
+
+    def test_add_returns_false_for_key_already_added(self):
+        sut = replay.CacheNonceStore()
+        self.assertTrue(sut.add('client:a', 100))
+        self.assertFalse(sut.add('client:a', 100))
+        self.assertTrue(sut.add('client:b', 100))
+
+
+class NonceWasUnusedTests(test.TestCase):
+
+    @override_settings(SIGNATURE_NONCE_STORE='request_signer.replay.CacheNonceStore', SIGNATURE_MAX_AGE=10)
+    def test_adds_client_nonce_to_configured_store_for_twice_max_age(self):
+        with mock.patch.object(replay.CacheNonceStore, 'add') as add:
+            result = replay.nonce_was_unused('client', 'abc')
+        add.assert_called_once_with('client:abc', 20)
+        self.assertEqual(add.return_value, result)
+
+
+@override_settings(API_KEYS={'apps-testclient': TEST_PRIVATE_KEY})
+class ReplayProtectionTests(test.TestCase):
+
+    def setUp(self):
+        loading._configured.clear()
+
+    def get_validator(self, **params):
+        url = '/test/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        for name, value in params.items():
+            url += '&{}={}'.format(name, value)
+        signature = get_signature(TEST_PRIVATE_KEY, url)
+        request = test.client.RequestFactory().get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+        return SignatureValidator(request)
+
+    def test_accepts_fresh_timestamp_and_unused_nonce(self):
+        validator = self.get_validator(**{
+            constants.TIMESTAMP_PARAM_NAME: int(time.time()), constants.NONCE_PARAM_NAME: 'n1'
+        })
+        self.assertTrue(validator.has_valid_signature())
+
+    def test_rejects_stale_timestamp_without_hashing(self):
+        validator = self.get_validator(**{constants.TIMESTAMP_PARAM_NAME: int(time.time()) - 1000})
+        with mock.patch.object(Signer, 'signature_matches') as signature_matches:
+            self.assertFalse(validator.has_valid_signature())
+        self.assertFalse(signature_matches.called)
+
+    def test_rejects_reused_nonce(self):
+        params = {constants.TIMESTAMP_PARAM_NAME: int(time.time()), constants.NONCE_PARAM_NAME: 'n2'}
+        self.assertTrue(self.get_validator(**params).has_valid_signature())
+        self.assertFalse(self.get_validator(**params).has_valid_signature())
+
+    def test_does_not_record_nonce_when_signature_does_not_match(self):
+        params = {constants.TIMESTAMP_PARAM_NAME: int(time.time()), constants.NONCE_PARAM_NAME: 'n3'}
+        validator = self.get_validator(**params)
+        with mock.patch.object(Signer, 'signature_matches', return_value=None):
+            self.assertFalse(validator.has_valid_signature())
+        self.assertTrue(self.get_validator(**params).has_valid_signature())
+
+    @override_settings(SIGNATURE_REQUIRE_NONCE=True)
+    def test_rejects_nonce_without_timestamp_as_stale(self):
+        validator = self.get_validator(**{constants.NONCE_PARAM_NAME: 'n4'})
+        self.assertFalse(validator.has_valid_signature())
+        self.assertEqual('stale', validator.outcome)
+
+    @override_settings(SIGNATURE_REQUIRE_TIMESTAMP=True)
+    def test_rejects_missing_timestamp_when_required(self):
+        self.assertFalse(self.get_validator().has_valid_signature())
+
+    @override_settings(SIGNATURE_REQUIRE_NONCE=True)
+    def test_rejects_missing_nonce_when_required(self):
+        self.assertFalse(self.get_validator().has_valid_signature())
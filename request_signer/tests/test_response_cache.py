@@ -0,0 +1,155 @@
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from django import test
+from django.core.cache import cache as default_cache
+from django.test.utils import override_settings
+
+from request_signer.client.generic import Response, WebException, cache
+from request_signer.client.generic.rest import BaseDjangoRestClient
+
+
+def get_response(code=200, body=b'{"name": "x"}', etag=None):
+    headers = {'ETag': etag} if etag else {}
+    return Response(mock.Mock(code=code, read=mock.Mock(return_value=body), headers=headers))
+
+
+class ResponseCacheTests(test.TestCase):
+
+    def setUp(self):
+        default_cache.clear()
+        self.sut = cache.ResponseCache()
+
+    def test_key_depends_on_client_base_url_and_endpoint(self):
+        keys = {
+            self.sut.key('a', 'http://api', '/api/1/'), self.sut.key('b', 'http://api', '/api/1/'),
+            self.sut.key('a', 'http://api', '/api/2/'), self.sut.key('a', 'https://api', '/api/1/'),
+            self.sut.key('a', 'http://other', '/api/1/'), self.sut.key('a', 'http://api/v2', '/api/1/'),
+        }
+        self.assertEqual(6, len(keys))
+
+    def test_set_stores_json_and_etag_fresh_for_timeout(self):
+        with mock.patch('request_signer.client.generic.cache.time', return_value=1000):
+            self.sut.set('k', {'a': 1}, '"v1"')
+        self.assertEqual(cache.CachedResponse({'a': 1}, '"v1"', 1060), self.sut.get('k'))
+
+    def test_is_fresh_until_timeout_passed(self):
+        entry = cache.CachedResponse({}, None, 1060)
+        with mock.patch('request_signer.client.generic.cache.time', return_value=1059):
+            self.assertTrue(cache.is_fresh(entry))
+        with mock.patch('request_signer.client.generic.cache.time', return_value=1060):
+            self.assertFalse(cache.is_fresh(entry))
+
+    @override_settings(SIGNATURE_CLIENT_CACHE_SIZE=2)
+    def test_evicts_least_recently_used_response_past_max_size(self):
+        sut = cache.ResponseCache()
+        sut.set('a', 1)
+        sut.set('b', 2)
+        sut.get('a')
+        sut.set('c', 3)
+        self.assertEqual([1, None, 3], [entry and entry.json for entry in map(sut.get, 'abc')])
+
+    def test_delete_drops_responses(self):
+        self.sut.set('a', 1)
+        self.sut.set('b', 2)
+        self.sut.delete('a', 'b')
+        self.assertEqual((None, None), (self.sut.get('a'), self.sut.get('b')))
+
+    @override_settings(SIGNATURE_CLIENT_CACHE_TIMEOUT=5, SIGNATURE_CLIENT_CACHE_MAX_AGE=50,
+                       SIGNATURE_CLIENT_CACHE_SIZE=7)
+    def test_reads_cache_settings(self):
+        sut = cache.ResponseCache()
+        self.assertEqual((5, 50, 7), (sut.timeout, sut.max_age, sut.max_size))
+
+    def test_get_response_cache_returns_shared_cache(self):
+        self.assertIs(cache.get_response_cache(), cache.get_response_cache())
+
+
+class CachingRestClientTests(test.TestCase):
+
+    def setUp(self):
+        default_cache.clear()
+        self.sut = BaseDjangoRestClient(mock.Mock(base_url='http://api', client_id='client', private_key='abc123=='))
+        self.sut.BASE_API_ENDPOINT = '/api/'
+        self.sut.cache_responses = True
+
+    def test_returns_fresh_cached_json_without_request(self):
+        with mock.patch.object(self.sut, '_get_response', return_value=get_response()) as get:
+            self.sut.get_item('1', '2')
+            self.assertEqual({'name': 'x'}, self.sut.get_item('1', '2'))
+        get.assert_called_once_with('GET', '/api/1/2/', headers={'Accept': 'application/json'})
+
+    def test_revalidates_stale_json_with_etag(self):
+        with mock.patch.object(self.sut, '_get_response', return_value=get_response(etag='"v1"')):
+            self.sut.get_list('1')
+        with mock.patch('request_signer.client.generic.cache.time', return_value=10 ** 10):
+            with mock.patch.object(self.sut, '_get_response', return_value=get_response(304, b'')) as get:
+                self.assertEqual({'name': 'x'}, self.sut.get_list('1'))
+                self.assertEqual({'name': 'x'}, self.sut.get_list('1'))
+        get.assert_called_once_with(
+            'GET', '/api/1/', headers={'Accept': 'application/json', 'If-None-Match': '"v1"'}
+        )
+
+    def test_replaces_stale_json_when_changed(self):
+        with mock.patch.object(self.sut, '_get_response', return_value=get_response(etag='"v1"')):
+            self.sut.get_list('1')
+        with mock.patch('request_signer.client.generic.cache.time', return_value=10 ** 10):
+            changed = get_response(body=b'{"name": "y"}', etag='"v2"')
+            with mock.patch.object(self.sut, '_get_response', return_value=changed):
+                self.assertEqual({'name': 'y'}, self.sut.get_list('1'))
+            self.assertEqual('"v2"', cache.get_response_cache().get(self.key('/api/1/')).etag)
+
+    def test_does_not_cache_404(self):
+        with mock.patch.object(self.sut, '_get_response', return_value=get_response(404, b'')) as get:
+            self.assertEqual({}, self.sut.get_item('1', '2'))
+            self.sut.get_item('1', '2')
+        self.assertEqual(2, get.call_count)
+
+    def test_raises_web_exception_when_not_successful(self):
+        with mock.patch.object(self.sut, '_get_response', return_value=get_response(500, b'boom')):
+            with self.assertRaises(WebException):
+                self.sut.get_item('1', '2')
+
+    def test_update_and_delete_drop_cached_group_and_item(self):
+        for write in (lambda: self.sut.update('1', '2', name='y'), lambda: self.sut.delete('1', '2')):
+            self.cache_list_and_item()
+            with mock.patch.object(self.sut, '_get_json_response', return_value=get_response()):
+                write()
+            self.assertEqual((None, None), (self.cached('/api/1/'), self.cached('/api/1/2/')))
+
+    def test_create_drops_cached_group_only(self):
+        self.cache_list_and_item()
+        with mock.patch.object(self.sut, '_get_json_response', return_value=get_response()):
+            self.sut.create('1', name='y')
+        self.assertIsNone(self.cached('/api/1/'))
+        self.assertIsNotNone(self.cached('/api/1/2/'))
+
+    def test_does_not_share_cached_json_between_servers(self):
+        other = BaseDjangoRestClient(mock.Mock(base_url='http://other', client_id='client', private_key='abc123=='))
+        other.BASE_API_ENDPOINT = '/api/'
+        other.cache_responses = True
+        self.cache_list_and_item()
+        with mock.patch.object(other, '_get_response', return_value=get_response(body=b'{"name": "y"}')) as get:
+            self.assertEqual({'name': 'y'}, other.get_item('1', '2'))
+        self.assertEqual(1, get.call_count)
+
+    def test_does_not_cache_when_disabled(self):
+        self.sut.cache_responses = False
+        with mock.patch.object(self.sut, '_get_response', return_value=get_response()):
+            self.sut.get_item('1', '2')
+        self.assertIsNone(self.cached('/api/1/2/'))
+
+    def cache_list_and_item(self):
+        with mock.patch.object(self.sut, '_get_response', return_value=get_response()):
+            self.sut.get_list('1')
+            self.sut.get_item('1', '2')
+
+    def key(self, endpoint):
+        return cache.get_response_cache().key('client', 'http://api', endpoint)
+
+    def cached(self, endpoint):
+        return cache.get_response_cache().get(self.key(endpoint))
@@ -18,6 +18,7 @@ from django.core.exceptions import ImproperlyConfigured
 from apysigner import get_signature
 
 from request_signer import constants
+from request_signer.signing import Signer
 from request_signer.validator import SignatureValidator
 from request_signer.decorators import signature_required, has_valid_signature
 
@@ -84,7 +85,7 @@ class SignedRequestTests(test.TestCase):
         self.assertEqual(200, response.status_code)
 
     @mock.patch('request_signer.signals.successful_signed_request.send')
-    @mock.patch('apysigner.get_signature')
+    @mock.patch.object(Signer, 'create_signature')
     def test_fires_successful_signed_request_signal_from_signature_required_decorator(self, get_signature, send_signal):
         get_signature.return_value = '4ZAQJqmWE_C9ozPkpJ3Owh0Z_DFtYkCdi4XAc-vOLtI='
         request = self.get_request(
@@ -101,7 +102,7 @@ class SignedRequestTests(test.TestCase):
         send_signal.assert_called_once_with(sender=instance, request=request)
 
     @mock.patch('request_signer.signals.successful_signed_request.send')
-    @mock.patch('apysigner.get_signature')
+    @mock.patch.object(Signer, 'create_signature')
     def test_fires_successful_signed_request_signal_from_has_valid_signature(self, get_signature, send_signal):
         get_signature.return_value = '4ZAQJqmWE_C9ozPkpJ3Owh0Z_DFtYkCdi4XAc-vOLtI='
         request = self.get_request(
@@ -115,6 +116,37 @@ class SignedRequestTests(test.TestCase):
             self.assertTrue(has_valid_signature(request))
         send_signal.assert_called_once_with(sender=instance, request=request)
 
+    def test_sets_signed_client_on_request_with_valid_signature(self):
+        url = '/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        request = test.client.RequestFactory().get(
+            '{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, get_signature(TEST_PRIVATE_KEY, url))
+        )
+        self.assertTrue(has_valid_signature(request))
+        self.assertEqual('apps-testclient', request.signed_client)
+
+    def test_sets_signed_client_to_none_when_signature_is_invalid(self):
+        request = self.get_request(
+            data={constants.SIGNATURE_PARAM_NAME: 'wrong', constants.CLIENT_ID_PARAM_NAME: 'apps-testclient'}
+        )
+        self.assertFalse(has_valid_signature(request))
+        self.assertIsNone(request.signed_client)
+
+    @mock.patch('request_signer.signals.successful_signed_request.send')
+    @mock.patch.object(Signer, 'create_signature')
+    def test_verifies_signature_once_per_request(self, get_signature, send_signal):
+        get_signature.return_value = '4ZAQJqmWE_C9ozPkpJ3Owh0Z_DFtYkCdi4XAc-vOLtI='
+        request = self.get_request(
+            data={
+                constants.SIGNATURE_PARAM_NAME: '4ZAQJqmWE_C9ozPkpJ3Owh0Z_DFtYkCdi4XAc-vOLtI=',
+                constants.CLIENT_ID_PARAM_NAME: 'apps-testclient',
+            }
+        )
+        self.assertTrue(has_valid_signature(request))
+        self.assertTrue(has_valid_signature(request))
+        self.assertEqual(200, signature_required(signature_required(self.view))(request).status_code)
+        self.assertEqual(1, get_signature.call_count)
+        self.assertEqual(1, send_signal.call_count)
+
     @mock.patch('request_signer.signals.successful_signed_request.send')
     def test_does_not_fire_successful_signal_from_signature_required_when_invalid(self, send_signal):
         response = self.client.get(
@@ -126,7 +158,7 @@ class SignedRequestTests(test.TestCase):
         self.assertFalse(send_signal.called)
 
     @mock.patch('request_signer.signals.successful_signed_request.send')
-    @mock.patch('apysigner.get_signature')
+    @mock.patch.object(Signer, 'create_signature')
     def test_does_not_fire_successful_signal_from_has_valid_signature_when_invalid(self, get_signature, send_signal):
         get_signature.return_value = 'ABCDEFGHIJKLMNOPQRSTUVWXYZFtYkCdi4XAc-vOLtI='
         request = self.get_request(
@@ -150,7 +182,7 @@ class SignedRequestTests(test.TestCase):
         response = self.client.get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
         self.assertEqual(200, response.status_code)
 
-    @mock.patch('apysigner.get_signature')
+    @mock.patch.object(Signer, 'create_signature')
     def test_calls_create_signature_properly_with_no_content_type(self, get_signature):
         signature = '4ZAQJqmWE_C9ozPkpJ3Owh0Z_DFtYkCdi4XAc-vOLtI='
         get_signature.return_value = signature
@@ -168,9 +200,9 @@ class SignedRequestTests(test.TestCase):
         signed_view(request)
         call_url = unquote(request.get_full_path())
         call_url = re.sub(r'&__signature={}$'.format(signature), '', call_url, count=1)
-        get_signature.assert_called_once_with(TEST_PRIVATE_KEY, call_url, {})
+        get_signature.assert_called_once_with(call_url, '')
 
-    @mock.patch('apysigner.get_signature')
+    @mock.patch.object(Signer, 'create_signature')
     def test_json_is_properly_parsed_into_signature(self, get_signature):
         signature = 'QEw8WN5YzbWlct5ZXH3GIumeiL8m4NErPtXOz_jWexc='
         url = "/my/path/?{}={}&{}={}".format(
@@ -184,7 +216,7 @@ class SignedRequestTests(test.TestCase):
         request = test.client.RequestFactory().post(url, data=json_string, content_type="application/json")
         signed_view = signature_required(self.view)
         signed_view(request)
-        get_signature.assert_called_with(TEST_PRIVATE_KEY, '/my/path/?__client_id=apps-testclient', json_string)
+        get_signature.assert_called_with('/my/path/?__client_id=apps-testclient', json_string)
 
     def test_json_payload_is_valid(self):
         json_string = json.dumps({'our': 'data', 'goes': 'here'})
@@ -197,7 +229,7 @@ class SignedRequestTests(test.TestCase):
         )
         self.assertEqual(200, response.status_code)
 
-    @mock.patch('apysigner.get_signature')
+    @mock.patch.object(Signer, 'create_signature')
     def test_calls_create_signature_properly_with_post_data(self, get_signature):
         signature = '4ZAQJqmWE_C9ozPkpJ3Owh0Z_DFtYkCdi4XAc-vOLtI='
         get_signature.return_value = '4ZAQJqmWE_C9ozPkpJ3Owh0Z_DFtYkCdi4XAc-vOLtI='
@@ -211,7 +243,7 @@ class SignedRequestTests(test.TestCase):
         signed_view = signature_required(self.view)
         signed_view(request)
         get_signature.assert_called_once_with(
-            TEST_PRIVATE_KEY, '/my/path/?__client_id=apps-testclient', dict(request.POST)
+            '/my/path/?__client_id=apps-testclient', json.dumps(dict(request.POST), sort_keys=True)
         )
 
     def test_post_data_payload_is_valid(self):
@@ -221,7 +253,7 @@ class SignedRequestTests(test.TestCase):
         response = self.client.post('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature), data=data)
         self.assertEqual(200, response.status_code)
 
-    @mock.patch('apysigner.get_signature')
+    @mock.patch.object(Signer, 'create_signature')
     def test_does_not_create_signature_with_multivalue_dict_to_prevent_data_loss(self, get_signature):
         signature = '4ZAQJqmWE_C9ozPkpJ3Owh0Z_DFtYkCdi4XAc-vOLtI='
         get_signature.return_value = '4ZAQJqmWE_C9ozPkpJ3Owh0Z_DFtYkCdi4XAc-vOLtI='
@@ -236,8 +268,8 @@ class SignedRequestTests(test.TestCase):
         signed_view(request)
 
         expected_url = re.sub(r'&__signature={}$'.format(signature), '', unquote(request.get_full_path()), count=1)
-        get_signature.assert_called_once_with(TEST_PRIVATE_KEY, expected_url, dict(request.POST))
-        posted_data = get_signature.mock_calls[0][1][2]
+        get_signature.assert_called_once_with(expected_url, json.dumps(dict(request.POST), sort_keys=True))
+        posted_data = json.loads(get_signature.mock_calls[0][1][1])
         self.assertEqual([('usernames', ['t1', 't2', 't3'])], list(posted_data.items()))
 
     def test_post_multivalue_data_payload_is_valid(self):
@@ -332,7 +364,7 @@ class SignedRequestTests(test.TestCase):
 
         self.assertEqual(expected, SignatureValidator(request).request_data)
 
-    @mock.patch('apysigner.get_signature')
+    @mock.patch.object(Signer, 'create_signature')
     def test_json_api_is_properly_parsed_into_signature(self, get_signature):
         signature = 'QEw8WN5YzbWlct5ZXH3GIumeiL8m4NErPtXOz_jWexc='
         url = "/my/path/?{}={}&{}={}".format(
@@ -346,7 +378,7 @@ class SignedRequestTests(test.TestCase):
         request = test.client.RequestFactory().post(url, data=json_string, content_type="application/vnd.api+json")
         signed_view = signature_required(self.view)
         signed_view(request)
-        get_signature.assert_called_with(TEST_PRIVATE_KEY, '/my/path/?__client_id=apps-testclient', json_string)
+        get_signature.assert_called_with('/my/path/?__client_id=apps-testclient', json_string)
 
     def test_json_api_payload_is_valid(self):
         json_string = json.dumps({'our': 'data', 'goes': 'here'})
@@ -405,6 +437,91 @@ class SignedRequestTests(test.TestCase):
         response = self.client.get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
         self.assertEqual(400, response.status_code)
 
+    def test_invalid_signature_without_escaped_characters_is_hashed_once(self):
+        request = test.client.RequestFactory().get('/?{}=apps-testclient&{}={}'.format(
+            constants.CLIENT_ID_PARAM_NAME, constants.SIGNATURE_PARAM_NAME, 'A' * 43 + '='
+        ))
+        with mock.patch.object(Signer, 'create_signature', return_value='other') as create_signature:
+            self.assertFalse(has_valid_signature(request))
+        self.assertEqual(1, create_signature.call_count)
+
+    def test_matched_url_is_canonical_form_when_path_is_escaped(self):
+        url = '/test/a b c/?username=test%2C&{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        signature = get_signature(TEST_PRIVATE_KEY, url)
+        request = test.client.RequestFactory().get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+        self.assertEqual(url, SignatureValidator(request).matched_url)
+
+    @override_settings(SIGNATURE_CANONICAL_URL_ONLY=True)
+    def test_canonical_only_accepts_canonical_form(self):
+        url = '/test/a b c/?username=test%2C&{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        signature = get_signature(TEST_PRIVATE_KEY, url)
+        response = self.client.get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+        self.assertEqual(200, response.status_code)
+
+    @override_settings(SIGNATURE_CANONICAL_URL_ONLY=True)
+    def test_canonical_only_rejects_fully_unquoted_form(self):
+        url = '/test/?username=test%2C&{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        signature = get_signature(TEST_PRIVATE_KEY, unquote(url))
+        response = self.client.get('{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+        self.assertEqual(400, response.status_code)
+
+    def test_uses_cached_signer_for_known_client(self):
+        request = self.get_request(
+            data={constants.CLIENT_ID_PARAM_NAME: 'apps-testclient', constants.SIGNATURE_PARAM_NAME: 'abc'}
+        )
+        with mock.patch('request_signer.validator.get_signer') as get_signer:
+            signer = SignatureValidator(request).signer
+        get_signer.assert_called_once_with('apps-testclient', TEST_PRIVATE_KEY)
+        self.assertEqual(get_signer.return_value, signer)
+
+    def test_does_not_cache_signer_for_unknown_client(self):
+        request = self.get_request(
+            data={constants.CLIENT_ID_PARAM_NAME: 'unknown', constants.SIGNATURE_PARAM_NAME: 'abc'}
+        )
+        with mock.patch('request_signer.validator.get_signer') as get_signer:
+            signer = SignatureValidator(request).signer
+        self.assertFalse(get_signer.called)
+        self.assertIsInstance(signer, Signer)
+
+    def test_does_not_fail_when_query_string_contains_question_mark(self):
+        url = '/test/?next=/a/?b&{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        signature = get_signature(TEST_PRIVATE_KEY, url)
+        response = self.client.get('{}&{}=x{}'.format(url, constants.SIGNATURE_PARAM_NAME, signature))
+        self.assertEqual(400, response.status_code)
+
+    def signed_put_request(self, data):
+        url = '/test/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+        signature = get_signature(TEST_PRIVATE_KEY, url, payload=data)
+        return test.client.RequestFactory().put(
+            '{}&{}={}'.format(url, constants.SIGNATURE_PARAM_NAME, signature),
+            data='username=tester&username=billyjean', content_type='application/x-www-form-urlencoded'
+        )
+
+    def test_parses_put_body_once_for_every_url_tried(self):
+        request = self.signed_put_request({'username': ['tester', 'other']})
+        validator = SignatureValidator(request)
+        with mock.patch('request_signer.validator.QueryDict', wraps=http.QueryDict) as query_dict:
+            self.assertFalse(validator.has_valid_signature())
+            self.assertEqual(validator.request_data, {'username': ['tester', 'billyjean']})
+        query_dict.assert_called_once_with(request.body, encoding='utf-8')
+
+    def test_converts_signing_payload_once_for_every_url_tried(self):
+        validator = SignatureValidator(self.signed_put_request({'username': ['tester', 'other']}))
+        with mock.patch.object(Signer, 'convert_payload', wraps=Signer.convert_payload) as convert_payload:
+            validator.has_valid_signature()
+        converted = [args[0] for args, _ in convert_payload.call_args_list if not isinstance(args[0], str)]
+        self.assertEqual(converted, [{'username': ['tester', 'billyjean']}])
+
+    def test_shares_verified_put_data_with_view(self):
+        request = self.signed_put_request({'username': ['tester', 'billyjean']})
+        self.assertTrue(SignatureValidator(request).has_valid_signature())
+        self.assertEqual(request.signed_data.getlist('username'), ['tester', 'billyjean'])
+
+    def test_does_not_share_data_when_signature_is_invalid(self):
+        request = self.signed_put_request({'username': ['tester', 'other']})
+        self.assertFalse(SignatureValidator(request).has_valid_signature())
+        self.assertFalse(hasattr(request, 'signed_data'))
+
 
 class NoSettingsClass(test.TestCase):
 
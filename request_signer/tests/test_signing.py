@@ -0,0 +1,104 @@
+import json
+
+from apysigner import get_signature
+from django import test
+from django.test.utils import override_settings
+
+from request_signer.signing import Signer, SignerCache
+
+TEST_PRIVATE_KEY = 'abc123=='
+
+
+class SignerTests(test.TestCase):
+
+    def setUp(self):
+        self.sut = Signer(TEST_PRIVATE_KEY)
+
+    def test_create_signature_matches_apysigner_without_payload(self):
+        url = '/test/?username=test&__client_id=apps-testclient'
+        self.assertEqual(get_signature(TEST_PRIVATE_KEY, url), self.sut.create_signature(url))
+
+    def test_create_signature_matches_apysigner_with_dict_payload(self):
+        url = '/test/?__client_id=apps-testclient'
+        data = {'username': ['tester', 'billyjean'], 'b': ['1']}
+        self.assertEqual(get_signature(TEST_PRIVATE_KEY, url, data), self.sut.create_signature(url, data))
+
+    def test_create_signature_matches_apysigner_with_json_bytes_payload(self):
+        url = '/test/?__client_id=apps-testclient'
+        data = json.dumps({'our': 'data'})
+        self.assertEqual(get_signature(TEST_PRIVATE_KEY, url, data), self.sut.create_signature(url, data.encode()))
+
+    def test_create_signature_accepts_bytes_private_key(self):
+        url = '/test/?__client_id=apps-testclient'
+        self.assertEqual(get_signature(TEST_PRIVATE_KEY, url), Signer(TEST_PRIVATE_KEY.encode()).create_signature(url))
+
+    def test_signature_matches_returns_matching_url_form(self):
+        signature = get_signature(TEST_PRIVATE_KEY, '/a b/?x=1')
+        self.assertEqual('/a b/?x=1', self.sut.signature_matches(signature, ['/a%20b/?x=1', '/a b/?x=1']))
+
+    def test_signature_matches_returns_none_when_no_form_matches(self):
+        self.assertIsNone(self.sut.signature_matches('nope', ['/a/?x=1', '/b/?x=1']))
+
+    def test_stream_matches_returns_url_form_matching_chunked_body(self):
+        data = json.dumps({'our': 'data', 'goes': 'here'})
+        signature = get_signature(TEST_PRIVATE_KEY, '/a b/?x=1', data)
+        chunks = [data[:5].encode(), data[5:].encode()]
+        self.assertEqual('/a b/?x=1', self.sut.stream_matches(signature, ['/a%20b/?x=1', '/a b/?x=1'], chunks))
+
+    def test_stream_matches_returns_none_when_no_form_matches(self):
+        self.assertIsNone(self.sut.stream_matches('nope', ['/a/?x=1'], [b'{}']))
+
+    def test_convert_payload_dumps_sorted_json_for_dicts(self):
+        self.assertEqual('{"a": 1, "b": 2}', Signer.convert_payload({'b': 2, 'a': 1}))
+
+    def test_convert_payload_returns_empty_string_for_empty_payloads(self):
+        self.assertEqual('', Signer.convert_payload({}))
+        self.assertEqual('', Signer.convert_payload(None))
+
+
+class SignerCacheTests(test.TestCase):
+
+    def setUp(self):
+        self.sut = SignerCache(max_size=2)
+
+    def test_returns_same_signer_for_same_client_and_key(self):
+        signer = self.sut.get_signer('client', TEST_PRIVATE_KEY)
+        self.assertIs(signer, self.sut.get_signer('client', TEST_PRIVATE_KEY))
+        self.assertEqual(1, self.sut.hits)
+        self.assertEqual(1, self.sut.misses)
+
+    def test_replaces_signer_when_private_key_rotates(self):
+        signer = self.sut.get_signer('client', TEST_PRIVATE_KEY)
+        rotated = self.sut.get_signer('client', 'xyz789==')
+        self.assertIsNot(signer, rotated)
+        self.assertEqual(
+            {'size': 1, 'hits': 0, 'misses': 2, 'evictions': 0, 'invalidations': 1}, self.sut.stats()
+        )
+
+    def test_evicts_least_recently_used_signer(self):
+        first = self.sut.get_signer('first', TEST_PRIVATE_KEY)
+        self.sut.get_signer('second', TEST_PRIVATE_KEY)
+        self.sut.get_signer('first', TEST_PRIVATE_KEY)
+        self.sut.get_signer('third', TEST_PRIVATE_KEY)
+        self.assertIs(first, self.sut.get_signer('first', TEST_PRIVATE_KEY))
+        self.sut.get_signer('second', TEST_PRIVATE_KEY)
+        self.assertEqual(2, self.sut.evictions)
+
+    def test_invalidate_drops_single_client(self):
+        signer = self.sut.get_signer('client', TEST_PRIVATE_KEY)
+        self.sut.invalidate('client')
+        self.assertIsNot(signer, self.sut.get_signer('client', TEST_PRIVATE_KEY))
+
+    def test_invalidate_without_client_drops_everything(self):
+        self.sut.get_signer('first', TEST_PRIVATE_KEY)
+        self.sut.get_signer('second', TEST_PRIVATE_KEY)
+        self.sut.invalidate()
+        self.assertEqual(0, self.sut.stats()['size'])
+        self.assertEqual(2, self.sut.invalidations)
+
+    @override_settings(SIGNATURE_KEY_CACHE_SIZE=1)
+    def test_uses_max_size_from_settings_when_not_given(self):
+        sut = SignerCache()
+        sut.get_signer('first', TEST_PRIVATE_KEY)
+        sut.get_signer('second', TEST_PRIVATE_KEY)
+        self.assertEqual(1, sut.stats()['size'])
@@ -0,0 +1,74 @@
+import json
+import six
+
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+from apysigner import get_signature
+from django import http
+from django import test
+from django.test.utils import override_settings
+
+from request_signer import constants, streaming
+from request_signer.decorators import signature_required
+
+TEST_PRIVATE_KEY = 'abc123=='
+
+
+class IterBodyTests(test.TestCase):
+
+    def get_request(self, body):
+        return test.client.RequestFactory().post('/', data=body, content_type='application/json')
+
+    def test_yields_body_in_chunks_of_given_size(self):
+        request = self.get_request('0123456789')
+        chunks = list(streaming.iter_body(request, chunk_size=4))
+        self.assertEqual([b'0123', b'4567', b'89'], chunks)
+
+    def test_body_is_readable_again_after_iterating(self):
+        request = self.get_request('0123456789')
+        list(streaming.iter_body(request, chunk_size=4))
+        self.assertEqual(b'0123456789', request.body)
+
+    def test_body_spools_to_disk_past_spool_size(self):
+        request = self.get_request('0123456789')
+        list(streaming.iter_body(request, chunk_size=4, spool_size=5))
+        self.assertEqual(b'0123456789', request.read())
+
+    @override_settings(SIGNATURE_STREAM_CHUNK_SIZE=3)
+    def test_uses_chunk_size_from_settings(self):
+        request = self.get_request('0123456789')
+        self.assertEqual(b'012', next(streaming.iter_body(request)))
+
+
+@override_settings(API_KEYS={'apps-testclient': TEST_PRIVATE_KEY}, SIGNATURE_STREAM_JSON_BODY=True)
+class StreamingSignatureTests(test.TestCase):
+
+    def setUp(self):
+        self.view = signature_required(lambda request: http.HttpResponse(request.body))
+        self.body = json.dumps({'items': ['x' * 100] * 1000})
+        self.url = '/test/a b/?{}=apps-testclient'.format(constants.CLIENT_ID_PARAM_NAME)
+
+    def get_request(self, signature):
+        url = '{}&{}={}'.format(self.url, constants.SIGNATURE_PARAM_NAME, signature)
+        return test.client.RequestFactory().post(url, data=self.body, content_type='application/json')
+
+    @override_settings(SIGNATURE_STREAM_CHUNK_SIZE=1024)
+    def test_accepts_valid_signature_and_replays_body_to_view(self):
+        request = self.get_request(get_signature(TEST_PRIVATE_KEY, self.url, self.body))
+        response = self.view(request)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.body.encode(), response.content)
+
+    def test_rejects_invalid_signature(self):
+        request = self.get_request(get_signature(TEST_PRIVATE_KEY, self.url, self.body + ' '))
+        self.assertEqual(400, self.view(request).status_code)
+
+    def test_uses_body_already_in_memory(self):
+        request = self.get_request(get_signature(TEST_PRIVATE_KEY, self.url, self.body))
+        request.body
+        with mock.patch.object(streaming, 'iter_body') as iter_body:
+            self.assertEqual(200, self.view(request).status_code)
+        self.assertFalse(iter_body.called)
@@ -0,0 +1,605 @@
+import gzip
+import io
+import json
+import socket
+import socketserver
+import threading
+from http.client import RemoteDisconnected
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from apysigner import get_signature
+from django import test
+from django.test.utils import override_settings
+
+from request_signer import compression
+from request_signer.client.generic import Request, WebException
+from request_signer.client.generic import cache, transport
+from request_signer.client.generic.rest import BaseDjangoRestClient
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.respond(self.rfile.read(length).decode())
+
+    do_PUT = do_POST
+    do_DELETE = do_GET
+
+    def respond(self, body=None):
+        if 'paged' in self.path:
+            return self.respond_page()
+        if 'unchanged' in self.path and self.headers.get('If-None-Match'):
+            return self.respond_not_modified()
+        status = self.status()
+        content = json.dumps(self.echo(body)).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', '"v1"')
+        if 'compressed' in self.path and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            content = gzip.compress(content)
+            self.send_header('Content-Encoding', 'gzip')
+        if 'chunked' in self.path:
+            return self.write_chunked(content)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def write_chunked(self, content):
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        half = len(content) // 2
+        for chunk in (content[:half], content[half:], b''):
+            self.wfile.write('{:x}\r\n'.format(len(chunk)).encode() + chunk + b'\r\n')
+
+    def respond_not_modified(self):
+        self.send_response(304)
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+
+    def echo(self, body):
+        content = {'method': self.command, 'path': self.path, 'body': body}
+        if body and body.startswith('['):
+            content = [dict(content, body=item) for item in json.loads(body)]
+        ids = parse_qs(urlsplit(self.path).query).get('ids')
+        if self.command == 'DELETE' and ids:
+            content = [dict(content, id=key) for key in ids]
+        if 'compressed' in self.path:
+            content = [content] * 100
+        return content
+
+    def status(self):
+        """
+        A "nobulk" group answers bulk requests as a DRF ListCreateAPIView does:
+        PUT and DELETE aren't allowed, and a POSTed list is a validation error.
+        """
+        is_bulk = urlsplit(self.path).path.count('/') == 3 and (
+            self.command in ('PUT', 'DELETE') or self.headers.get('Content-Type') == 'application/json'
+        )
+        if 'nobulk' in self.path and is_bulk:
+            return 405 if self.command in ('PUT', 'DELETE') else 400
+        return 404 if 'missing' in self.path else 500 if 'broken' in self.path else 200
+
+    def respond_page(self, total=25):
+        """
+        DRF style limit/offset page of ``total`` items, or a plain list of the
+        page's items when the path asks for one.
+        """
+        query = parse_qs(urlsplit(self.path).query)
+        limit, offset = int(query.get('limit', ['100'])[0]), int(query.get('offset', ['0'])[0])
+        if 'whole' in self.path:
+            limit, offset = total, 0
+        items = [{'id': i} for i in range(offset, min(offset + limit, total))]
+        if 'plain' in self.path:
+            page = items
+        else:
+            next_query = dict(query, offset=[str(offset + limit)])
+            next_link = 'http://{}{}?{}'.format(
+                self.headers['Host'], urlsplit(self.path).path, urlencode(next_query, doseq=True)
+            )
+            page = {'results': items, 'next': next_link if offset + limit < total else None}
+        self.server.paths.append(self.path)
+        content = json.dumps(page).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class QuietServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    paths = []
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class LocalServerTestCase(test.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(LocalServerTestCase, cls).setUpClass()
+        cls.server = QuietServer(('127.0.0.1', 0), JsonHandler)
+        cls.host = '127.0.0.1:{}'.format(cls.server.server_port)
+        cls.base_url = 'http://' + cls.host
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super(LocalServerTestCase, cls).tearDownClass()
+
+
+class PooledTransportTests(LocalServerTestCase):
+
+    def setUp(self):
+        self.sut = transport.PooledTransport(max_size=1, idle_timeout=60)
+
+    def tearDown(self):
+        self.sut.close()
+
+    def get(self, path):
+        response = self.sut.open(Request('GET', self.base_url + path, None), timeout=5)
+        return response.code, json.loads(response.read().decode())
+
+    def test_reuses_connection_once_response_is_read(self):
+        self.assertEqual(200, self.get('/a/')[0])
+        self.assertEqual(200, self.get('/b/')[0])
+        pool = self.sut.get_pool('http', self.host)
+        self.assertEqual((1, 1), (pool.created, pool.reused))
+
+    def test_returns_error_responses_instead_of_raising(self):
+        code, body = self.get('/missing/')
+        self.assertEqual((404, '/missing/'), (code, body['path']))
+
+    def test_sends_request_data_as_form_encoded_body(self):
+        response = self.sut.open(Request('POST', self.base_url + '/a/', b'x=1'), timeout=5)
+        self.assertEqual('x=1', json.loads(response.read().decode())['body'])
+
+    def test_does_not_reuse_connection_idle_past_timeout(self):
+        self.sut.idle_timeout = 0
+        self.get('/a/')
+        self.get('/b/')
+        self.assertEqual(2, self.sut.get_pool('http', self.host).created)
+
+    def test_keeps_at_most_max_size_idle_connections(self):
+        first = self.sut.open(Request('GET', self.base_url + '/a/', None), timeout=5)
+        second = self.sut.open(Request('GET', self.base_url + '/b/', None), timeout=5)
+        first.read()
+        second.read()
+        self.assertEqual(1, len(self.sut.get_pool('http', self.host)._idle))
+
+    def test_retries_once_on_new_connection_when_reused_connection_was_closed(self):
+        self.get('/a/')
+        send = self.sut._send
+        with mock.patch.object(self.sut, '_send', side_effect=[RemoteDisconnected(), send]) as _send:
+            _send.side_effect = lambda connection, request: (
+                send(connection, request) if _send.call_count > 1 else self.raise_remote_disconnected()
+            )
+            response = self.sut.open(Request('GET', self.base_url + '/b/', None), timeout=5)
+        self.assertEqual(200, response.code)
+        self.assertEqual(2, _send.call_count)
+        self.assertEqual(2, self.sut.get_pool('http', self.host).created)
+
+    def raise_remote_disconnected(self):
+        raise RemoteDisconnected()
+
+    def test_does_not_send_post_again_when_reused_connection_was_closed(self):
+        self.get('/a/')
+        with mock.patch.object(self.sut, '_send', side_effect=RemoteDisconnected()) as _send:
+            with self.assertRaises(RemoteDisconnected):
+                self.sut.open(Request('POST', self.base_url + '/a/', b'x=1'), timeout=5)
+        self.assertEqual(1, _send.call_count)
+
+    def test_closes_connection_when_send_times_out(self):
+        connection = self.sut.get_pool('http', self.host).new_connection(5)
+        with mock.patch.object(self.sut.get_pool('http', self.host), 'acquire', return_value=(connection, False)), \
+                mock.patch.object(self.sut, '_send', side_effect=socket.timeout()), \
+                mock.patch.object(connection, 'close') as close:
+            with self.assertRaises(socket.timeout):
+                self.sut.open(Request('GET', self.base_url + '/a/', None), timeout=5)
+        close.assert_called_once_with()
+
+    def test_closes_retry_connection_when_its_send_fails_too(self):
+        self.get('/a/')
+        closed = []
+        with mock.patch('http.client.HTTPConnection.close', autospec=True, side_effect=closed.append), \
+                mock.patch.object(self.sut, '_send', side_effect=RemoteDisconnected()):
+            with self.assertRaises(RemoteDisconnected):
+                self.get('/b/')
+        self.assertEqual(2, len(set(map(id, closed))))
+
+    def test_does_not_reuse_connection_server_closed_while_idle(self):
+        self.get('/a/')
+        connection, _ = self.sut.get_pool('http', self.host)._idle[0]
+        with mock.patch('select.select', return_value=([connection.sock], [], [])):
+            self.get('/b/')
+        self.assertEqual(2, self.sut.get_pool('http', self.host).created)
+
+    def test_releases_connection_of_response_without_body_unread(self):
+        request = Request('GET', self.base_url + '/unchanged/', None, headers={'If-None-Match': '"v1"'})
+        self.assertEqual(304, self.sut.open(request, timeout=5).code)
+        self.assertEqual(200, self.get('/a/')[0])
+        pool = self.sut.get_pool('http', self.host)
+        self.assertEqual((1, 1), (pool.created, pool.reused))
+
+    def test_raises_when_new_connection_fails(self):
+        with mock.patch.object(self.sut, '_send', side_effect=RemoteDisconnected()):
+            with self.assertRaises(RemoteDisconnected):
+                self.sut.open(Request('GET', self.base_url + '/a/', None), timeout=5)
+
+    def test_connects_within_connect_timeout_then_reads_with_timeout(self):
+        connection = self.sut.get_pool('http', self.host).new_connection(5, connect_timeout=1)
+        self.assertEqual(5, connection.sock.gettimeout())
+        connection.close()
+
+    def test_uses_one_pool_per_host(self):
+        self.assertIs(self.sut.get_pool('http', self.host), self.sut.get_pool('http', self.host))
+        self.assertIsNot(self.sut.get_pool('http', self.host), self.sut.get_pool('https', self.host))
+
+    @override_settings(SIGNATURE_CLIENT_POOL_SIZE=3, SIGNATURE_CLIENT_POOL_IDLE_TIMEOUT=5)
+    def test_reads_pool_settings(self):
+        sut = transport.PooledTransport()
+        self.assertEqual((3, 5), (sut.max_size, sut.idle_timeout))
+
+
+class PooledRestClientTests(LocalServerTestCase):
+
+    def setUp(self):
+        class PooledClient(BaseDjangoRestClient):
+            use_connection_pool = True
+            BASE_API_ENDPOINT = '/api/'
+
+        credentials = mock.Mock(base_url=self.base_url, client_id='client', private_key='abc123==')
+        self.sut = PooledClient(credentials)
+
+    def test_get_item_goes_through_shared_pooled_transport(self):
+        with mock.patch.object(transport, 'get_pooled_transport', return_value=transport.PooledTransport()) as get:
+            self.assertEqual('GET', self.sut.get_item('1234', 'pk-3')['method'])
+            self.assertEqual('GET', self.sut.get_item('1234', 'pk-3')['method'])
+        self.assertEqual(1, get.return_value.get_pool('http', self.host).reused)
+
+    def test_get_list_returns_404_json_as_before(self):
+        self.assertEqual('GET', self.sut.get_list('missing')['method'])
+
+    def test_update_sends_signed_form_post(self):
+        result = self.sut.update('1234', 'pk-3', name='x')
+        self.assertEqual(('POST', '_method=PUT&name=x'), (result['method'], result['body']))
+        self.assertIn('__signature=', result['path'])
+
+    @override_settings(SIGNATURE_CLIENT_CACHE_TIMEOUT=0)
+    def test_cached_gets_answered_not_modified_hand_connections_back(self):
+        self.sut.cache_responses = True
+        pooled_transport = transport.PooledTransport()
+        with mock.patch.object(cache, '_response_cache', None), \
+                mock.patch.object(transport, 'get_pooled_transport', return_value=pooled_transport):
+            results = [self.sut.get_item('unchanged', 'pk-3')['method'] for _ in range(4)]
+        pool = pooled_transport.get_pool('http', self.host)
+        self.assertEqual(['GET'] * 4, results)
+        self.assertEqual((1, 3, 1), (pool.created, pool.reused, len(pool._idle)))
+
+    def test_get_pooled_transport_returns_shared_transport(self):
+        self.assertIs(transport.get_pooled_transport(), transport.get_pooled_transport())
+
+
+class BatchRestClientTests(LocalServerTestCase):
+
+    def setUp(self):
+        class Client(BaseDjangoRestClient):
+            BASE_API_ENDPOINT = '/api/'
+
+        credentials = mock.Mock(base_url=self.base_url, client_id='client', private_key='abc123==')
+        self.sut = Client(credentials)
+
+    def test_get_items_many_returns_results_by_key_in_order(self):
+        keys = [('1234', 'pk-{}'.format(i)) for i in range(20)]
+        results, errors = self.sut.get_items_many(keys)
+        self.assertEqual(keys, list(results))
+        self.assertEqual({}, errors)
+        self.assertTrue(results[('1234', 'pk-7')]['path'].startswith('/api/1234/pk-7/?'))
+        self.assertIn('__signature=', results[('1234', 'pk-7')]['path'])
+
+    def test_get_items_many_keeps_404_as_result_and_other_failures_as_errors(self):
+        results, errors = self.sut.get_items_many([('1', 'a'), ('1', 'missing'), ('1', 'broken')])
+        self.assertEqual([('1', 'a'), ('1', 'missing')], list(results))
+        self.assertEqual([('1', 'broken')], list(errors))
+        self.assertIsInstance(errors[('1', 'broken')], WebException)
+
+    def test_get_list_many_returns_results_by_group_key(self):
+        results, errors = self.sut.get_list_many(['1', 'missing', 'broken'])
+        self.assertEqual(['1', 'missing'], list(results))
+        self.assertEqual(['broken'], list(errors))
+
+    def test_get_list_many_signs_every_request_before_sending_any(self):
+        with mock.patch.object(self.sut, '_send_many', return_value=({}, {})) as send_many:
+            self.sut.get_list_many(['1', '2'])
+        requests = send_many.call_args[0][0]
+        self.assertEqual(['1', '2'], list(requests))
+        self.assertIn('__signature=', requests['2'].get_full_url())
+
+    def test_send_many_uses_at_most_batch_workers_threads(self):
+        self.sut.batch_workers = 2
+        with mock.patch('request_signer.client.generic.rest.ThreadPoolExecutor', wraps=ThreadPoolExecutor) as pool:
+            self.sut.get_list_many(['1', '2', '3'])
+        pool.assert_called_once_with(max_workers=2)
+
+    def test_send_many_returns_empty_results_without_keys(self):
+        self.assertEqual(({}, {}), self.sut.get_items_many([]))
+
+    def test_get_items_many_goes_through_pool_when_enabled(self):
+        self.sut.use_connection_pool = True
+        with mock.patch.object(transport, 'get_pooled_transport', return_value=transport.PooledTransport()):
+            results, errors = self.sut.get_items_many([('1', 'a'), ('1', 'missing')])
+        self.assertEqual(([('1', 'a'), ('1', 'missing')], {}), (list(results), errors))
+
+
+class IterListTests(LocalServerTestCase):
+
+    def setUp(self):
+        class Client(BaseDjangoRestClient):
+            BASE_API_ENDPOINT = '/api/'
+
+        credentials = mock.Mock(base_url=self.base_url, client_id='client', private_key='abc123==')
+        self.sut = Client(credentials)
+        self.server.paths[:] = []
+
+    def test_follows_next_links_of_paginated_responses(self):
+        items = list(self.sut.iter_list('paged', page_size=10))
+        self.assertEqual(list(range(25)), [item['id'] for item in items])
+        self.assertEqual(3, len(self.server.paths))
+
+    def test_signs_every_page_request_again(self):
+        list(self.sut.iter_list('paged', page_size=10))
+        for path in self.server.paths:
+            unsigned, signature = path.split('&__signature=')
+            self.assertEqual(get_signature('abc123==', self.base_url + unsigned, {}), signature)
+        self.assertTrue(self.server.paths[1].startswith('/api/paged/?__client_id=client&limit=10&offset=10&'))
+
+    def test_pages_plain_lists_with_limit_and_offset(self):
+        items = list(self.sut.iter_list('paged-plain', page_size=10))
+        self.assertEqual(list(range(25)), [item['id'] for item in items])
+        self.assertEqual(3, len(self.server.paths))
+
+    def test_stops_after_full_plain_page_followed_by_empty_page(self):
+        items = list(self.sut.iter_list('paged-plain', page_size=5))
+        self.assertEqual(25, len(items))
+        self.assertEqual(6, len(self.server.paths))
+
+    def test_stops_when_plain_list_ignoring_limit_and_offset_repeats_full_page(self):
+        items = list(self.sut.iter_list('paged-plain-whole', page_size=25))
+        self.assertEqual(list(range(25)), [item['id'] for item in items])
+        self.assertEqual(2, len(self.server.paths))
+
+    def test_prefetches_next_page_before_current_page_is_consumed(self):
+        items = self.sut.iter_list('paged', page_size=10)
+        next(items)
+        for _ in range(50):
+            if len(self.server.paths) == 2:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(2, len(self.server.paths))
+        items.close()
+
+    def test_returns_nothing_for_404(self):
+        self.assertEqual([], list(self.sut.iter_list('missing')))
+
+
+class StreamListTests(LocalServerTestCase):
+
+    def setUp(self):
+        class Client(BaseDjangoRestClient):
+            BASE_API_ENDPOINT = '/api/'
+
+        credentials = mock.Mock(base_url=self.base_url, client_id='client', private_key='abc123==')
+        self.sut = Client(credentials)
+
+    def test_yields_items_of_list_response(self):
+        with mock.patch.object(transport.PooledResponse, 'close') as close:
+            self.sut.use_connection_pool = True
+            items = list(self.sut.stream_list('paged-plain'))
+        self.assertEqual(list(range(25)), [item['id'] for item in items])
+        close.assert_called_once_with()
+
+    def test_yields_nothing_for_404(self):
+        self.assertEqual([], list(self.sut.stream_list('missing')))
+
+    def test_raises_web_exception_when_not_successful(self):
+        with self.assertRaises(WebException):
+            list(self.sut.stream_list('broken'))
+
+    @override_settings(SIGNATURE_CLIENT_STREAM_CHUNK_SIZE=16)
+    def test_drops_pooled_connection_when_stream_is_abandoned(self):
+        self.sut.use_connection_pool = True
+        pooled = transport.PooledTransport()
+        with mock.patch.object(transport, 'get_pooled_transport', return_value=pooled):
+            items = self.sut.stream_list('paged-plain')
+            next(items)
+            items.close()
+        self.assertEqual([], pooled.get_pool('http', self.host)._idle)
+
+    def test_next_link_page_keeps_base_url_path_out_of_endpoint(self):
+        self.sut.api_credentials.base_url = 'http://api/v1'
+        endpoint, params = self.sut._next_link_page(
+            'http://api/v1/api/1/?__client_id=client&limit=10&offset=10&__signature=abc'
+        )
+        self.assertEqual(('/api/1/', {'limit': ['10'], 'offset': ['10']}), (endpoint, params))
+
+    def test_next_link_page_joins_back_onto_base_url_ending_in_slash(self):
+        for base_url in ('http://api/', 'http://api/v1/', 'http://api'):
+            self.sut.api_credentials.base_url = base_url
+            next_link = base_url.rstrip('/') + '/api/1/?limit=10&offset=10'
+            endpoint, params = self.sut._next_link_page(next_link)
+            self.assertEqual(next_link.split('?')[0], self.sut._get_service_url(endpoint))
+
+
+class BulkRestClientTests(LocalServerTestCase):
+
+    def setUp(self):
+        class Client(BaseDjangoRestClient):
+            BASE_API_ENDPOINT = '/api/'
+            supports_bulk = True
+
+        credentials = mock.Mock(base_url=self.base_url, client_id='client', private_key='abc123==')
+        self.sut = Client(credentials)
+
+    def test_bulk_create_posts_json_batches_and_splits_results_by_position(self):
+        items = [{'name': str(i)} for i in range(5)]
+        with mock.patch.object(self.sut, '_send', wraps=self.sut._send) as send:
+            results, errors = self.sut.bulk_create('bulk', items, batch_size=2)
+        self.assertEqual(({}, 3), (errors, send.call_count))
+        self.assertEqual(list(range(5)), list(results))
+        self.assertEqual([('POST', item) for item in items], [(r['method'], r['body']) for r in results.values()])
+
+    def test_bulk_update_puts_json_batches_with_item_key_in_every_item(self):
+        results, errors = self.sut.bulk_update('bulk', [('a', {'name': 'x'}), ('b', {'name': 'y'})])
+        self.assertEqual(['a', 'b'], list(results))
+        self.assertEqual(('PUT', {'name': 'y', 'id': 'b'}), (results['b']['method'], results['b']['body']))
+
+    def test_bulk_update_puts_item_key_in_bulk_lookup_field(self):
+        self.sut.bulk_lookup_field = 'uuid'
+        results, errors = self.sut.bulk_update('bulk', {'a': {'name': 'x'}})
+        self.assertEqual({'name': 'x', 'uuid': 'a'}, results['a']['body'])
+
+    def test_bulk_delete_sends_item_keys_on_querystring(self):
+        results, errors = self.sut.bulk_delete('bulk', ['a', 'b'])
+        self.assertEqual(['a', 'b'], list(results))
+        self.assertEqual(('DELETE', 'b'), (results['b']['method'], results['b']['id']))
+        self.assertIn('&ids=a&ids=b&__signature=', results['a']['path'])
+
+    def test_invalidates_cached_items_once_batches_are_answered(self):
+        calls = []
+        send = self.sut._send
+        with mock.patch.object(self.sut, '_send', side_effect=lambda *a: calls.append('send') or send(*a)):
+            with mock.patch.object(self.sut, '_invalidate_cached_items', side_effect=lambda *a: calls.append(a)):
+                self.sut.bulk_update('bulk', [('a', {'name': 'x'})])
+        self.assertEqual(['send', ('bulk', ['a'])], calls)
+
+    def test_bulk_response_without_result_per_item_is_error_for_every_item_in_batch(self):
+        with mock.patch.object(self.sut, '_bulk_json', return_value=[{'id': 'a'}]):
+            results, errors = self.sut.bulk_update('bulk', {'a': {}, 'b': {}})
+        self.assertEqual(({}, ['a', 'b']), (results, list(errors)))
+        self.assertIsInstance(errors['a'], WebException)
+
+    def test_bulk_request_failure_is_error_for_every_item_in_batch(self):
+        results, errors = self.sut.bulk_update('broken', {'a': {}, 'b': {}, 'c': {}}, batch_size=2)
+        self.assertEqual(({}, ['a', 'b', 'c']), (results, list(errors)))
+        self.assertIsInstance(errors['a'], WebException)
+
+    def test_falls_back_to_request_per_item_without_bulk_endpoint(self):
+        results, errors = self.sut.bulk_update('nobulk', {'a': {'name': 'x'}, 'b': {'name': 'y'}})
+        self.assertEqual({}, errors)
+        self.assertEqual('/api/nobulk/b/', results['b']['path'].split('?')[0])
+        self.assertEqual('_method=PUT&name=y', results['b']['body'])
+
+    def test_bulk_create_sends_request_per_item_by_default(self):
+        client = BaseDjangoRestClient(self.sut.api_credentials)
+        client.BASE_API_ENDPOINT = '/api/'
+        results, errors = client.bulk_create('nobulk', [{'name': 'x'}])
+        self.assertEqual(('POST', 'name=x'), (results[0]['method'], results[0]['body']))
+
+    def test_bulk_create_to_plain_list_endpoint_is_error_per_item_when_bulk_is_on(self):
+        results, errors = self.sut.bulk_create('nobulk', [{'name': 'x'}, {'name': 'y'}])
+        self.assertEqual(({}, [0, 1]), (results, list(errors)))
+
+    def test_bulk_delete_falls_back_to_per_item_delete_letting_404_slide(self):
+        self.sut.supports_bulk = False
+        results, errors = self.sut.bulk_delete('bulk', ['a', 'missing'])
+        self.assertEqual((['a', 'missing'], {}), (list(results), errors))
+        self.assertEqual('_method=DELETE', results['missing']['body'])
+
+    def test_sends_request_per_item_when_bulk_is_not_supported(self):
+        self.sut.supports_bulk = False
+        with mock.patch.object(self.sut, '_send', wraps=self.sut._send) as send:
+            results, errors = self.sut.bulk_create('bulk', [{'name': 'x'}, {'name': 'y'}])
+        self.assertEqual((2, 'name=y'), (send.call_count, results[1]['body']))
+
+    def test_per_item_failures_are_errors_by_item(self):
+        self.sut.supports_bulk = False
+        results, errors = self.sut.bulk_update('1', {'a': {}, 'broken': {}})
+        self.assertEqual((['a'], ['broken']), (list(results), list(errors)))
+
+    def test_bulk_items_split_list_per_item_and_give_empty_body_to_every_item(self):
+        self.assertEqual([{}, {}], self.sut._bulk_items({}, 2))
+        self.assertEqual([1, 2], self.sut._bulk_items([1, 2], 2))
+        self.assertRaises(WebException, self.sut._bulk_items, {'id': 1}, 2)
+        self.assertRaises(WebException, self.sut._bulk_items, [1], 2)
+
+
+class FakeResponse(io.BytesIO):
+
+    def __init__(self, body, **headers):
+        super(FakeResponse, self).__init__(body)
+        self.code = 200
+        self.headers = headers
+
+
+class DecodedResponseTests(test.TestCase):
+
+    def test_decodes_gzip_body_as_it_is_read(self):
+        body = gzip.compress(b'x' * 1000)
+        sut = transport.DecodedResponse(FakeResponse(body, **{'Content-Encoding': 'gzip'}), chunk_size=8)
+        self.assertEqual(b'x' * 10, sut.read(10))
+        self.assertLess(sut.wire_bytes, len(body))
+        self.assertEqual(b'x' * 990, sut.read())
+        self.assertEqual((len(body), 1000), (sut.wire_bytes, sut.decoded_bytes))
+
+    def test_passes_uncompressed_body_through_and_counts_it(self):
+        sut = transport.DecodedResponse(FakeResponse(b'abc'))
+        self.assertEqual((b'abc', b''), (sut.read(), sut.read()))
+        self.assertEqual((3, 3), (sut.wire_bytes, sut.decoded_bytes))
+
+    def test_reads_body_spanning_many_chunks_in_small_pieces(self):
+        body = bytes(range(256)) * 100
+        response = FakeResponse(gzip.compress(body), **{'Content-Encoding': 'gzip'})
+        sut = transport.DecodedResponse(response, chunk_size=64)
+        pieces = iter(lambda: sut.read(7), b'')
+        self.assertEqual(body, b''.join(pieces))
+
+    def test_raises_for_unsupported_encoding(self):
+        with self.assertRaises(ValueError):
+            transport.DecodedResponse(FakeResponse(b'', **{'Content-Encoding': 'compress'}))
+
+
+class CompressedResponseClientTests(LocalServerTestCase):
+
+    def setUp(self):
+        class Client(BaseDjangoRestClient):
+            BASE_API_ENDPOINT = '/api/'
+            accept_compressed_responses = True
+
+        credentials = mock.Mock(base_url=self.base_url, client_id='client', private_key='abc123==')
+        self.sut = Client(credentials)
+
+    def test_advertises_supported_encodings(self):
+        request = self.sut._get_json_request('GET', '/api/1/')
+        self.assertEqual(compression.ACCEPT_ENCODING, request.get_header('Accept-encoding'))
+        self.assertIn('gzip', compression.ACCEPT_ENCODING)
+
+    def test_decodes_compressed_response_and_counts_bytes(self):
+        for use_connection_pool in (False, True):
+            self.sut.use_connection_pool = use_connection_pool
+            r = self.sut._get_json_response('GET', '/api/compressed/')
+            self.assertEqual(100, len(r.json))
+            self.assertLess(r.raw_response.wire_bytes * 10, r.raw_response.decoded_bytes)
+
+    def test_stream_list_decodes_compressed_response(self):
+        self.sut.use_connection_pool = True
+        items = list(self.sut.stream_list('compressed'))
+        self.assertEqual((100, 'GET'), (len(items), items[0]['method']))
+
+    def test_does_not_ask_for_compression_by_default(self):
+        self.sut.accept_compressed_responses = False
+        r = self.sut._get_json_response('GET', '/api/compressed/')
+        self.assertEqual('GET', r.json[0]['method'])
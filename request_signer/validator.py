@@ -1,18 +1,13 @@
-import six
 from collections import namedtuple
+from timeit import default_timer
 from django.conf import settings
 from django.http import QueryDict
-from django.core.exceptions import ImproperlyConfigured
 from django.utils.functional import cached_property
-from generic_request_signer.check_signature import check_signature
 
-from request_signer import constants
-from request_signer.signals import successful_signed_request
+from request_signer import backends, canonical, compression, constants, dispatch, metrics, prechecks, replay, streaming
+from request_signer.signing import Signer, get_signer
 
-if six.PY3:
-    from urllib.parse import unquote
-else:
-    from urllib import unquote
+Client = namedtuple('client', ['private_key'])
 
 
 class SignatureValidator(object):
@@ -21,27 +16,146 @@ class SignatureValidator(object):
         self.request = request
 
     def has_valid_signature(self):
+        start = default_timer()
+        signature_was_valid = self.signature_was_valid
+        duration = default_timer() - start
         self._fire_signal_when_signature_valid()
-        return self.signature_was_valid
+        self._record_metrics(duration)
+        self._share_signed_data()
+        return signature_was_valid
+
+    def _share_signed_data(self):
+        """
+        Hands the form data that was verified to the view as ``request.signed_data``,
+        so PUT and PATCH views don't have to parse the body again.
+        """
+        if self.signature_was_valid and not self.is_json and not self.streams_body:
+            self.request.signed_data = self.form_data
+
+    def _record_metrics(self, duration):
+        metrics.get_metrics().record(
+            self.outcome, self.known_client_id, self.matched_form, self.content_length, duration
+        )
+
+    @property
+    def outcome(self):
+        """
+        Why the signature was rejected, or "valid" when it wasn't. Only looks at
+        checks that already ran, so it never does extra work.
+        """
+        if self.signature_was_valid:
+            return 'valid'
+        if self.rejection:
+            return self.rejection
+        if not self.matched_url:
+            return 'mismatch'
+        return 'replayed'
 
     def _fire_signal_when_signature_valid(self):
         if self.signature_was_valid:
-            successful_signed_request.send(sender=self, request=self.request)
+            dispatch.get_dispatcher().dispatch(sender=self, request=self.request)
 
     @cached_property
     def signature_was_valid(self):
-        if self.client:
-            result = check_signature(self.signature, self.client.private_key, self.url_path, self.request_data)
-            return result or check_signature(
-                self.signature, self.client.private_key, unquote(self.url_path), self.request_data
-            ) or self.unquote_base_url
+        return not self.rejection and bool(self.matched_url) and self.nonce_was_unused
+
+    @cached_property
+    def rejection(self):
+        """
+        Runs the cheap SIGNATURE_PRECHECKS in order, stopping at the first one that
+        rejects the request, so missing, stale, malformed or unknown-client
+        signatures are rejected without hashing anything.
+
+        :returns:
+            Why the request was rejected, or None when it passed every check.
+        """
+        for check in prechecks.get_prechecks():
+            reason = check(self)
+            if reason:
+                return reason
+        return None
+
+    @cached_property
+    def is_fresh(self):
+        """
+        Requests without a timestamp are only fresh when SIGNATURE_REQUIRE_TIMESTAMP
+        is off and they carry no nonce: nonces are only remembered for as long as a
+        timestamp stays fresh, so without one a request could be replayed once its
+        nonce is forgotten.
+        """
+        timestamp = self.request.GET.get(constants.TIMESTAMP_PARAM_NAME)
+        if timestamp is None:
+            has_nonce = bool(self.request.GET.get(constants.NONCE_PARAM_NAME))
+            return not has_nonce and not getattr(settings, 'SIGNATURE_REQUIRE_TIMESTAMP', False)
+        return replay.is_fresh(timestamp)
+
+    @cached_property
+    def nonce_was_unused(self):
+        """
+        Checked only once the signature matched, so forged requests can't use up nonces.
+        """
+        nonce = self.request.GET.get(constants.NONCE_PARAM_NAME)
+        if not nonce:
+            return not getattr(settings, 'SIGNATURE_REQUIRE_NONCE', False)
+        return replay.nonce_was_unused(self.client_id, nonce)
+
+    @cached_property
+    def matched_url(self):
+        """
+        The url form the signature was created with, or None when it doesn't match.
+        """
+        if self.rejection:
+            return None
+        if self.streams_body:
+            return self.signer.stream_matches(self.signature, self.candidate_urls, streaming.iter_body(self.request))
+        return self.signer.signature_matches(self.signature, self.candidate_urls, self.signing_payload)
+
+    @cached_property
+    def body_decompressed(self):
+        """
+        Signatures cover the uncompressed body, so a body sent with a
+        Content-Encoding is decompressed before it is hashed. False when it can't be.
+        """
+        try:
+            compression.decompress_request(self.request)
+        except compression.DecompressionError:
+            return False
+        return True
 
     @property
-    def unquote_base_url(self):
-        url, query = self.url_path.split('?')
-        return check_signature(
-            self.signature, self.client.private_key, '{}?{}'.format(unquote(url), query), self.request_data
-        )
+    def streams_body(self):
+        """
+        JSON bodies are hashed straight from the request stream when streaming is
+        enabled and nothing has read the body into memory yet.
+        """
+        return self.is_json and streaming.stream_json_body() and not hasattr(self.request, '_body')
+
+    @property
+    def signer(self):
+        """
+        Signers for known clients are cached so their keyed HMAC state is reused
+        across requests. Unknown client ids are not cached so they can't evict real ones.
+        """
+        if self.client.private_key:
+            return get_signer(self.client_id, self.client.private_key)
+        return Signer(self.client.private_key)
+
+    @property
+    def candidate_urls(self):
+        return list(self.candidate_forms)
+
+    @cached_property
+    def candidate_forms(self):
+        canonical_only = getattr(settings, 'SIGNATURE_CANONICAL_URL_ONLY', False)
+        return canonical.candidate_forms(self.url_path, self.signature, canonical_only)
+
+    @property
+    def matched_form(self):
+        """
+        Name of the url form the signature matched: raw, unquoted or canonical.
+        """
+        if self.signature_was_valid:
+            return self.candidate_forms[self.matched_url]
 
     @property
     def signature(self):
@@ -51,6 +165,16 @@ class SignatureValidator(object):
     def client_id(self):
         return self.request.GET.get(constants.CLIENT_ID_PARAM_NAME)
 
+    @property
+    def known_client_id(self):
+        """
+        The client id once its key has been looked up and found, or None. Requests
+        rejected before the lookup, or for an unknown client, don't get one, so
+        unverified client ids can't grow per client metrics.
+        """
+        client = self.__dict__.get('client')
+        return self.client_id if client and client.private_key else None
+
     @property
     def url_path(self):
         return self.request.get_full_path()
@@ -59,17 +183,43 @@ class SignatureValidator(object):
     def client(self):
         if not self.signature or not self.client_id:
             return False
-        if getattr(settings, 'API_KEYS', None):
-            Client = namedtuple('client', ['private_key'])
-            return Client(settings.API_KEYS.get(self.client_id, ''))
-        raise ImproperlyConfigured('API_KEYS not found in settings')
+        return Client(backends.get_key_backend().get_private_key(self.client_id) or '')
+
+    @cached_property
+    def content_length(self):
+        """
+        The Content-Length header, or 0 when it is missing or not a number, as
+        Django itself treats it.
+        """
+        try:
+            return int(self.request.META.get('CONTENT_LENGTH') or 0)
+        except (ValueError, TypeError):
+            return 0
 
     @property
+    def is_json(self):
+        return self.request.META.get('CONTENT_TYPE') in ['application/json', 'application/vnd.api+json']
+
+    @cached_property
     def request_data(self):
-        if self.request.META.get('CONTENT_TYPE') in ['application/json', 'application/vnd.api+json']:
-            request_data = self.request.body
-        elif self.request.method.lower() in ['patch', 'put']:
-            request_data = dict(QueryDict(self.request.body, encoding='utf-8'))
-        else:
-            request_data = dict(self.request.POST)
-        return request_data
+        if self.is_json:
+            return self.request.body
+        return dict(self.form_data)
+
+    @cached_property
+    def form_data(self):
+        """
+        The form body: request.POST, or for PUT and PATCH, which Django doesn't
+        parse, the body parsed once here.
+        """
+        if self.request.method.lower() in ['patch', 'put']:
+            return QueryDict(self.request.body, encoding='utf-8')
+        return self.request.POST
+
+    @cached_property
+    def signing_payload(self):
+        """
+        The canonical string the body was signed as, converted once and used for
+        every url form tried.
+        """
+        return Signer.convert_payload(self.request_data)
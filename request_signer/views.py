@@ -0,0 +1,10 @@
+from django import http
+
+from request_signer.metrics import get_metrics
+
+
+def metrics(request):
+    """
+    Exports signature verification metrics in the Prometheus text format.
+    """
+    return http.HttpResponse(get_metrics().render(), content_type='text/plain; version=0.0.4; charset=utf-8')